@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 import os
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -49,13 +50,34 @@ INSTALLED_APPS = [
 ]
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+        "prodzm.authentication.CachedJWTAuthentication",
+    ),
+    # orjson-backed JSON (same output as DRF's, see prodzm.renderers), and NDJSON listings
+    "DEFAULT_RENDERER_CLASSES": (
+        "prodzm.renderers.FastJSONRenderer",
+        "prodzm.renderers.NDJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "prodzm.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    "DEFAULT_PAGINATION_CLASS": "prodzm.pagination.KeysetCursorPagination",
+    "PAGE_SIZE": 20,
 }
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "prodzm.serializers.serializers.ClaimsTokenObtainPairSerializer",
 }
+
+# Users authenticated by JWT are cached per process for AUTH_USER_CACHE_TIMEOUT seconds
+# (invalidated when saved). Set JWT_STATELESS_AUTH=1 to trust the user claims of the
+# tokens instead, without any lookup: user changes then apply to new tokens only.
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 60))
+AUTH_USER_CACHE_SIZE = 10000
+JWT_STATELESS_AUTH = os.environ.get('JWT_STATELESS_AUTH') == '1'
 SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {
         "JWT [Bearer {JWT}]": {
@@ -76,6 +98,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "corsheaders.middleware.CorsMiddleware",
+    'prodzm.middleware.ReplicaPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -102,14 +125,119 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE selects sqlite (default) or postgresql. Connections are kept open for
+# DB_CONN_MAX_AGE seconds and checked before reuse. Set DB_POOL=1 to use a psycopg
+# connection pool on PostgreSQL instead (requires `psycopg[pool]`).
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+# Applied to every SQLite connection. WAL lets readers run alongside the writer, and
+# synchronous=NORMAL only syncs at checkpoints (still safe from corruption in WAL mode).
+# Negative cache sizes are in KiB.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)),
+    'temp_store': 'MEMORY',
+}
+
+if DB_ENGINE == 'postgresql':
+    DB_POOL = os.environ.get('DB_POOL') == '1'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'prodzm'),
+            'USER': os.environ.get('DB_USER', 'prodzm'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Pooled connections are returned to the pool after every request instead
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                    'timeout': 10,
+                },
+            } if DB_POOL else {},
+        }
+    }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Seconds a write waits for the lock before "database is locked"
+                'timeout': float(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+                # Take the write lock when transactions begin: a deferred transaction that
+                # reads then writes fails at once when another write happened meanwhile,
+                # regardless of the timeout
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            },
+        }
     }
+else:
+    raise ImproperlyConfigured(f"Unsupported DB_ENGINE {DB_ENGINE!r}: use sqlite or postgresql.")
+
+# Read replicas: DB_REPLICAS lists their SQLite files (or PostgreSQL hosts), comma separated.
+# Safe requests of the catalog endpoints read from a replica, except for clients that wrote
+# less than REPLICA_PIN_SECONDS ago (pinned to the primary by a cookie), which should
+# exceed the replication lag. Locally, copy the primary with `manage.py sync_sqlite_replicas`.
+
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(','))):
+    alias = f'replica{index + 1}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST' if DB_ENGINE == 'postgresql' else 'NAME': replica.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['prodzm.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Catalog responses use a local-memory cache per process by default.
+# Set CATALOG_CACHE_BACKEND=file to share cached responses between worker processes.
+# Product representations are cached per process and, like responses, expire after
+# CATALOG_CACHE_TIMEOUT: changes made in other processes are seen within that time.
+
+CATALOG_CACHE_TIMEOUT = int(os.environ.get('CATALOG_CACHE_TIMEOUT', 300))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CATALOG_CACHE_LOCATION', BASE_DIR / '.cache/catalog'),
+    } if os.environ.get('CATALOG_CACHE_BACKEND') == 'file' else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog',
+    },
 }
 
 
+# Profiling
+# Set PROFILING_SAMPLE_RATE (from 0 to 1) to profile that share of requests. Profiled responses
+# get a Server-Timing header and are aggregated in the admin-only /metrics/ endpoint.
+
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+
+if PROFILING_SAMPLE_RATE:
+    MIDDLEWARE.insert(0, 'prodzm.middleware.ProfilingMiddleware')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -160,6 +288,30 @@ STATIC_ROOT = BASE_DIR / '.static/'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'core/media/'
 
+# Product images
+# Uploaded product images are resized into PRODUCT_IMAGE_SIZES derivatives (JPEG and WebP) by the
+# task queue workers. Derivatives live under content-hash paths in `MEDIA_ROOT/product_images/derivatives/`,
+# so the web server can serve them with `Cache-Control: public, max-age=31536000, immutable`.
+
+PRODUCT_IMAGE_SIZES = {'thumb': 160, 'medium': 640, 'large': 1280}
+
+
+# Task queue
+# Deferred work (order totals, image processing) is stored in the prodzm_task table and run by
+# `python manage.py run_tasks` workers. Set TASK_QUEUE_EAGER=1 to run tasks in the web process
+# right after the commit instead, e.g. in development without workers.
+
+TASK_QUEUE_EAGER = os.environ.get('TASK_QUEUE_EAGER') == '1'
+TASK_STALE_AFTER = 600  # Seconds after which tasks of a lost worker are requeued
+TASK_RETENTION = 7 * 24 * 3600  # Seconds done tasks are kept for their statistics
+
+# Sales analytics rollups are refreshed by a task this many seconds after orders change,
+# so that a burst of orders is rolled up at once
+SALES_ROLLUP_DELAY = 60
+# Order items are rolled up again by every refresh for this many seconds, so that items
+# committed after a refresh with ids below its watermark (longer transactions) are included
+SALES_ROLLUP_LAG = 300
+
 ROLEPERMISSIONS_MODULE = "prodzm.roles"
 
 # Default primary key field type
@@ -8,6 +8,7 @@ from prodzm.models import (
     OrderItem,
     Shipping,
     Review,
+    Task,
 )
 
 class ProductImageInline(admin.TabularInline):
@@ -122,3 +123,15 @@ class ShippingAdmin(admin.ModelAdmin):
     list_filter = ('status', 'shipped_at', 'delivered_at')
     search_fields = ('tracking_number', 'order__id')
     ordering = ('-shipped_at',)
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for inspecting the task queue, e.g. the errors of failed tasks.
+    """
+    list_display = ('name', 'status', 'attempts', 'run_at', 'finished_at', 'duration', 'worker')
+    list_filter = ('status', 'name')
+    search_fields = ('dedupe_key',)
+    ordering = ('-run_at',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'duration', 'worker', 'last_error')
@@ -0,0 +1,65 @@
+import copy
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from prodzm.cache import bump_object_versions, get_object_versions, get_user_cache
+
+# Claims added to the tokens, trusted by the stateless mode instead of the user row
+USER_CLAIMS = ('username', 'is_staff', 'is_superuser')
+
+
+def get_user_cache_timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+
+def is_stateless():
+    """
+    Whether users are built from the token claims alone, without the database nor the
+    user cache, configurable through the `JWT_STATELESS_AUTH` setting. Changes to a user
+    (deactivation, staff status) then only apply to the tokens issued afterwards.
+    """
+    return getattr(settings, 'JWT_STATELESS_AUTH', False)
+
+
+def invalidate_cached_user(pk):
+    """
+    Invalidates the cached user `pk` in every process sharing the catalog cache, by bumping
+    its version, which is part of the user cache keys.
+    """
+    bump_object_versions(get_user_model(), [pk])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication serving the users from an in-process LRU cache for
+    `AUTH_USER_CACHE_TIMEOUT` seconds (60 by default) instead of fetching them for every
+    request. Cache keys combine the user id and the user's version, bumped when the user is
+    saved or deleted. With `JWT_STATELESS_AUTH`, users are built from the token claims.
+    """
+
+    def get_user(self, validated_token):
+        if is_stateless() and all(claim in validated_token for claim in USER_CLAIMS):
+            return JWTStatelessUserAuthentication().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        cache = get_user_cache()
+        version = get_object_versions(self.user_model, [user_id])[user_id]
+        key = (user_id, version)
+        entry = cache.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            user = super().get_user(validated_token)
+            cache.set(key, (user, time.monotonic() + get_user_cache_timeout()), size=1)
+        else:
+            user = entry[0]
+            if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+        # Requests get their own instance, so they never see each other's changes
+        return copy.copy(user)
@@ -0,0 +1,173 @@
+import itertools
+import random
+import statistics
+import time
+import tracemalloc
+from decimal import Decimal
+from django.db import connections, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from prodzm.cache import get_catalog_cache, get_representation_cache
+from prodzm.models import Category, Customer, Order, OrderItem, Product, ProductImage, Review, Shipping
+from prodzm.services import get_search_backend, rebuild_review_stats, rebuild_sales_rollups
+
+WORDS = (
+    'smart', 'wireless', 'portable', 'organic', 'classic', 'ultra', 'compact', 'premium', 'eco', 'pro',
+    'band', 'speaker', 'lamp', 'bottle', 'backpack', 'charger', 'headphones', 'watch', 'mug', 'cable',
+    'camera', 'keyboard', 'jacket', 'sneakers', 'blender', 'pillow', 'tent', 'drone', 'mat', 'kettle',
+)
+
+# Number of images per product and its probability
+IMAGE_DISTRIBUTION = ((0, 5), (1, 30), (2, 30), (3, 20), (4, 10), (5, 5))
+
+
+def seed_catalog(products, seed=0, using='default'):
+    """
+    Fills the `using` database with a synthetic catalog of `products` products:
+    about 100 products per category, 0-5 images per product, a long-tailed number of reviews
+    per product, one customer per 10 products and one order (of 1-4 items, favouring popular
+    products) per 2 products, half of them shipped.
+    Rows are inserted with `bulk_create`, then review statistics, the search index and the
+    daily sales rollups are rebuilt.
+    """
+    rng = random.Random(seed)
+
+    categories = Category.objects.using(using).bulk_create([
+        Category(name=f"Category {i}", description="Synthetic benchmark category.")
+        for i in range(max(1, products // 100))
+    ])
+    catalog = Product.objects.using(using).bulk_create([
+        Product(
+            name=f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}",
+            description=' '.join(rng.choices(WORDS, k=20)),
+            price=Decimal(f"{rng.lognormvariate(3, 1):.2f}"),
+            shipping_cost=Decimal(f"{rng.uniform(0, 15):.2f}"),
+            remaining_stock=rng.randint(0, 500),
+            rating=Decimal(f"{rng.uniform(1, 5):.2f}"),
+            category=rng.choice(categories),
+            sku=f"SYN-{i:07d}",
+            supplier=f"Supplier {i % 50}",
+        )
+        for i in range(products)
+    ], batch_size=1000)
+
+    counts, weights = zip(*IMAGE_DISTRIBUTION)
+    images = []
+    for product in catalog:
+        for position in range(rng.choices(counts, weights)[0]):
+            images.append(ProductImage(
+                product=product, image=f"product/synthetic/{product.pk}-{position}.jpg", is_main=position == 0,
+            ))
+    ProductImage.objects.using(using).bulk_create(images, batch_size=1000)
+
+    customers = Customer.objects.using(using).bulk_create([
+        Customer(first_name="Customer", last_name=str(i), email=f"customer{i}@example.com", shipping_address="-")
+        for i in range(max(1, products // 10))
+    ], batch_size=1000)
+
+    reviews = []
+    for product in catalog:
+        for _ in range(min(int(rng.paretovariate(1.2)) - 1, 100)):
+            reviews.append(Review(
+                product=product, customer=rng.choice(customers), rating=rng.choices(range(1, 6), (5, 5, 15, 35, 40))[0],
+                comment="Synthetic review.",
+            ))
+    Review.objects.using(using).bulk_create(reviews, batch_size=1000)
+
+    # Zipf-like popularity: a few products get most of the orders
+    popularity = list(itertools.accumulate(1 / rank for rank in range(1, products + 1)))
+    orders, lines = [], []
+    for _ in range(products // 2):
+        picked = {product.pk: product for product in rng.choices(catalog, cum_weights=popularity, k=rng.randint(1, 4))}
+        items = [OrderItem(product=product, quantity=rng.randint(1, 3), unit_price=product.price) for product in picked.values()]
+        for item in items:
+            item.product.orders += 1
+        order = Order(
+            customer=rng.choice(customers),
+            status=rng.choice(('pending', 'shipped', 'delivered')),
+            total_price=sum(item.unit_price * item.quantity for item in items),
+        )
+        orders.append(order)
+        lines.append(items)
+    Order.objects.using(using).bulk_create(orders, batch_size=1000)
+    for order, items in zip(orders, lines):
+        for item in items:
+            item.order = order
+    OrderItem.objects.using(using).bulk_create([item for items in lines for item in items], batch_size=1000)
+    Product.objects.using(using).bulk_update(catalog, ['orders'], batch_size=1000)
+    Shipping.objects.using(using).bulk_create([
+        Shipping(order=order, tracking_number=f"TRACK-{order.pk}", status='shipped')
+        for order in orders[::2]
+    ], batch_size=1000)
+
+    rebuild_review_stats()
+    get_search_backend(using).rebuild()
+    rebuild_sales_rollups(using=using)
+
+
+def get_endpoints(router, using='default'):
+    """
+    Returns `(name, url, paginated)` for the list and detail routes of every viewset
+    registered on `router`, plus the custom read endpoints worth tracking.
+    """
+    endpoints = []
+    for prefix, viewset, basename in router.registry:
+        endpoints.append((f'{prefix}-list', reverse(f'prodzm:{basename}-list'), True))
+        obj = viewset.queryset.model._default_manager.using(using).order_by('pk').first()
+        if obj is not None:
+            url = reverse(f'prodzm:{basename}-detail', kwargs={viewset.lookup_field: obj.pk})
+            endpoints.append((f'{prefix}-detail', url, False))
+
+    word = Product.objects.using(using).values_list('name', flat=True).first() or ''
+    endpoints += [
+        ('products-search', f"{reverse('prodzm:product-search')}?qs={word.split(' ')[0]}", True),
+        ('products-sparse', f"{reverse('prodzm:product-list')}?fields=id,name,price,images", True),
+        ('orders-expanded', f"{reverse('prodzm:order-list')}?expand=product", True),
+        ('shipping-expanded', f"{reverse('prodzm:shipping-list')}?expand=product", True),
+        ('cache-stats', reverse('prodzm:cache-stats'), False),
+        ('analytics/products-top', f"{reverse('prodzm:dailyproductsales-top')}?by=units", False),
+        ('analytics/categories-top', reverse('prodzm:dailycategorysales-top'), False),
+    ]
+    return endpoints
+
+
+def with_page_size(url, page_size):
+    return f"{url}{'&' if '?' in url else '?'}page_size={page_size}"
+
+
+def measure(client, url, repeat=10, using='default'):
+    """
+    Requests `url` with cold caches: once under tracemalloc for the query count and peak
+    memory, then `repeat` times for latency. Returns a dict of the measurements.
+    """
+    def request():
+        get_catalog_cache().clear()
+        get_representation_cache().clear()
+        return client.get(url)
+
+    reset_queries()  # The query log is bounded, a full log would capture nothing
+    tracemalloc.start()
+    with CaptureQueriesContext(connections[using]) as context:
+        response = request()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        request()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+
+    return {
+        'status': response.status_code,
+        'queries': len(context.captured_queries),
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def get_row_counts(using='default'):
+    models = (Category, Product, ProductImage, Review, Customer, Order, OrderItem, Shipping)
+    return {model._meta.model_name: model._default_manager.using(using).count() for model in models}
@@ -0,0 +1,253 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+
+CATALOG_CACHE_ALIAS = 'catalog'
+
+# Cache dependency of the stock and order counters of products, which change with every
+# placed order: bumped instead of the Product version, so it only invalidates the
+# responses that show them
+PRODUCT_STOCK = 'prodzm.product.stock'
+
+
+def get_catalog_cache():
+    """
+    Returns the cache backing catalog responses (the `catalog` alias of `CACHES`).
+    """
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def get_catalog_cache_timeout():
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300)
+
+
+def _version_key(model):
+    # Models, or names of finer-grained dependencies such as PRODUCT_STOCK
+    return f"version:{model if isinstance(model, str) else model._meta.label_lower}"
+
+
+def get_model_versions(models):
+    """
+    Returns the current cache version of each model, in milliseconds since the epoch.
+    A model's version is the time it last changed, so it also serves as Last-Modified.
+    Models that never changed since the cache was created start at the current time.
+    """
+    cache = get_catalog_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = time.time_ns() // 1_000_000
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions[key] for key in keys]
+
+
+async def aget_model_versions(models):
+    """
+    Async version of `get_model_versions()`.
+    """
+    cache = get_catalog_cache()
+    keys = [_version_key(model) for model in models]
+    versions = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = time.time_ns() // 1_000_000
+        for key in missing:
+            await cache.aadd(key, now, timeout=None)
+        versions.update(await cache.aget_many(missing))
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model):
+    """
+    Marks `model` (or a dependency name such as PRODUCT_STOCK) as changed. Every cached
+    response depending on it is invalidated, since cache keys embed the versions of their
+    dependencies.
+    """
+    cache = get_catalog_cache()
+    key = _version_key(model)
+    current = cache.get(key) or 0
+    cache.set(key, max(time.time_ns() // 1_000_000, current + 1), timeout=None)
+
+
+def build_cache_key(prefix, *parts):
+    """
+    Builds a fixed-length cache key from arbitrary parts.
+    """
+    digest = hashlib.md5('\x1f'.join(str(part) for part in parts).encode()).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def _object_version_key(model, pk):
+    return f"version:{model._meta.label_lower}:{pk}"
+
+
+def get_object_versions(model, pks):
+    """
+    Returns a `{pk: version}` mapping of the per-object cache versions of `model` instances,
+    read with a single cache round trip. Objects that never changed start at the current time.
+    """
+    cache = get_catalog_cache()
+    keys = {_object_version_key(model, pk): pk for pk in set(pks)}
+    versions = cache.get_many(list(keys))
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = time.time_ns() // 1_000_000
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+async def aget_object_versions(model, pks):
+    """
+    Async version of `get_object_versions()`.
+    """
+    cache = get_catalog_cache()
+    keys = {_object_version_key(model, pk): pk for pk in set(pks)}
+    versions = await cache.aget_many(list(keys))
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = time.time_ns() // 1_000_000
+        for key in missing:
+            await cache.aadd(key, now, timeout=None)
+        versions.update(await cache.aget_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_object_versions(model, pks):
+    """
+    Marks the given `model` instances as changed, invalidating their cached representations.
+    """
+    cache = get_catalog_cache()
+    keys = [_object_version_key(model, pk) for pk in set(pks) if pk is not None]
+    current = cache.get_many(keys)
+    now = time.time_ns() // 1_000_000
+    cache.set_many({key: max(now, current.get(key, 0) + 1) for key in keys}, timeout=None)
+
+
+class LRUCache:
+    """
+    Thread-safe, in-process LRU cache bounded by the sum of its entry sizes (an approximate
+    memory budget in bytes, or simply the number of entries when every size is 1).
+    Entries may also expire, e.g. when their invalidation isn't seen by every process.
+    Keeps hit, miss and eviction counters to help size the budget.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, key):
+        # Doesn't count as a lookup nor refresh the entry
+        with self._lock:
+            return self._get_entry(key) is not None
+
+    def _get_entry(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+            del self._entries[key]
+            self.bytes -= entry[1]
+            return None
+        return entry
+
+    def set(self, key, value, size, timeout=None):
+        """
+        Stores `value`, of `size` bytes, for `timeout` seconds (forever if None).
+        """
+        if size > self.max_bytes or (timeout is not None and timeout <= 0):
+            return
+        expires = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (value, size, expires)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+_representation_cache = None
+_representation_cache_lock = threading.Lock()
+
+
+def get_representation_cache():
+    """
+    Returns the process-wide LRU cache of serialized product representations.
+    Its memory budget is set by `PRODUCT_REPRESENTATION_CACHE_BYTES` (32 MiB by default).
+    Entries are stored for `get_representation_cache_timeout()` seconds.
+    """
+    global _representation_cache
+    if _representation_cache is None:
+        with _representation_cache_lock:
+            if _representation_cache is None:
+                max_bytes = getattr(settings, 'PRODUCT_REPRESENTATION_CACHE_BYTES', 32 * 1024 * 1024)
+                _representation_cache = LRUCache(max_bytes)
+    return _representation_cache
+
+
+def get_representation_cache_timeout():
+    """
+    Returns the lifetime of cached representations. They are invalidated by versions kept in
+    the catalog cache, which is local to each process by default: changes made in other
+    processes are only seen once the entries expire, like cached responses.
+    """
+    return get_catalog_cache_timeout()
+
+
+_user_cache = None
+_user_cache_lock = threading.Lock()
+
+
+def get_user_cache():
+    """
+    Returns the process-wide LRU cache of the users resolved from JWTs, bounded by
+    `AUTH_USER_CACHE_SIZE` entries (10000 by default).
+    """
+    global _user_cache
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                _user_cache = LRUCache(getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000))
+    return _user_cache
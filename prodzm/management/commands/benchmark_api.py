@@ -0,0 +1,130 @@
+import json
+from pathlib import Path
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+from prodzm.benchmarks import get_endpoints, get_row_counts, measure, seed_catalog, with_page_size
+from prodzm.routers import router
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'api_baseline.json'
+
+
+class Command(BaseCommand):
+    """
+    Query-count and latency regression benchmark of the API.
+    Seeds a synthetic catalog at every scale in a throwaway test database, requests every
+    router endpoint (list and detail) plus product search, and records the query count,
+    p50/p95 latency and peak memory of each. Fails when the query count of a list endpoint
+    grows with the page size or with the catalog size, or exceeds the stored baseline.
+    Example: python manage.py benchmark_api --scales 1000 10000 --output report.json
+    """
+    help = "Benchmark query counts, latency and memory of every API endpoint at several catalog sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=int, nargs='+', default=[1000, 10000, 100000], help="Catalog sizes (products) to benchmark.")
+        parser.add_argument('--repeat', type=int, default=10, help="Timed requests per endpoint.")
+        parser.add_argument('--page-sizes', type=int, nargs=2, default=[5, 50], metavar=('SMALL', 'LARGE'), help="Page sizes compared for query growth.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed of the synthetic catalogs.")
+        parser.add_argument('--output', help="Path of the JSON report (printed to stdout if omitted).")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Path of the stored query-count baseline.")
+        parser.add_argument('--update-baseline', action='store_true', help="Store this run's query counts as the new baseline.")
+        parser.add_argument('--latency-tolerance', type=float, help="Also fail when a p95 latency exceeds the baseline by this ratio (e.g. 0.5).")
+
+    def handle(self, *args, **options):
+        connection = connections['default']
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = {'database': connection.vendor, 'scales': {}}
+            for scale in options['scales']:
+                report['scales'][str(scale)] = self.benchmark_scale(scale, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        problems = self.find_regressions(report, options)
+        report['problems'] = problems
+
+        content = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(content)
+            self.stdout.write(f"Report written to {options['output']}.")
+        else:
+            self.stdout.write(content)
+
+        if options['update_baseline']:
+            self.write_baseline(report, Path(options['baseline']))
+            self.stdout.write(f"Baseline written to {options['baseline']}.")
+        elif problems:
+            raise CommandError("API benchmark regressions:\n" + "\n".join(problems))
+        else:
+            self.stdout.write(self.style.SUCCESS("No query count regressions."))
+
+    def benchmark_scale(self, scale, options):
+        call_command('flush', interactive=False, verbosity=0)
+        seed_catalog(scale, seed=options['seed'])
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark'))
+
+        small, large = options['page_sizes']
+        results = {'rows': get_row_counts(), 'endpoints': {}}
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{scale} products: {results['rows']}"))
+        for name, url, paginated in get_endpoints(router):
+            if paginated:
+                url = with_page_size(url, large)
+            result = measure(client, url, repeat=max(1, options['repeat']))
+            result['url'] = url
+            if paginated:
+                result['queries_small_page'] = measure(client, with_page_size(url, small), repeat=1)['queries']
+            results['endpoints'][name] = result
+            self.stdout.write(
+                f"  {name:<22} {result['status']} {result['queries']:>3} queries  "
+                f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  peak {result['peak_memory_kb']:>9.1f} KiB"
+            )
+        return results
+
+    def find_regressions(self, report, options):
+        baseline = {}
+        path = Path(options['baseline'])
+        if path.exists() and not options['update_baseline']:
+            baseline = json.loads(path.read_text())
+
+        problems = []
+        first_counts = {}
+        for scale, results in report['scales'].items():
+            for name, result in results['endpoints'].items():
+                if result['status'] != 200:
+                    problems.append(f"{name} @ {scale}: status {result['status']}")
+                if 'queries_small_page' in result and result['queries'] != result['queries_small_page']:
+                    problems.append(
+                        f"{name} @ {scale}: {result['queries_small_page']} queries with a small page, "
+                        f"{result['queries']} with a large one"
+                    )
+                first = first_counts.setdefault(name, result['queries'])
+                if result['queries'] != first:
+                    problems.append(f"{name} @ {scale}: {result['queries']} queries, {first} at a smaller scale")
+
+                expected = baseline.get(name)
+                if expected is None:
+                    continue
+                if result['queries'] > expected['queries']:
+                    problems.append(f"{name} @ {scale}: {result['queries']} queries, baseline is {expected['queries']}")
+                tolerance = options['latency_tolerance']
+                p95 = expected.get('p95_ms', {}).get(scale)
+                if tolerance is not None and p95 and result['p95_ms'] > p95 * (1 + tolerance):
+                    problems.append(f"{name} @ {scale}: p95 {result['p95_ms']} ms, baseline is {p95} ms")
+        return problems
+
+    def write_baseline(self, report, path):
+        baseline = {}
+        for scale, results in report['scales'].items():
+            for name, result in results['endpoints'].items():
+                entry = baseline.setdefault(name, {'queries': 0, 'p95_ms': {}})
+                entry['queries'] = max(entry['queries'], result['queries'])
+                entry['p95_ms'][scale] = result['p95_ms']
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
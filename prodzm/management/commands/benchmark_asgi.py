@@ -0,0 +1,178 @@
+import asyncio
+import io
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from prodzm.benchmarks import seed_catalog
+from prodzm.cache import get_catalog_cache, get_representation_cache
+
+
+def summarize(latencies, elapsed):
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 1)
+
+    return {
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(latencies[-1] * 1000, 1),
+    }
+
+
+class Command(BaseCommand):
+    """
+    Load benchmark of the catalog read path with slow clients, comparing:
+    - `wsgi`: `core.wsgi` and the sync viewsets, in a pool of `--threads` worker threads
+      (like gunicorn's threaded workers), each busy until its client received the response,
+    - `asgi-sync`: `core.asgi` and the same sync viewsets, which Django runs in a thread,
+    - `asgi-async`: `core.asgi` and the async views under `/async/`.
+    `--clients` concurrent clients send `--requests` requests each, and take `--client-delay`
+    milliseconds to receive every response. Applications are called in-process, without
+    sockets, against a throwaway database seeded with `--products` products.
+    Example: python manage.py benchmark_asgi --clients 64 --threads 8 --client-delay 50
+    """
+    help = "Benchmark requests/sec and tail latency of the WSGI and ASGI catalog read paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000, help="Products in the synthetic catalog.")
+        parser.add_argument('--clients', type=int, default=64, help="Concurrent clients.")
+        parser.add_argument('--requests', type=int, default=20, help="Requests per client.")
+        parser.add_argument('--threads', type=int, default=8, help="WSGI worker threads.")
+        parser.add_argument('--client-delay', type=float, default=50, help="Milliseconds a client takes to receive a response.")
+        parser.add_argument('--url', default='/products/?page_size=20', help="Sync catalog URL (the async one is prefixed with /async).")
+        parser.add_argument('--uncached', action='store_true', help="Disable the response cache, so every request queries the database.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed of the synthetic catalog.")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        from core.asgi import application as asgi_application
+        from core.wsgi import application as wsgi_application
+
+        connection = connections['default']
+        setup_test_environment(debug=False)
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            seed_catalog(options['products'], seed=options['seed'])
+            with override_settings(**({'CATALOG_CACHE_TIMEOUT': 0} if options['uncached'] else {})):
+                scenarios = {
+                    'wsgi': lambda: self.run_wsgi(wsgi_application, options['url'], options),
+                    'asgi-sync': lambda: asyncio.run(self.run_asgi(asgi_application, options['url'], options)),
+                    'asgi-async': lambda: asyncio.run(self.run_asgi(asgi_application, '/async' + options['url'], options)),
+                }
+                report = {'options': {name: options[name] for name in ('products', 'clients', 'requests', 'threads', 'client_delay', 'url', 'uncached')}}
+                for name, run in scenarios.items():
+                    get_catalog_cache().clear()
+                    get_representation_cache().clear()
+                    report[name] = run()
+                    self.stdout.write(
+                        f"{name:11} {report[name]['requests_per_second']:8.1f} req/s  p50 {report[name]['p50_ms']:7.1f}ms  "
+                        f"p95 {report[name]['p95_ms']:7.1f}ms  p99 {report[name]['p99_ms']:7.1f}ms"
+                    )
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        content = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(content)
+            self.stdout.write(f"Report written to {options['output']}.")
+        else:
+            self.stdout.write(content)
+
+    def run_wsgi(self, application, url, options):
+        delay = options['client_delay'] / 1000
+        parts = urlsplit(url)
+
+        def serve():
+            # A worker thread runs the application, then writes the response to the slow client
+            statuses = []
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': parts.path, 'QUERY_STRING': parts.query, 'SCRIPT_NAME': '',
+                'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1', 'REMOTE_ADDR': '127.0.0.1',
+                'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(),
+                'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+            }
+            result = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+            try:
+                b''.join(result)
+            finally:
+                result.close()
+            time.sleep(delay)
+            return statuses[0]
+
+        latencies = []
+        lock = threading.Lock()
+        with ThreadPoolExecutor(options['threads']) as pool:
+            pool.submit(serve).result()  # Warm up
+
+            def client():
+                for _ in range(options['requests']):
+                    started = time.perf_counter()
+                    pool.submit(serve).result()
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+
+            clients = [threading.Thread(target=client) for _ in range(options['clients'])]
+            started = time.perf_counter()
+            for thread in clients:
+                thread.start()
+            for thread in clients:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        return summarize(latencies, elapsed)
+
+    async def run_asgi(self, application, url, options):
+        delay = options['client_delay'] / 1000
+        parts = urlsplit(url)
+
+        async def request():
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+                'path': parts.path, 'raw_path': parts.path.encode(), 'query_string': parts.query.encode(), 'root_path': '',
+                'headers': [(b'host', b'testserver')], 'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+            }
+            disconnected = asyncio.Event()
+            received = False
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                # The slow client takes its time to receive the body, without holding a thread
+                if message['type'] == 'http.response.body' and not message.get('more_body'):
+                    await asyncio.sleep(delay)
+
+            try:
+                await application(scope, receive, send)
+            finally:
+                disconnected.set()
+
+        await request()  # Warm up
+        latencies = []
+
+        async def client():
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                await request()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(options['clients'])))
+        return summarize(latencies, time.perf_counter() - started)
@@ -0,0 +1,149 @@
+import multiprocessing
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.db.models import F
+from prodzm.models import Category, Customer, Order, OrderItem, Product
+
+# Tables the benchmark transactions touch
+MODELS = (Category, Product, Customer, Order, OrderItem)
+
+PRODUCTS = 200
+CUSTOMERS = 50
+
+
+def get_profiles():
+    """
+    Returns the SQLite configurations compared: Django's defaults (rollback journal,
+    deferred transactions, 5s busy timeout) and the tuned `default` database settings.
+    """
+    tuned = settings.DATABASES['default']
+    if tuned['ENGINE'] != 'django.db.backends.sqlite3':
+        raise CommandError("The write benchmark compares SQLite configurations: run it with DB_ENGINE=sqlite.")
+    return {
+        'default': {},
+        'tuned': tuned.get('OPTIONS', {}),
+    }
+
+
+def place_orders(alias, transactions, seed, results):
+    """
+    Worker process: runs `transactions` order placements (a stock update, an order and its
+    items, in one transaction) and reports the latencies and the lock errors.
+    """
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    try:
+        for _ in range(transactions):
+            products = rng.sample(range(1, PRODUCTS + 1), 2)
+            started = time.perf_counter()
+            try:
+                with transaction.atomic(using=alias):
+                    prices = dict(Product.objects.using(alias).filter(pk__in=products).values_list('pk', 'price'))
+                    Product.objects.using(alias).filter(pk__in=products).update(
+                        remaining_stock=F('remaining_stock') - 1, orders=F('orders') + 1,
+                    )
+                    order = Order.objects.using(alias).create(
+                        customer_id=rng.randint(1, CUSTOMERS), total_price=sum(prices.values()),
+                    )
+                    OrderItem.objects.using(alias).bulk_create([
+                        OrderItem(order=order, product_id=pk, quantity=1, unit_price=price) for pk, price in prices.items()
+                    ])
+            except OperationalError:
+                errors += 1  # "database is locked"
+                continue
+            latencies.append(time.perf_counter() - started)
+    finally:
+        connections.close_all()
+        results.put((latencies, errors))
+
+
+class Command(BaseCommand):
+    """
+    Write concurrency benchmark of the SQLite configuration.
+    Worker processes (like gunicorn workers) place orders concurrently in a throwaway
+    database, once with Django's SQLite defaults and once with the tuned settings (WAL,
+    synchronous=NORMAL, immediate transactions, busy timeout...), and the committed write
+    throughput, latencies and "database is locked" errors are compared.
+    Example: python manage.py benchmark_db_writes --processes 8 --transactions 300
+    """
+    help = "Benchmark concurrent SQLite writes with the default and the tuned settings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8, help="Concurrent writer processes.")
+        parser.add_argument('--transactions', type=int, default=200, help="Transactions per process.")
+
+    def handle(self, *args, **options):
+        profiles = get_profiles()
+        directory = Path(tempfile.mkdtemp(prefix='prodzm-db-bench-'))
+        try:
+            results = {name: self.benchmark(name, profile_options, directory, options) for name, profile_options in profiles.items()}
+        finally:
+            connections.close_all()
+            shutil.rmtree(directory, ignore_errors=True)
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:8} {result['committed']:6} committed, {result['errors']:5} lock errors, "
+                f"{result['throughput']:8.1f} tx/s, p50 {result['p50'] * 1000:7.1f}ms, p95 {result['p95'] * 1000:7.1f}ms"
+            )
+        if results['default']['throughput']:
+            gain = results['tuned']['throughput'] / results['default']['throughput']
+            self.stdout.write(self.style.SUCCESS(f"Tuned write throughput: {gain:.2f}x the default configuration."))
+
+    def benchmark(self, name, profile_options, directory, options):
+        alias = f'benchmark_{name}'
+        connections.settings[alias] = connections.configure_settings({
+            'default': settings.DATABASES['default'],
+            alias: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(directory / f'{name}.sqlite3'), 'OPTIONS': dict(profile_options)},
+        })[alias]
+        self.seed(alias)
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        processes = [
+            context.Process(target=place_orders, args=(alias, options['transactions'], seed, queue))
+            for seed in range(options['processes'])
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        outcomes = [queue.get() for _ in processes]
+        elapsed = time.perf_counter() - started
+        for process in processes:
+            process.join()
+
+        latencies = sorted(latency for worker_latencies, _ in outcomes for latency in worker_latencies)
+        return {
+            'committed': len(latencies),
+            'errors': sum(errors for _, errors in outcomes),
+            'throughput': len(latencies) / elapsed,
+            'p50': statistics.median(latencies) if latencies else 0,
+            'p95': latencies[int(len(latencies) * 0.95)] if latencies else 0,
+        }
+
+    def seed(self, alias):
+        with connections[alias].schema_editor() as editor:
+            for model in MODELS:
+                editor.create_model(model)
+        category = Category.objects.using(alias).create(name="Benchmark")
+        Product.objects.using(alias).bulk_create([
+            Product(
+                name=f"Product {i}", description="-", price=Decimal('9.99'), shipping_cost=0, remaining_stock=10 ** 6,
+                category=category, sku=f"BENCH-{i}", supplier="benchmark",
+            )
+            for i in range(PRODUCTS)
+        ])
+        Customer.objects.using(alias).bulk_create([
+            Customer(first_name="Bench", last_name=str(i), email=f"bench{i}@example.com", shipping_address="-")
+            for i in range(CUSTOMERS)
+        ])
@@ -0,0 +1,120 @@
+import io
+import json
+import time
+from pathlib import Path
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from prodzm.benchmarks import seed_catalog
+from prodzm.parsers import FastJSONParser
+from prodzm.renderers import FastJSONRenderer, NDJSONRenderer, orjson
+
+DEFAULT_URLS = (
+    '/products/?page_size=100',
+    '/orders/?page_size=100&expand=product',
+    '/reviews/?page_size=100',
+    '/categories/?page_size=100',
+)
+
+
+def throughput(function, size, repeat):
+    """
+    Returns the best bytes/sec of `repeat` calls of `function` over `size` bytes.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return size / max(min(timings), 1e-9)
+
+
+class Command(BaseCommand):
+    """
+    Throughput benchmark of the JSON renderers and parsers.
+    Fetches the payloads of `--url` endpoints from a throwaway database seeded with
+    `--products` products, checks FastJSONRenderer renders them exactly like DRF's
+    JSONRenderer, then compares the bytes/sec of DRF's renderer, FastJSONRenderer and
+    NDJSONRenderer, and of DRF's JSONParser and FastJSONParser on the rendered content
+    (whole, and item by item like small request bodies).
+    Example: python manage.py benchmark_renderers --products 2000 --repeat 50
+    """
+    help = "Benchmark bytes/sec of the stdlib and orjson JSON renderers and parsers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000, help="Products in the synthetic catalog.")
+        parser.add_argument('--url', action='append', dest='urls', help="Endpoint whose payload is rendered (repeatable).")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed renders and parses of each payload.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed of the synthetic catalog.")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write(self.style.WARNING("orjson is not installed: the fast renderer and parser fall back to the standard library."))
+        connection = connections['default']
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            seed_catalog(options['products'], seed=options['seed'])
+            client = APIClient()
+            client.force_authenticate(User.objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark'))
+            payloads = {}
+            for url in options['urls'] or DEFAULT_URLS:
+                response = client.get(url, HTTP_ACCEPT='application/json')
+                if response.status_code != 200:
+                    raise CommandError(f"{url}: status {response.status_code}")
+                payloads[url] = json.loads(response.content)  # Cached responses carry no `data`
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {'orjson': getattr(orjson, '__version__', None), 'endpoints': {}}
+        for url, data in payloads.items():
+            report['endpoints'][url] = result = self.benchmark(data, max(1, options['repeat']))
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{url} ({result['bytes']} bytes)"))
+            for name, value in result['bytes_per_second'].items():
+                self.stdout.write(f"  {name:21} {value / 2 ** 20:9.1f} MiB/s")
+            self.stdout.write((
+                f"  speedup: render {result['render_speedup']:.2f}x, parse {result['parse_speedup']:.2f}x, "
+                f"parse items {result['parse_items_speedup']:.2f}x"
+            ))
+
+        mismatches = [url for url, result in report['endpoints'].items() if not result['identical']]
+        content = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(content)
+            self.stdout.write(f"Report written to {options['output']}.")
+        else:
+            self.stdout.write(content)
+        if mismatches:
+            raise CommandError("FastJSONRenderer output differs from JSONRenderer for: " + ", ".join(mismatches))
+
+    def benchmark(self, data, repeat):
+        renderers = {'drf-json': JSONRenderer(), 'fast-json': FastJSONRenderer(), 'ndjson': NDJSONRenderer()}
+        content = renderers['drf-json'].render(data)
+        size = len(content)
+        rates = {
+            f'render:{name}': throughput(lambda renderer=renderer: renderer.render(data), size, repeat)
+            for name, renderer in renderers.items()
+        }
+        # Request bodies are usually small: items are also parsed one by one
+        items = renderers['ndjson'].render(data).splitlines()
+        items_size = sum(len(item) for item in items)
+        for name, parser in (('drf-json', JSONParser()), ('fast-json', FastJSONParser())):
+            rates[f'parse:{name}'] = throughput(lambda parser=parser: parser.parse(io.BytesIO(content)), size, repeat)
+            rates[f'parse-items:{name}'] = throughput(
+                lambda parser=parser: [parser.parse(io.BytesIO(item)) for item in items], items_size, repeat,
+            )
+        return {
+            'bytes': size,
+            'identical': renderers['fast-json'].render(data) == content,
+            'bytes_per_second': {name: round(rate) for name, rate in rates.items()},
+            'render_speedup': round(rates['render:fast-json'] / rates['render:drf-json'], 2),
+            'parse_speedup': round(rates['parse:fast-json'] / rates['parse:drf-json'], 2),
+            'parse_items_speedup': round(rates['parse-items:fast-json'] / rates['parse-items:drf-json'], 2),
+        }
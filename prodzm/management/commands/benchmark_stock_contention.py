@@ -0,0 +1,92 @@
+import threading
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from prodzm.models import Category, Customer, Order, OrderItem, Product
+from prodzm.services import InsufficientStock, place_order
+
+
+class Command(BaseCommand):
+    """
+    Flash-sale contention benchmark for order placement.
+    Many threads race to buy the same product until it sells out, then the command checks
+    that nothing was oversold and that the stock, order counter and order items agree.
+    Runs against the configured database and removes its data afterwards.
+    Example: python manage.py benchmark_stock_contention --threads 32 --stock 200
+    """
+    help = "Benchmark concurrent order placement on a single product and check it never oversells."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16, help="Number of concurrent buyers.")
+        parser.add_argument('--stock', type=int, default=100, help="Initial stock of the product on sale.")
+        parser.add_argument('--quantity', type=int, default=1, help="Units bought per order.")
+
+    def handle(self, *args, **options):
+        threads, stock, quantity = options['threads'], options['stock'], options['quantity']
+        tag = uuid.uuid4().hex[:8]
+        category = Category.objects.create(name=f"benchmark-{tag}")
+        product = Product.objects.create(
+            name=f"Flash sale {tag}", description="Contention benchmark product.", price=10,
+            shipping_cost=0, remaining_stock=stock, category=category, sku=f"BENCH-{tag}", supplier="benchmark",
+        )
+        customer = Customer.objects.create(
+            first_name="Bench", last_name=tag, email=f"bench-{tag}@example.com", shipping_address="-",
+        )
+
+        stats = {'placed': 0, 'sold_out': 0, 'retried': 0}
+        lock = threading.Lock()
+
+        def buyer():
+            try:
+                while True:
+                    try:
+                        place_order(customer, [{'product': product, 'quantity': quantity}])
+                        outcome = 'placed'
+                    except InsufficientStock:
+                        outcome = 'sold_out'
+                    except OperationalError:
+                        outcome = 'retried'  # e.g. SQLite "database is locked" under write contention
+                    with lock:
+                        stats[outcome] += 1
+                    if outcome == 'sold_out':
+                        return
+                    if outcome == 'retried':
+                        time.sleep(0.005)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=buyer) for _ in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        try:
+            product.refresh_from_db()
+            orders = Order.objects.filter(customer=customer).count()
+            units = sum(OrderItem.objects.filter(product=product).values_list('quantity', flat=True))
+
+            self.stdout.write(f"threads:          {threads}")
+            self.stdout.write(f"orders placed:    {stats['placed']} in {elapsed:.2f}s ({stats['placed'] / elapsed:.1f} orders/s)")
+            self.stdout.write(f"sold-out replies: {stats['sold_out']}")
+            self.stdout.write(f"lock retries:     {stats['retried']}")
+            self.stdout.write(f"remaining stock:  {product.remaining_stock}")
+
+            expected_orders = stock // quantity
+            problems = []
+            if units + product.remaining_stock != stock:
+                problems.append(f"{units} units sold + {product.remaining_stock} left != {stock} initial stock")
+            if orders != stats['placed'] or orders != expected_orders:
+                problems.append(f"{orders} orders stored, {stats['placed']} placed, {expected_orders} expected")
+            if product.orders != orders:
+                problems.append(f"orders counter is {product.orders}, expected {orders}")
+        finally:
+            category.delete()
+            customer.delete()
+
+        if problems:
+            raise CommandError("Stock reservation is inconsistent: " + "; ".join(problems))
+        self.stdout.write(self.style.SUCCESS("No overselling: stock, order counter and order items are consistent."))
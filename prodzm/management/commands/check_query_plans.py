@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from prodzm.services import explain_hot_queries
+
+
+class Command(BaseCommand):
+    """
+    Runs EXPLAIN (QUERY PLAN) on every registered hot query and fails if any of them
+    falls back to a full table scan. The database must be fully migrated, since plans
+    depend on the indexes the migrations create.
+    Example: python manage.py check_query_plans --verbose
+    """
+    help = "Check that every hot query path is served by an index."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help="Database alias to explain the queries on.")
+        parser.add_argument('--verbose', action='store_true', help="Print the full plan of every query.")
+
+    def handle(self, *args, **options):
+        executor = MigrationExecutor(connections[options['database']])
+        pending = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if pending:
+            names = ', '.join(f"{migration.app_label}.{migration.name}" for migration, _ in pending[:5])
+            raise CommandError(
+                f"Database '{options['database']}' has {len(pending)} unapplied migrations ({names}"
+                f"{', ...' if len(pending) > 5 else ''}): run `python manage.py migrate` first."
+            )
+
+        failures = []
+        for result in explain_hot_queries(options['database']):
+            if result.full_scans:
+                failures.append(result)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {result.name}: {', '.join(result.full_scans)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok         {result.name}"))
+
+            if options['verbose'] or result.full_scans:
+                for line in result.plan.splitlines():
+                    self.stdout.write(f"    {line}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries fall back to a full table scan.")
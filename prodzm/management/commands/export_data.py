@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from prodzm.services import (
+    ORDER_EXPORT_COLUMNS,
+    PRODUCT_EXPORT_COLUMNS,
+    export_orders,
+    export_products,
+    parse_export_datetime,
+    stream_export,
+)
+
+
+class Command(BaseCommand):
+    """
+    Streams orders (one row per order item, with customer and shipping) or the product
+    catalog as CSV or NDJSON, with constant memory use, like the `/orders/export/<format>/`
+    and `/products/export/<format>/` endpoints.
+    Example: python manage.py export_data orders --format ndjson --since 2025-01-01 --output orders.ndjson
+    """
+    help = "Export orders or products as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=['orders', 'products'], help="What to export.")
+        parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv', help="Output format.")
+        parser.add_argument('--output', help="Output file (stdout if omitted).")
+        parser.add_argument('--since', help="Orders created on or after this ISO date or datetime.")
+        parser.add_argument('--until', help="Orders created on or before this ISO date or datetime.")
+        parser.add_argument('--status', help="Only orders with this status.")
+        parser.add_argument('--category', help="Only products of this category.")
+        parser.add_argument('--database', default='default', help="Database alias to export from.")
+
+    def handle(self, *args, **options):
+        if options['dataset'] == 'orders':
+            try:
+                since = parse_export_datetime(options['since']) if options['since'] else None
+                until = parse_export_datetime(options['until'], end=True) if options['until'] else None
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            columns = ORDER_EXPORT_COLUMNS
+            rows = export_orders(since=since, until=until, status=options['status'], using=options['database'])
+        else:
+            columns = PRODUCT_EXPORT_COLUMNS
+            rows = export_products(category=options['category'], using=options['database'])
+
+        chunks = stream_export(options['format'], columns, rows)
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            output.writelines(chunks)
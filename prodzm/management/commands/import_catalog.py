@@ -0,0 +1,90 @@
+import csv
+import json
+import sys
+import time
+from itertools import chain
+from django.core.management.base import BaseCommand, CommandError
+from prodzm.services import UnreadableRow, import_catalog
+
+
+def read_csv(file):
+    """
+    Returns the columns of a CSV feed and a lazy iterator over its rows.
+    """
+    reader = csv.DictReader(file)
+    return reader.fieldnames or [], reader
+
+
+def read_json_lines(file):
+    """
+    Returns the columns of a JSON Lines feed (the keys of its first object, which every row
+    may use) and a lazy iterator over its rows. Malformed lines are returned as
+    UnreadableRow, so they are reported like invalid rows.
+    """
+    rows = (decode_json_line(number, line) for number, line in enumerate(file, 1) if line.strip())
+    head = []
+    for row in rows:
+        head.append(row)
+        if isinstance(row, dict):
+            return list(row), chain(head, rows)
+    return [], iter(head)
+
+
+def decode_json_line(number, line):
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as exc:
+        return UnreadableRow(f"invalid JSON on line {number}: {exc.msg}")
+
+
+class Command(BaseCommand):
+    """
+    Streams a supplier catalog feed (CSV or JSON Lines) into the database, upserting
+    categories by name and products by SKU in batches, and syncing their images.
+    Memory use is bounded by the batch size, whatever the size of the feed.
+
+    Columns: sku, category, name, price, description, shipping_cost, remaining_stock, rating,
+    supplier, images (a list, or `|` separated paths in CSV) and main_image (defaults to the
+    first image). Only the columns present in the feed are updated on existing products:
+    the header of a CSV feed, or the keys of the first row of a JSON Lines feed.
+    Example: python manage.py import_catalog feed.jsonl --batch-size 2000
+    """
+    help = "Import products, categories and images from a CSV or JSON Lines catalog feed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path of the feed, or - to read from stdin.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Feed format (guessed from the file extension by default).")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows written per transaction.")
+        parser.add_argument('--database', default='default', help="Database alias to import into.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        feed_format = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        reader = read_csv if feed_format == 'csv' else read_json_lines
+
+        file = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            columns, rows = reader(file)
+            if 'sku' not in columns or 'category' not in columns:
+                raise CommandError("The feed needs at least a sku and a category column.")
+
+            totals = {'rows': 0, 'created': 0, 'updated': 0, 'images': 0, 'errors': 0}
+            started = time.perf_counter()
+            for batch in import_catalog(rows, columns, batch_size=options['batch_size'], using=options['database']):
+                for name in ('rows', 'created', 'updated', 'images'):
+                    totals[name] += getattr(batch, name)
+                totals['errors'] += len(batch.errors)
+                for number, message in batch.errors:
+                    self.stderr.write(f"row {number}: {message}" if number else message)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"{totals['rows']} rows ({totals['rows'] / elapsed:.0f} rows/s)")
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {totals['rows']} rows in {elapsed:.1f}s ({totals['rows'] / max(elapsed, 1e-9):.0f} rows/s): "
+            f"{totals['created']} products created, {totals['updated']} updated, {totals['images']} images added, "
+            f"{totals['errors']} rows skipped."
+        ))
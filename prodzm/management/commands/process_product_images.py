@@ -0,0 +1,45 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from prodzm.models import ProductImage
+from prodzm.services import run_image_job
+
+
+class Command(BaseCommand):
+    """
+    Backfills the resized JPEG and WebP derivatives of existing product images, e.g. images
+    uploaded before the pipeline existed or loaded by import_catalog and fixtures, which
+    bypass the upload signal. Images already processed from their current file are skipped.
+    Example: python manage.py process_product_images --workers 8
+    """
+    help = "Generate the thumbnail, medium and large derivatives of product images."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerate derivatives of images already processed.")
+        parser.add_argument('--workers', type=int, default=4, help="Processing threads.")
+        parser.add_argument('--database', default='default', help="Database alias of the images.")
+
+    def handle(self, *args, **options):
+        queryset = ProductImage.objects.using(options['database']).order_by('pk')
+        if not options['force']:
+            queryset = queryset.filter(derivatives={})
+        image_ids = list(queryset.values_list('pk', flat=True))
+
+        totals = Counter()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='prodzm-images') as executor:
+            jobs = executor.map(
+                lambda image_id: run_image_job(image_id, options['force'], options['database'], worker=True),
+                image_ids,
+            )
+            for number, outcome in enumerate(jobs, 1):
+                totals[outcome] += 1
+                if number % 100 == 0:
+                    self.stdout.write(f"{number}/{len(image_ids)} images")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {totals['processed']} images in {elapsed:.1f}s: "
+            f"{totals['skipped']} skipped, {totals['failed']} failed (missing or unreadable files)."
+        ))
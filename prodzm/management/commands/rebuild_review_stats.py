@@ -0,0 +1,27 @@
+from itertools import islice
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from prodzm.cache import bump_model_version, bump_object_versions
+from prodzm.models import Category, Product
+from prodzm.services import rebuild_review_stats
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the denormalized review statistics (count, sum and histogram) of every product.
+    Example: python manage.py rebuild_review_stats --batch-size 2000
+    """
+    help = "Rebuild denormalized review statistics for all products."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Number of products written per bulk update.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_review_stats(batch_size=options['batch_size'])
+        bump_model_version(Product)
+        product_ids = Product.objects.values_list('pk', flat=True).iterator(chunk_size=options['batch_size'])
+        while batch := list(islice(product_ids, options['batch_size'])):
+            bump_object_versions(Product, batch)
+        bump_object_versions(Category, Category.objects.values_list('pk', flat=True))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt review statistics for {updated} products."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from prodzm.services import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the product full-text search index, e.g. after bulk imports that bypass model signals.
+    Example: python manage.py rebuild_search_index
+    """
+    help = "Rebuild the product full-text search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help="Database alias to rebuild the index on.")
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options['database'])
+        with transaction.atomic(using=options['database']):
+            indexed = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} products with {type(backend).__name__}."))
@@ -0,0 +1,64 @@
+import multiprocessing
+import signal
+from django.core.management.base import BaseCommand
+from django.db import connections
+from prodzm.services import TaskWorker, get_task_stats
+
+
+class Command(BaseCommand):
+    """
+    Runs task queue workers, which execute the deferred work enqueued by the application
+    (order totals, image processing...) with retries and exponential backoff.
+    Several workers can run side by side, in this command's processes or on other hosts.
+    SIGINT/SIGTERM stop the workers after their current task.
+    Example: python manage.py run_tasks --processes 4
+    """
+    help = "Run task queue workers, or print task statistics with --stats."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help="Worker processes to start.")
+        parser.add_argument('--sleep', type=float, default=1.0, help="Seconds between polls of an empty queue.")
+        parser.add_argument('--batch-size', type=int, default=20, help="Tasks claimed at once.")
+        parser.add_argument('--burst', action='store_true', help="Exit once the queue is empty.")
+        parser.add_argument('--stats', action='store_true', help="Print per task statistics and exit.")
+        parser.add_argument('--database', default='default', help="Database alias of the queue.")
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            return self.print_stats(options['database'])
+
+        if options['processes'] <= 1:
+            self.work(options)
+            return
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=self.work, args=(options,)) for _ in range(options['processes'])]
+        for process in processes:
+            process.start()
+        signal.signal(signal.SIGINT, lambda *_: None)  # Children stop on their own
+        signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in processes])
+        for process in processes:
+            process.join()
+
+    def work(self, options):
+        worker = TaskWorker(using=options['database'], batch_size=options['batch_size'])
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+        self.stdout.write(f"Worker {worker.name} started.")
+        worker.run(sleep=options['sleep'], burst=options['burst'])
+        self.stdout.write(f"Worker {worker.name} stopped.")
+
+    def print_stats(self, database):
+        stats = get_task_stats(using=database)
+        if not stats:
+            self.stdout.write("No tasks.")
+            return
+        for name, row in stats.items():
+            average = f"{row['avg_duration'] * 1000:.1f}ms" if row['avg_duration'] is not None else "-"
+            maximum = f"{row['max_duration'] * 1000:.1f}ms" if row['max_duration'] is not None else "-"
+            self.stdout.write(
+                f"{name}: {row['pending']} pending, {row['running']} running, {row['done']} done, "
+                f"{row['failed']} failed, {row['retried']} retried, avg {average}, max {maximum}"
+            )
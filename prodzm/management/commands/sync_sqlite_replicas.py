@@ -0,0 +1,32 @@
+import sqlite3
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Copies the primary SQLite database into the files of the read replicas (`DB_REPLICAS`),
+    with SQLite's online backup, standing in for replication when testing replica routing
+    locally. Run it again (or periodically) to catch the replicas up.
+    Example: DB_REPLICAS=replica.sqlite3 python manage.py sync_sqlite_replicas
+    """
+    help = "Copy the primary SQLite database to the read replicas."
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES['default']
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("Only SQLite replicas can be synced: use the database's own replication.")
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No read replicas configured: set DB_REPLICAS.")
+
+        source = sqlite3.connect(primary['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f"Synced {alias} ({settings.DATABASES[alias]['NAME']}).")
+        finally:
+            source.close()
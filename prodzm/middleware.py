@@ -0,0 +1,104 @@
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+from prodzm.profiling import RequestProfile, get_metrics
+from prodzm.replicas import get_replicas, pin_to_primary
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a sample of requests (`PROFILING_SAMPLE_RATE`, from 0 to 1): total time, SQL
+    query count and time, duplicated query fingerprints, serializer field and rendering time.
+    Profiled responses get a `Server-Timing` header, and their numbers are aggregated per
+    endpoint into the metrics exposed at `/metrics/`. Supports both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        with self.profile(request) as profile, self.wrap_connections(profile):
+            response = self.get_response(request)
+        return self.record(request, response)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        with self.profile(request) as profile:
+            # Queries run in the request's sync_to_async thread, which has its own connections
+            wrappers = await sync_to_async(self.wrap_connections)(profile)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(wrappers.close)()
+        return self.record(request, response)
+
+    def sampled(self):
+        return self.sample_rate and random.random() < self.sample_rate
+
+    @contextmanager
+    def profile(self, request):
+        profile = RequestProfile()
+        request.profile = profile
+        token = profile.activate()
+        try:
+            yield profile
+        finally:
+            profile.deactivate(token)
+
+    @staticmethod
+    def wrap_connections(profile):
+        """
+        Times the queries of the current thread's connections with `profile`, until the
+        returned ExitStack is closed.
+        """
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile))
+        return stack
+
+    def record(self, request, response):
+        match = request.resolver_match
+        get_metrics().record(match.view_name if match else 'unresolved', request.method, request.profile)
+        response['Server-Timing'] = request.profile.server_timing()
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before DRF responses are rendered, the callback runs right after
+        profile = getattr(request, 'profile', None)
+        if profile is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                profile.render_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+class ReplicaPinningMiddleware(MiddlewareMixin):
+    """
+    Pins clients to the primary database for `REPLICA_PIN_SECONDS` after a successful write
+    request (through a cookie), so their following reads see their own writes even if the
+    read replicas lag behind. Supports both WSGI and ASGI, so async views stay async.
+    """
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and get_replicas():
+            pin_to_primary(response)
+        return response
@@ -0,0 +1,97 @@
+# Generated by Django 5.1.5 on 2026-10-17 22:56
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_review_stats(apps, schema_editor):
+    Product = apps.get_model("prodzm", "Product")
+    Review = apps.get_model("prodzm", "Review")
+
+    counts = defaultdict(dict)
+    rows = Review.objects.values("product_id", "rating").annotate(total=Count("id")).order_by()
+    for row in rows:
+        counts[row["product_id"]][row["rating"]] = row["total"]
+
+    products = list(Product.objects.filter(pk__in=counts.keys()))
+    for product in products:
+        histogram = counts[product.pk]
+        product.review_count = sum(histogram.values())
+        product.rating_sum = sum(stars * total for stars, total in histogram.items())
+        for stars in range(1, 6):
+            setattr(product, f"rating_{stars}_count", histogram.get(stars, 0))
+    Product.objects.bulk_update(
+        products,
+        [
+            "review_count",
+            "rating_sum",
+            "rating_1_count",
+            "rating_2_count",
+            "rating_3_count",
+            "rating_4_count",
+            "rating_5_count",
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prodzm", "0011_alter_order_total_price"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="rating_1_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Number of 1 star reviews."
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_2_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Number of 2 star reviews."
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_3_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Number of 3 star reviews."
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_4_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Number of 4 star reviews."
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_5_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Number of 5 star reviews."
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_sum",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Sum of all review ratings for this product."
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="review_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Number of reviews left for this product."
+            ),
+        ),
+        migrations.RunPython(populate_review_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prodzm", "0013_product_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(fields=["name"], name="category_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["-created_at", "id"], name="order_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["customer", "-created_at"], name="order_customer_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["status", "-created_at"], name="order_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["-orders", "id"], name="product_orders_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["price"], name="product_price_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "-orders", "-rating", "id"],
+                name="product_category_orders_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productimage",
+            index=models.Index(
+                fields=["product", "-is_main"], name="productimage_main_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(fields=["-created_at", "id"], name="review_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["product", "-created_at"], name="review_product_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shipping",
+            index=models.Index(fields=["status"], name="shipping_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="shipping",
+            index=models.Index(fields=["shipped_at"], name="shipping_shipped_at_idx"),
+        ),
+    ]
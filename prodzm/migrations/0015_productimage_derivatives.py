@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prodzm', '0014_query_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized JPEG and WebP variants of the image, generated in the background.'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prodzm', '0015_productimage_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Registered name of the task function.', max_length=255)),
+                ('kwargs', models.JSONField(blank=True, default=dict, help_text='Keyword arguments the task is called with.')),
+                ('dedupe_key', models.CharField(blank=True, help_text='Only one pending task may have a given key.', max_length=255, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', help_text='Current status of the task.', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Number of times the task was started.')),
+                ('max_attempts', models.PositiveIntegerField(default=5, help_text='Attempts after which a failing task is given up.')),
+                ('run_at', models.DateTimeField(help_text='Earliest time the task may run, pushed back when it is retried.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the task was enqueued.')),
+                ('started_at', models.DateTimeField(blank=True, help_text='Date and time when the last attempt started.', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, help_text='Date and time when the last attempt finished.', null=True)),
+                ('duration', models.FloatField(blank=True, help_text='Duration of the last attempt, in seconds.', null=True)),
+                ('worker', models.CharField(blank=True, help_text='Worker running or last having run the task.', max_length=255)),
+                ('last_error', models.TextField(blank=True, help_text='Traceback of the last failed attempt.')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_at'], name='task_status_run_at_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('dedupe_key',), name='task_pending_dedupe_key')],
+            },
+        ),
+    ]
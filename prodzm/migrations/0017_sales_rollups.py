@@ -0,0 +1,235 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prodzm", "0016_task_queue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "day",
+                    models.DateField(
+                        help_text="Day the orders were created.", unique=True
+                    ),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Sum of unit price times quantity.",
+                        max_digits=14,
+                    ),
+                ),
+                (
+                    "units",
+                    models.PositiveIntegerField(
+                        help_text="Sum of the quantities ordered."
+                    ),
+                ),
+                (
+                    "orders",
+                    models.PositiveIntegerField(help_text="Number of orders."),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Name of the rollup.", max_length=100, unique=True
+                    ),
+                ),
+                (
+                    "last_id",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Id of the last settled order item rolled up.",
+                    ),
+                ),
+                (
+                    "pending_id",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Id of the last order item rolled up, not settled yet.",
+                    ),
+                ),
+                (
+                    "pending_since",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Date and time when pending_id was rolled up.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Date and time of the last refresh."
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyCategorySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "day",
+                    models.DateField(help_text="Day the orders were created."),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Sum of unit price times quantity.",
+                        max_digits=14,
+                    ),
+                ),
+                (
+                    "units",
+                    models.PositiveIntegerField(
+                        help_text="Sum of the quantities ordered."
+                    ),
+                ),
+                (
+                    "orders",
+                    models.PositiveIntegerField(
+                        help_text="Number of orders containing products of the category."
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        help_text="Category of the products sold.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="prodzm.category",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["-day", "id"], name="dailycategorysales_day_idx"
+                    ),
+                    models.Index(
+                        fields=["category", "-day"], name="dailycategorysales_cat_idx"
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "category"),
+                        name="dailycategorysales_day_category",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyProductSales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "day",
+                    models.DateField(help_text="Day the orders were created."),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Sum of unit price times quantity.",
+                        max_digits=14,
+                    ),
+                ),
+                (
+                    "units",
+                    models.PositiveIntegerField(
+                        help_text="Sum of the quantities ordered."
+                    ),
+                ),
+                (
+                    "orders",
+                    models.PositiveIntegerField(
+                        help_text="Number of orders containing the product."
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        help_text="Category of the product when rolled up.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="prodzm.category",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        help_text="Product sold.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="prodzm.product",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["-day", "id"], name="dailyproductsales_day_idx"
+                    ),
+                    models.Index(
+                        fields=["product", "-day"], name="dailyproductsales_product_idx"
+                    ),
+                    models.Index(
+                        fields=["category", "-day"],
+                        name="dailyproductsales_category_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "product"), name="dailyproductsales_day_product"
+                    )
+                ],
+            },
+        ),
+    ]
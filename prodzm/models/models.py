@@ -1,6 +1,5 @@
 from django.db import models
 from prodzm.utils import product_image_upload_path
-from django.db.models import Sum, F
 
 class Category(models.Model):
     """
@@ -9,6 +8,11 @@ class Category(models.Model):
     name = models.CharField(max_length=255, help_text="The name of the category.")
     description = models.TextField(blank=True, help_text="Optional description of the category.")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], name='category_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -28,10 +32,39 @@ class Product(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, help_text="Category to which this product belongs.")
     sku = models.CharField(max_length=255, unique=True, help_text="Unique Stock Keeping Unit (SKU) for this product.")
     supplier = models.CharField(max_length=255, help_text="Name of the product supplier.")
+    review_count = models.PositiveIntegerField(default=0, help_text="Number of reviews left for this product.")
+    rating_sum = models.PositiveIntegerField(default=0, help_text="Sum of all review ratings for this product.")
+    rating_1_count = models.PositiveIntegerField(default=0, help_text="Number of 1 star reviews.")
+    rating_2_count = models.PositiveIntegerField(default=0, help_text="Number of 2 star reviews.")
+    rating_3_count = models.PositiveIntegerField(default=0, help_text="Number of 3 star reviews.")
+    rating_4_count = models.PositiveIntegerField(default=0, help_text="Number of 4 star reviews.")
+    rating_5_count = models.PositiveIntegerField(default=0, help_text="Number of 5 star reviews.")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-orders', 'id'], name='product_orders_idx'),
+            models.Index(fields=['price'], name='product_price_idx'),
+            models.Index(fields=['category', '-orders', '-rating', 'id'], name='product_category_orders_idx'),
+        ]
     
     def __str__(self):
         return self.name
 
+    @property
+    def average_rating(self):
+        """
+        Returns the average review rating, computed from the denormalized review statistics.
+        """
+        if not self.review_count:
+            return 0
+        return self.rating_sum / self.review_count
+
+    def rating_histogram(self):
+        """
+        Returns the number of reviews per star rating, e.g. `{1: 0, 2: 1, 3: 4, 4: 10, 5: 7}`.
+        """
+        return {stars: getattr(self, f'rating_{stars}_count') for stars in range(1, 6)}
+
     def is_available(self):
         """
         Returns whether the product is available based on remaining stock.
@@ -68,6 +101,12 @@ class ProductImage(models.Model):
     image = models.ImageField(upload_to=product_image_upload_path, help_text="Image file for the product.")
     product = models.ForeignKey(Product, related_name='images', on_delete=models.CASCADE, help_text="Product associated with this image.")
     is_main = models.BooleanField(default=False, help_text="Whether this image is the main product image.")
+    derivatives = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized JPEG and WebP variants of the image, generated in the background.")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', '-is_main'], name='productimage_main_idx'),
+        ]
 
     def __str__(self):
         return f"Image for {self.product.name} {'(Main)' if self.is_main else '(Additional)'}"
@@ -77,8 +116,8 @@ class ProductImage(models.Model):
         Ensure only one image is set as the main image for a product.
         """
         if self.is_main:
-            # Set all other images for the product to not be the main image
-            ProductImage.objects.filter(product=self.product).update(is_main=False)
+            # Unflag the current main image, if any (an indexed single row update, no product fetch)
+            ProductImage.objects.filter(product_id=self.product_id, is_main=True).exclude(pk=self.pk).update(is_main=False)
         super().save(*args, **kwargs)
 
 class Customer(models.Model):
@@ -109,6 +148,7 @@ class OrderItem(models.Model):
 class Order(models.Model):
     """
     Represents an order placed by a customer, containing details about the status and total price.
+    The total price is maintained from the order items by `prodzm.services.orders`.
     """
     customer = models.ForeignKey('Customer', on_delete=models.CASCADE, help_text="Customer who placed the order.")
     created_at = models.DateTimeField(auto_now_add=True, help_text="Date and time when the order was created.")
@@ -120,15 +160,12 @@ class Order(models.Model):
     )
     total_price = models.DecimalField(null=True, blank=True, max_digits=10, decimal_places=2, help_text="Total price of the order.")
 
-    def save(self, *args, **kwargs):
-        # Calculate total price from related OrderItems
-        if self.pk and self.items.exists():
-            total = self.items.aggregate(
-                total=Sum(F('unit_price') * F('quantity'))
-            )['total'] or 0
-
-            self.total_price = total
-        return super().save(*args, **kwargs)
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='order_created_idx'),
+            models.Index(fields=['customer', '-created_at'], name='order_customer_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} by {self.customer}"
@@ -148,6 +185,12 @@ class Shipping(models.Model):
     shipped_at = models.DateTimeField(null=True, blank=True, help_text="Timestamp when the order was shipped.")
     delivered_at = models.DateTimeField(null=True, blank=True, help_text="Timestamp when the order was delivered.")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='shipping_status_idx'),
+            models.Index(fields=['shipped_at'], name='shipping_shipped_at_idx'),
+        ]
+
     def __str__(self):
         return f"Shipping for Order #{self.order.id}"
 
@@ -162,5 +205,124 @@ class Review(models.Model):
     comment = models.TextField(help_text="Text feedback or review provided by the customer.")
     created_at = models.DateTimeField(auto_now_add=True, help_text="Date and time when the review was created.")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='review_created_idx'),
+            models.Index(fields=['product', '-created_at'], name='review_product_created_idx'),
+        ]
+
     def __str__(self):
         return f"Review for {self.product.name} by {self.customer.first_name}"
+
+
+class DailySales(models.Model):
+    """
+    Materialized daily sales rollup: revenue, units and orders of all order items per day
+    (of the order's creation). Maintained by `prodzm.services.analytics`.
+    """
+    day = models.DateField(unique=True, help_text="Day the orders were created.")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, help_text="Sum of unit price times quantity.")
+    units = models.PositiveIntegerField(help_text="Sum of the quantities ordered.")
+    orders = models.PositiveIntegerField(help_text="Number of orders.")
+
+    def __str__(self):
+        return f"Sales of {self.day}"
+
+
+class DailyProductSales(models.Model):
+    """
+    Materialized daily sales rollup per product. See DailySales.
+    """
+    day = models.DateField(help_text="Day the orders were created.")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, help_text="Product sold.")
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, help_text="Category of the product when rolled up.")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, help_text="Sum of unit price times quantity.")
+    units = models.PositiveIntegerField(help_text="Sum of the quantities ordered.")
+    orders = models.PositiveIntegerField(help_text="Number of orders containing the product.")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'product'], name='dailyproductsales_day_product'),
+        ]
+        indexes = [
+            models.Index(fields=['-day', 'id'], name='dailyproductsales_day_idx'),
+            models.Index(fields=['product', '-day'], name='dailyproductsales_product_idx'),
+            models.Index(fields=['category', '-day'], name='dailyproductsales_category_idx'),
+        ]
+
+    def __str__(self):
+        return f"Sales of {self.product_id} on {self.day}"
+
+
+class DailyCategorySales(models.Model):
+    """
+    Materialized daily sales rollup per product category. See DailySales.
+    """
+    day = models.DateField(help_text="Day the orders were created.")
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, help_text="Category of the products sold.")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, help_text="Sum of unit price times quantity.")
+    units = models.PositiveIntegerField(help_text="Sum of the quantities ordered.")
+    orders = models.PositiveIntegerField(help_text="Number of orders containing products of the category.")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'category'], name='dailycategorysales_day_category'),
+        ]
+        indexes = [
+            models.Index(fields=['-day', 'id'], name='dailycategorysales_day_idx'),
+            models.Index(fields=['category', '-day'], name='dailycategorysales_cat_idx'),
+        ]
+
+    def __str__(self):
+        return f"Sales of category {self.category_id} on {self.day}"
+
+
+class RollupWatermark(models.Model):
+    """
+    Id of the last order item included in a materialized rollup, for incremental refreshes.
+    Ids are allocated on insert, not on commit: items above `last_id` are rolled up again by
+    every refresh until `pending_id`, the last id seen at `pending_since`, is old enough for
+    every transaction that could still add lower ids to have committed.
+    """
+    name = models.CharField(max_length=100, unique=True, help_text="Name of the rollup.")
+    last_id = models.BigIntegerField(default=0, help_text="Id of the last settled order item rolled up.")
+    pending_id = models.BigIntegerField(default=0, help_text="Id of the last order item rolled up, not settled yet.")
+    pending_since = models.DateTimeField(null=True, blank=True, help_text="Date and time when pending_id was rolled up.")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Date and time of the last refresh.")
+
+    def __str__(self):
+        return f"{self.name} up to item #{self.last_id}"
+
+
+class Task(models.Model):
+    """
+    A unit of deferred work in the database-backed task queue (see `prodzm.services.tasks`),
+    run by `python manage.py run_tasks` workers. Finished tasks are kept for a while for their
+    timing statistics.
+    """
+    STATUS_CHOICES = [('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')]
+
+    name = models.CharField(max_length=255, help_text="Registered name of the task function.")
+    kwargs = models.JSONField(default=dict, blank=True, help_text="Keyword arguments the task is called with.")
+    dedupe_key = models.CharField(max_length=255, null=True, blank=True, help_text="Only one pending task may have a given key.")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', help_text="Current status of the task.")
+    attempts = models.PositiveIntegerField(default=0, help_text="Number of times the task was started.")
+    max_attempts = models.PositiveIntegerField(default=5, help_text="Attempts after which a failing task is given up.")
+    run_at = models.DateTimeField(help_text="Earliest time the task may run, pushed back when it is retried.")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Date and time when the task was enqueued.")
+    started_at = models.DateTimeField(null=True, blank=True, help_text="Date and time when the last attempt started.")
+    finished_at = models.DateTimeField(null=True, blank=True, help_text="Date and time when the last attempt finished.")
+    duration = models.FloatField(null=True, blank=True, help_text="Duration of the last attempt, in seconds.")
+    worker = models.CharField(max_length=255, blank=True, help_text="Worker running or last having run the task.")
+    last_error = models.TextField(blank=True, help_text="Traceback of the last failed attempt.")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='task_status_run_at_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['dedupe_key'], condition=models.Q(status='pending'), name='task_pending_dedupe_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,182 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField
+
+__all__ = ['get_queryset_lookups', 'optimize_queryset']
+
+
+class QuerysetLookups:
+    """
+    The `select_related`, `prefetch_related` and `only` lookups needed to render a serializer.
+    `only` is None when some field reads attributes that can't be introspected.
+    """
+
+    def __init__(self):
+        self.select_related = []
+        self.prefetch_related = {}
+        self.only = []
+
+    def add_select(self, lookup):
+        if lookup not in self.select_related:
+            self.select_related.append(lookup)
+
+    def add_prefetch(self, lookup):
+        self.prefetch_related.setdefault(lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup, lookup)
+
+    def add_only(self, name):
+        if self.only is not None and name not in self.only:
+            self.only.append(name)
+
+    def apply(self, queryset, defer=True):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related.values())
+        if defer and self.only is not None:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def _resolve_source(model, source_attrs):
+    """
+    Resolves a field's `source` path against `model`.
+    Returns the list of model fields it traverses, or None if it reads anything but model
+    fields (properties, methods, the whole object).
+    """
+    path = []
+    for attr in source_attrs:
+        if model is None:
+            return None
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        path.append(field)
+        model = field.related_model
+    return path or None
+
+
+def _is_many(field):
+    return field.many_to_many or field.one_to_many
+
+
+def _collect(serializer, lookups, prefix, defer):
+    """
+    Adds the lookups needed by the fields of `serializer` (rendered as the `prefix` relation
+    of the queryset's model) to `lookups`.
+    """
+    model = serializer.Meta.model
+    opts = model._meta
+    only = [] if defer else None
+
+    # Foreign keys are cheap and often read by custom serializer code (e.g. cache keys)
+    if only is not None:
+        only.append(opts.pk.name)
+        only.extend(field.name for field in opts.concrete_fields if field.is_relation)
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        declared = (
+            getattr(serializer, 'select_related_fields', {}).get(name),
+            getattr(serializer, 'prefetch_related_fields', {}).get(name),
+        )
+        if any(declared):
+            # Fields the optimizer can't introspect (e.g. method fields) declare their lookups
+            for lookup in declared[0] or ():
+                lookups.add_select(prefix + lookup)
+            for lookup in declared[1] or ():
+                lookups.add_prefetch(prefix + lookup)
+            continue
+
+        path = _resolve_source(model, field.source_attrs)
+        if path is None:
+            only = None
+            continue
+        relation = '__'.join(model_field.name for model_field in path)
+        relations = [model_field for model_field in path if model_field.is_relation]
+
+        if isinstance(field, (serializers.ListSerializer, ManyRelatedField)):
+            if not relations or not _is_many(relations[-1]):
+                only = None
+                continue
+            child = getattr(field, 'child', None) or getattr(field, 'child_relation', None)
+            related_model = relations[-1].related_model
+            if isinstance(child, serializers.BaseSerializer):
+                lookups.add_prefetch(Prefetch(prefix + relation, queryset=optimize_queryset(
+                    related_model._default_manager.all(), child, defer=defer,
+                )))
+            else:
+                lookups.add_prefetch(prefix + relation)
+            continue
+
+        if any(_is_many(model_field) for model_field in relations):
+            # A many relation rendered by a single field can't be joined
+            only = None
+            continue
+
+        if isinstance(field, serializers.BaseSerializer):
+            lookups.add_select(prefix + relation)
+            nested = _collect(field, lookups, f'{prefix}{relation}__', defer)
+            if only is not None:
+                only.append(relation)
+                only.extend(f'{relation}__{name}' for name in nested or ())
+            continue
+
+        if isinstance(field, PrimaryKeyRelatedField) and len(path) == 1:
+            # Rendered from the foreign key column, no join needed
+            if only is not None:
+                only.append(relation)
+            continue
+
+        if isinstance(field, RelatedField) or len(path) > 1:
+            # Related objects are rendered (e.g. `str()` for StringRelatedField), join them whole
+            join = '__'.join(model_field.name for model_field in relations)
+            lookups.add_select(prefix + join)
+            if only is not None:
+                only.append(relations[0].name)
+            continue
+
+        if only is not None:
+            only.append(relation)
+
+    return only
+
+
+def get_queryset_lookups(serializer, defer=True, extra_fields=()):
+    """
+    Walks the fields of `serializer` (an instance, so sparse fieldsets and expansions apply)
+    and returns the QuerysetLookups rendering it needs:
+
+    - nested serializers on foreign keys are joined with `select_related`, recursively;
+    - nested `many=True` serializers are prefetched with a `Prefetch` whose queryset is
+      optimized the same way, and many related fields with a plain prefetch;
+    - related fields rendering the related object (`StringRelatedField`, `SlugRelatedField`...)
+      and dotted `source=` paths join their relations, while `PrimaryKeyRelatedField` reads
+      the foreign key column;
+    - when every field maps to model fields and `defer` is True, the columns are restricted
+      with `only()`, together with the primary key, foreign keys and `extra_fields`.
+
+    Fields backed by anything else (method fields, properties) can declare their lookups in
+    the serializer's `select_related_fields`/`prefetch_related_fields` mappings.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    lookups = QuerysetLookups()
+    lookups.only = _collect(serializer, lookups, '', defer)
+    model = serializer.Meta.model
+    for name in extra_fields:
+        try:
+            model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue  # e.g. annotations
+        lookups.add_only(name)
+    return lookups
+
+
+def optimize_queryset(queryset, serializer, defer=True, extra_fields=()):
+    """
+    Applies the lookups needed to render `serializer` to `queryset`. See `get_queryset_lookups`.
+    """
+    return get_queryset_lookups(serializer, defer=defer, extra_fields=extra_fields).apply(queryset, defer=defer)
@@ -0,0 +1,226 @@
+import json
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination over a composite, unique ordering such as `('-orders', 'id')`.
+
+    Unlike DRF's CursorPagination, which only keys on the first ordering field and falls back
+    to offsets for ties, the cursor position holds a value for every ordering field. Each page
+    is a single indexed range scan regardless of how deep the client has paged.
+
+    Views choose their ordering with a `pagination_ordering` attribute; the last field
+    should be unique (usually `id`) so that positions never tie.
+
+    Pass `?count=true` to include a total count. The count is exact up to `count_limit`
+    rows; above that an estimate from the database statistics is returned instead of
+    running a full `COUNT(*)`.
+    """
+    ordering = ('-id',)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_query_param = 'count'
+    count_limit = 1000
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'pagination_ordering', None) or self.ordering
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        self.count = self.get_count(queryset) if self.count_requested(request) else None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async version of `paginate_queryset`, fetching the page with the async ORM.
+        """
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        self.count = await self.aget_count(queryset) if self.count_requested(request) else None
+        return self.set_page([obj async for obj in page_queryset.aiterator(chunk_size=self.page_size + 1)])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Returns the queryset of the requested page (plus one row telling whether a following
+        page exists), ordered and filtered from the cursor, or None if pagination is off.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+        self.offset, self.reverse, self.current_position = offset, reverse, current_position
+
+        if reverse:
+            queryset = queryset.order_by(*[self._reverse_field(field) for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(current_position, reverse))
+
+        # Always fetch an extra item to know whether a following page exists
+        return queryset[offset:offset + self.page_size + 1]
+
+    def set_page(self, results):
+        """
+        Records the page from the rows fetched from `get_page_queryset()`, along with the
+        positions of the previous and next pages, and returns it.
+        """
+        offset, reverse, current_position = self.offset, self.reverse, self.current_position
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_keyset_filter(self, position, reverse):
+        """
+        Builds the row-value comparison `(f1, f2, ...) > (v1, v2, ...)` for the current
+        ordering as an equivalent OR of ANDs, honouring each field's direction.
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        keyset = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if reverse != field.startswith('-') else 'gt'
+            keyset |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return keyset
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(str(value))
+        return json.dumps(values)
+
+    def _reverse_field(self, field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def count_requested(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def get_count(self, queryset):
+        """
+        Returns `(count, is_exact)`. Counts at most `count_limit + 1` rows, and falls back to
+        the planner's row estimate for unfiltered querysets above that limit.
+        """
+        count = queryset.order_by()[:self.count_limit + 1].count()
+        if count <= self.count_limit:
+            return count, True
+
+        estimate = None
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+        return max(estimate or 0, count), False
+
+    async def aget_count(self, queryset):
+        """
+        Async version of `get_count`.
+        """
+        count = await queryset.order_by()[:self.count_limit + 1].acount()
+        if count <= self.count_limit:
+            return count, True
+
+        estimate = None
+        if not queryset.query.where:
+            estimate = await sync_to_async(estimate_table_rows)(queryset.model, queryset.db)
+        return max(estimate or 0, count), False
+
+    def get_paginated_payload(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if self.count is not None:
+            payload['count'], payload['count_is_exact'] = self.count
+        payload['results'] = data
+        return payload
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_payload(data))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {'type': 'integer', 'example': 123}
+        response_schema['properties']['count_is_exact'] = {'type': 'boolean'}
+        return response_schema
+
+
+def estimate_table_rows(model, using='default'):
+    """
+    Returns the database's own estimate of the number of rows in `model`'s table,
+    or None when no statistics are available.
+    - PostgreSQL: `pg_class.reltuples`, maintained by autovacuum/ANALYZE.
+    - SQLite: the row count recorded in `sqlite_stat1` by ANALYZE.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s AND idx IS NULL", [table])
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+                row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+    return None
@@ -0,0 +1,33 @@
+import codecs
+import io
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from prodzm.renderers import FastJSONRenderer, orjson
+
+# orjson parses integers beyond 64 bits as floats: bodies with runs of 20 digits aren't sent to it.
+# Digits are all translated to 0 to find such runs with a (much faster than regex) substring search.
+DIGITS = bytes.maketrans(b'123456789', b'000000000')
+LONG_NUMBER = b'0' * 20
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser decoding UTF-8 bodies with orjson when it is installed. Bodies orjson rejects
+    (invalid JSON, NaN...) or may misread (integers over 64 bits) are parsed by DRF's parser,
+    so the results and the parse errors are unchanged.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_NUMBER in body.translate(DIGITS):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
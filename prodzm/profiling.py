@@ -0,0 +1,248 @@
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from rest_framework import serializers
+
+__all__ = [
+    'RequestProfile',
+    'ProfiledFieldsMixin',
+    'get_current_profile',
+    'get_metrics',
+    'fingerprint_sql',
+    'format_labels',
+]
+
+_current_profile = ContextVar('prodzm_request_profile', default=None)
+
+
+def get_current_profile():
+    """
+    Returns the RequestProfile of the request being profiled, if any.
+    """
+    return _current_profile.get()
+
+
+def escape_label_value(value):
+    """
+    Escapes a label value of the Prometheus text format: backslashes, double quotes and
+    line feeds.
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(**labels):
+    """
+    Returns the `name="value"` pairs of a Prometheus sample, with escaped values.
+    """
+    return ','.join(f'{name}="{escape_label_value(value)}"' for name, value in labels.items())
+
+
+def fingerprint_sql(sql):
+    """
+    Normalizes a SQL statement so that queries differing only by their parameters share a
+    fingerprint, e.g. the N queries of an N+1 pattern.
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'%s', '?', sql)
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(...)', sql)
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+class RequestProfile:
+    """
+    Timings of a single profiled request: SQL queries (with their fingerprints), serializer
+    fields and rendering. Query timing is collected by using the profile as a database
+    execute wrapper.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.db_count = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.fingerprints = Counter()
+        self.field_times = defaultdict(float)
+        self.field_calls = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_count += 1
+            self.fingerprints[fingerprint_sql(sql)] += 1
+
+    def activate(self):
+        return _current_profile.set(self)
+
+    def deactivate(self, token):
+        _current_profile.reset(token)
+        self.duration = time.perf_counter() - self.started
+
+    def add_field(self, name, duration, calls=1):
+        self.field_times[name] += duration
+        self.field_calls[name] += calls
+
+    @property
+    def duplicates(self):
+        """
+        Fingerprints of the queries executed more than once, with their counts.
+        """
+        return {fingerprint: count for fingerprint, count in self.fingerprints.items() if count > 1}
+
+    def server_timing(self, fields=5):
+        """
+        Returns the value of a `Server-Timing` header: total, SQL and render time, plus the
+        `fields` slowest serializer fields (their time includes nested fields).
+        """
+        metrics = [
+            f'total;dur={self.duration * 1000:.2f}',
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.db_count} queries, {sum(self.duplicates.values())} duplicated"',
+        ]
+        if self.render_time:
+            metrics.append(f'render;dur={self.render_time * 1000:.2f}')
+        slowest = sorted(self.field_times.items(), key=lambda item: item[1], reverse=True)[:fields]
+        for index, (name, duration) in enumerate(slowest):
+            metrics.append(f'field{index};dur={duration * 1000:.2f};desc="{name} x{self.field_calls[name]}"')
+        return ', '.join(metrics)
+
+
+class ProfiledFieldsMixin:
+    """
+    Serializer mixin timing every field it renders while a request is profiled, by wrapping
+    the `get_attribute` and `to_representation` methods of its fields. Method fields are
+    reported by method name (e.g. `ProductSerializer.get_related_products`). Fields of
+    serializers created outside of profiled requests are left as they are.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if _current_profile.get() is None:
+            return fields
+        for field in fields.values():
+            for method, counted in (('get_attribute', False), ('to_representation', True)):
+                setattr(field, method, _profiled(field, getattr(field, method), type(self).__name__, counted))
+        return fields
+
+
+def _profiled(field, method, serializer_name, counted):
+    def wrapper(value):
+        profile = _current_profile.get()
+        if profile is None:  # E.g. the serializer outlived the request
+            return method(value)
+        started = time.perf_counter()
+        ret = method(value)
+        # Fields are bound (getting their name) after being wrapped
+        name = field.method_name if isinstance(field, serializers.SerializerMethodField) else field.field_name
+        profile.add_field(f'{serializer_name}.{name}', time.perf_counter() - started, calls=int(counted))
+        return ret
+
+    return wrapper
+
+
+# Upper bounds (in seconds) of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metrics:
+    """
+    In-process aggregate of the profiled requests, per endpoint and method.
+    Rendered in the Prometheus text exposition format by `render()`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.requests = Counter()
+        self.buckets = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+        self.duration = defaultdict(float)
+        self.db_queries = Counter()
+        self.db_duplicates = Counter()
+        self.db_time = defaultdict(float)
+        self.render_time = defaultdict(float)
+        self.field_time = defaultdict(float)
+        self.field_calls = Counter()
+
+    def record(self, endpoint, method, profile):
+        key = (endpoint, method)
+        with self._lock:
+            self.requests[key] += 1
+            self.duration[key] += profile.duration
+            buckets = self.buckets[key]
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if profile.duration <= bound:
+                    buckets[index] += 1
+            self.db_queries[key] += profile.db_count
+            self.db_duplicates[key] += sum(profile.duplicates.values())
+            self.db_time[key] += profile.db_time
+            self.render_time[key] += profile.render_time
+            for name, duration in profile.field_times.items():
+                self.field_time[key + (name,)] += duration
+                self.field_calls[key + (name,)] += profile.field_calls[name]
+
+    def render(self, extra=()):
+        """
+        Returns the metrics in the Prometheus text format. `extra` holds additional
+        `(name, type, help, {labels: value})` metrics to expose, their labels formatted
+        by `format_labels()`.
+        """
+        def labels(key, names=('endpoint', 'method', 'field')):
+            return format_labels(**dict(zip(names, key)))
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for sample_labels, value in samples:
+                lines.append(f'{name}{{{sample_labels}}} {value}' if sample_labels else f'{name} {value}')
+
+        with self._lock:
+            histogram = []
+            for key, count in sorted(self.requests.items()):
+                for bound, cumulative in zip(DURATION_BUCKETS, self.buckets[key]):
+                    histogram.append((f'{labels(key)},le="{bound}"', cumulative))
+                histogram.append((f'{labels(key)},le="+Inf"', count))
+            lines.append('# HELP prodzm_request_duration_seconds Duration of profiled requests.')
+            lines.append('# TYPE prodzm_request_duration_seconds histogram')
+            for sample_labels, value in histogram:
+                lines.append(f'prodzm_request_duration_seconds_bucket{{{sample_labels}}} {value}')
+            for key, count in sorted(self.requests.items()):
+                lines.append(f'prodzm_request_duration_seconds_sum{{{labels(key)}}} {self.duration[key]:.6f}')
+                lines.append(f'prodzm_request_duration_seconds_count{{{labels(key)}}} {count}')
+
+            metric('prodzm_request_db_queries_total', 'counter', "SQL queries run by profiled requests.",
+                   [(labels(key), value) for key, value in sorted(self.db_queries.items())])
+            metric('prodzm_request_db_duplicate_queries_total', 'counter',
+                   "SQL queries of profiled requests sharing their fingerprint with another query of the request.",
+                   [(labels(key), value) for key, value in sorted(self.db_duplicates.items())])
+            metric('prodzm_request_db_seconds_total', 'counter', "Time spent in SQL by profiled requests.",
+                   [(labels(key), f'{value:.6f}') for key, value in sorted(self.db_time.items())])
+            metric('prodzm_request_render_seconds_total', 'counter', "Time spent rendering profiled responses.",
+                   [(labels(key), f'{value:.6f}') for key, value in sorted(self.render_time.items())])
+            metric('prodzm_serializer_field_seconds_total', 'counter',
+                   "Time spent rendering serializer fields (including nested fields) in profiled requests.",
+                   [(labels(key), f'{value:.6f}') for key, value in sorted(self.field_time.items())])
+            metric('prodzm_serializer_field_calls_total', 'counter', "Serializer fields rendered in profiled requests.",
+                   [(labels(key), value) for key, value in sorted(self.field_calls.items())])
+
+        for name, kind, help_text, samples in extra:
+            metric(name, kind, help_text, list(samples.items()))
+        return '\n'.join(lines) + '\n'
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """
+    Returns the process-wide Metrics of profiled requests.
+    """
+    return _metrics
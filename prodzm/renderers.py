@@ -0,0 +1,91 @@
+import math
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional: the renderers fall back to the standard library
+    orjson = None
+
+# Types orjson would serialize differently from DRF's encoder are handed to `default()`
+ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+# U+2028 and U+2029 in UTF-8, escaped by DRF so the output is a strict javascript subset
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def has_non_finite_float(data):
+    """
+    Whether `data` (dicts, lists and tuples, at any depth) holds a NaN or infinite float.
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if type(value) is float:
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed, for several times the throughput.
+    Output is byte for byte the one of DRF's renderer: Decimal, datetimes, lazy strings, etc.
+    go through DRF's `JSONEncoder.default()`, and anything orjson can't encode (indented
+    output, non-string dict keys, integers over 64 bits...) is rendered by DRF's renderer.
+    That includes non-finite floats, which orjson renders as null: DRF's renderer raises
+    ValueError for them (the data is only searched for them when the output has a null).
+    """
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'null' in ret and has_non_finite_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        for separator, escaped in LINE_SEPARATORS:
+            ret = ret.replace(separator, escaped)
+        return ret
+
+
+class NDJSONRenderer(FastJSONRenderer):
+    """
+    Renders list endpoints as newline-delimited JSON, one result per line, for clients
+    streaming large listings (`?format=ndjson` or `Accept: application/x-ndjson`).
+    Pagination links are moved to a `Link` header.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if isinstance(data, dict) and 'results' in data:
+            self.set_link_header(renderer_context.get('response'), data)
+            items = data['results']
+        elif isinstance(data, (list, tuple)):
+            items = data
+        else:
+            items = [data]
+        lines = [super(NDJSONRenderer, self).render(item, None, {}) for item in items]
+        return b''.join(line + b'\n' for line in lines)
+
+    def set_link_header(self, response, data):
+        links = [f'<{data[rel]}>; rel="{rel}"' for rel in ('next', 'previous') if data.get(rel)]
+        if response is not None and links:
+            response['Link'] = ', '.join(links)
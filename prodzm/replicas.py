@@ -0,0 +1,111 @@
+import random
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Cookie pinning the clients that just wrote to the primary, valued with its expiry time
+PIN_COOKIE = 'prodzm_primary'
+
+# Replica alias the reads of the current request are routed to, if any
+_replica = ContextVar('replica', default=None)
+
+_routing_stats = Counter()
+_routing_stats_lock = threading.Lock()
+
+
+def get_replicas():
+    """
+    Returns the database aliases of the read replicas (the `DATABASE_REPLICAS` setting).
+    """
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+def get_pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+
+def is_pinned(request):
+    """
+    Whether the client wrote less than `REPLICA_PIN_SECONDS` ago, so it must read from the
+    primary to see its own writes through the replication lag.
+    """
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def activate_replica_reads(request):
+    """
+    Routes the reads of the current request to a replica (the same one for the whole
+    request), unless the client is pinned to the primary. Returns the token to pass to
+    `deactivate_replica_reads()`, or None if there are no replicas.
+    """
+    replicas = get_replicas()
+    if not replicas:
+        return None
+    if is_pinned(request):
+        alias, reason = DEFAULT_DB_ALIAS, 'pinned'
+    else:
+        alias, reason = random.choice(replicas), 'replica'
+    with _routing_stats_lock:
+        _routing_stats[alias, reason] += 1
+    return _replica.set(alias if reason == 'replica' else None)
+
+
+def deactivate_replica_reads(token):
+    _replica.reset(token)
+
+
+def pin_to_primary(response):
+    """
+    Pins the client of `response` to the primary for `REPLICA_PIN_SECONDS`.
+    """
+    seconds = get_pin_seconds()
+    response.set_cookie(PIN_COOKIE, f'{time.time() + seconds:.3f}', max_age=seconds, httponly=True, samesite='Lax')
+
+
+def may_be_stale(versions):
+    """
+    Whether data read now might predate the changes at `versions` (cache versions are
+    change times in milliseconds): reads go to a replica and one of them changed less than
+    `REPLICA_PIN_SECONDS` ago. Such data must not be cached under these versions.
+    """
+    if _replica.get() is None:
+        return False
+    return max(versions, default=0) > (time.time() - get_pin_seconds()) * 1000
+
+
+def get_routing_stats():
+    """
+    Returns the number of replica-enabled requests per `(database, reason)`, where the
+    reason is `replica` or `pinned` (the client wrote recently).
+    """
+    with _routing_stats_lock:
+        return dict(_routing_stats)
+
+
+class ReplicaRouter:
+    """
+    Routes the reads of replica-enabled requests (see `activate_replica_reads`) to their
+    replica, and everything else to the primary (`default`). Reads within a transaction on
+    the primary stay on the primary. Replicas are never migrated: they copy the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _replica.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in get_replicas()
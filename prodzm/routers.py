@@ -1,8 +1,15 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
 from prodzm.viewsets import (
     ProductViewSet, ProductImageViewSet, CategoryViewSet, ReviewViewSet,
-    CustomerViewSet, OrderViewSet, OrderItemViewSet, ShippingViewSet, UserViewSet
+    CustomerViewSet, OrderViewSet, OrderItemViewSet, ShippingViewSet, UserViewSet,
+    DailySalesViewSet, DailyProductSalesViewSet, DailyCategorySalesViewSet,
+    CacheStatsView, MetricsView,
+)
+from prodzm.viewsets.async_views import (
+    AsyncProductListView, AsyncProductDetailView, AsyncProductSearchView,
+    AsyncCategoryListView, AsyncCategoryDetailView,
 )
 
 # Create a router and register the ViewSets
@@ -16,6 +23,18 @@ router.register(r'customers', CustomerViewSet)
 router.register(r'orders', OrderViewSet)
 router.register(r'order-items', OrderItemViewSet)
 router.register(r'shipping', ShippingViewSet)
+router.register(r'analytics/sales', DailySalesViewSet)
+router.register(r'analytics/products', DailyProductSalesViewSet)
+router.register(r'analytics/categories', DailyCategorySalesViewSet)
 
 app_name = 'prodzm'
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path('cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    # Async-native catalog reads, for ASGI deployments
+    path('async/products/', AsyncProductListView.as_view(), name='async-product-list'),
+    path('async/products/search/', AsyncProductSearchView.as_view(), name='async-product-search'),
+    path('async/products/<int:pk>/', AsyncProductDetailView.as_view(), name='async-product-detail'),
+    path('async/categories/', AsyncCategoryListView.as_view(), name='async-category-list'),
+    path('async/categories/<int:pk>/', AsyncCategoryDetailView.as_view(), name='async-category-detail'),
+]
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from prodzm.models import (
     Category,
+    DailyCategorySales,
+    DailyProductSales,
+    DailySales,
     Product,
     ProductImage,
     Customer,
@@ -9,69 +12,266 @@ from prodzm.models import (
     Shipping,
     Review,
 )
+from prodzm.authentication import USER_CLAIMS
+from prodzm.cache import (
+    aget_object_versions,
+    bump_model_version,
+    bump_object_versions,
+    get_object_versions,
+    get_representation_cache,
+    get_representation_cache_timeout,
+)
+from prodzm.profiling import ProfiledFieldsMixin
+from prodzm.replicas import may_be_stale
+from prodzm.services import (
+    DERIVATIVE_FORMATS,
+    RelatedProductIndex,
+    create_order,
+    create_orders,
+    enqueue_order_totals,
+    place_order,
+    schedule_sales_rollups,
+)
 from django.contrib.auth.models import User
-from django.db.models.aggregates import Avg
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models.manager import BaseManager
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 import json
-class ProductImageSerializer(serializers.ModelSerializer):
+
+
+def parse_field_list(request, param):
+    """
+    Returns the set of names listed (comma separated) in the `param` query parameter.
+    """
+    if request is None:
+        return set()
+    return {name.strip() for name in request.query_params.get(param, '').split(',') if name.strip()}
+
+
+def parse_expand(request):
+    """
+    Returns the set of expanded fields requested with `?expand=`.
+    """
+    return parse_field_list(request, 'expand')
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer mixin for sparse fieldsets: only the fields named in `fields` are rendered
+    and those named in `omit` are dropped. Views pass them from `?fields=` and `?omit=`,
+    and their querysets only join and prefetch what the remaining fields need.
+    """
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.only_fields = fields
+        self.omit_fields = omit
+
+    @staticmethod
+    def is_field_selected(name, fields=None, omit=None):
+        return (fields is None or name in fields) and name not in (omit or ())
+
+    def get_fields(self):
+        fields = super().get_fields()
+        return {
+            name: field
+            for name, field in fields.items()
+            if self.is_field_selected(name, self.only_fields, self.omit_fields)
+        }
+
+
+class ImageSrcsetField(serializers.Field):
+    """
+    Renders the derivatives of a product image (see `prodzm.services.images`) as `srcset`
+    candidate strings per format, e.g. `{"webp": "/media/...-160.webp 160w, ...", "jpeg": ...}`,
+    plus the dimensions and URLs of every size. None until the image has been processed.
+    """
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value.get('sizes'):
+            return None
+        request = self.context.get('request')
+
+        def url(path):
+            path = default_storage.url(path)
+            return request.build_absolute_uri(path) if request else path
+
+        sizes = {
+            name: {**variant, **{file_format: url(variant[file_format]) for file_format in DERIVATIVE_FORMATS}}
+            for name, variant in value['sizes'].items()
+        }
+        srcset = {}
+        for file_format in DERIVATIVE_FORMATS:
+            candidates = {}
+            for variant in sorted(sizes.values(), key=lambda variant: variant['width']):
+                candidates.setdefault(variant['width'], f"{variant[file_format]} {variant['width']}w")  # Small originals repeat widths
+            srcset[file_format] = ', '.join(candidates.values())
+        return {**srcset, 'sizes': sizes}
+
+
+class ProductImageSerializer(ProfiledFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for ProductImage model.
     """
+    srcset = ImageSrcsetField(source='derivatives')
+
     class Meta:
         model = ProductImage
-        fields = ('id', 'image', 'is_main')
+        fields = ('id', 'image', 'is_main', 'srcset')
 
 
-class RelatedProductSerializer(serializers.ModelSerializer):
+class RelatedProductSerializer(ProfiledFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Product model.
     """
     images = ProductImageSerializer(many=True, read_only=True)
     category = serializers.StringRelatedField()  # Display category name
-    average_rating = serializers.FloatField(source='get_average_rating', read_only=True)
+    average_rating = serializers.FloatField(read_only=True)  # Denormalized review statistics
 
     class Meta:
         model = Product
         fields = (
             'id', 'name', 'category', 'price', 'remaining_stock', 'orders', 'rating', 
-            'average_rating', 'sku', 'images', 'is_available', 'has_images',
+            'average_rating', 'review_count', 'sku', 'images', 'is_available', 'has_images',
         )
-        read_only_fields = ('sku', 'average_rating')
+        read_only_fields = ('sku', 'average_rating', 'review_count')
+
+
+# Product fields whose representation depends on the product's category
+CATEGORY_DEPENDENT_FIELDS = {'category', 'related_products'}
+
+
+class ProductListSerializer(serializers.ListSerializer):
+    """
+    List serializer for Product model.
+    Resolves related products for the whole list in a constant number of queries,
+    and reads the representation cache versions of the whole list at once.
+    """
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        products = list(iterable)
+        self.child.page_products = products
+        self.child.related_index = None
+        self.child.load_versions(products)
+        return super().to_representation(products)
 
-    def get_average_rating(self, obj):
-        reviews = Review.objects.filter(product=obj)
-        if reviews.exists():
-            return reviews.aggregate(Avg('rating'))['rating__avg']
-        return 0
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(ProfiledFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Product model.
+    Representations are cached per product and field set in the process-wide representation
+    cache, shared by every serializer nesting products (e.g. order items).
     """
     images = ProductImageSerializer(many=True, read_only=True)
     category = serializers.StringRelatedField()  # Display category name
-    average_rating = serializers.FloatField(source='get_average_rating', read_only=True)
+    average_rating = serializers.FloatField(read_only=True)  # Denormalized review statistics
     related_products = serializers.SerializerMethodField()
     class Meta:
         model = Product
         fields = (
             'id', 'name', 'category', 'price', 'remaining_stock', 'orders', 'rating', 
-            'average_rating', 'sku', 'images', 'is_available', 'has_images', 'related_products'
+            'average_rating', 'review_count', 'sku', 'images', 'is_available', 'has_images', 'related_products'
         )
-        read_only_fields = ('sku', 'average_rating')
+        read_only_fields = ('sku', 'average_rating', 'review_count')
+        list_serializer_class = ProductListSerializer
+
+    def to_representation(self, instance):
+        cache = get_representation_cache()
+        key = self.get_representation_key(instance)
+        loaded = getattr(self, 'loaded_representations', None) or {}
+        data = loaded[key] if key in loaded else cache.get(key)
+        if data is None:
+            data = super().to_representation(instance)
+            if not may_be_stale([version for version in key[1:3] if version is not None]):
+                cache.set(key, data, len(json.dumps(data, cls=JSONEncoder)), timeout=get_representation_cache_timeout())
+        return data
+
+    def depends_on_category(self):
+        """
+        Whether the rendered fields depend on the product's category: its name, and the related
+        products, which change with any product, image or review of the category.
+        """
+        return not CATEGORY_DEPENDENT_FIELDS.isdisjoint(self.fields)
+
+    def load_versions(self, products):
+        """
+        Reads the cache versions of `products`, and of their categories when the representation
+        depends on them, with one cache round trip each.
+        """
+        if getattr(self, 'product_versions', None) is None:
+            self.product_versions, self.category_versions = {}, {}
+        self.product_versions.update(get_object_versions(Product, {product.pk for product in products}))
+        if self.depends_on_category():
+            self.category_versions.update(get_object_versions(Category, {product.category_id for product in products}))
+
+    async def aload_versions(self, products):
+        """
+        Async version of `load_versions()`.
+        """
+        if getattr(self, 'product_versions', None) is None:
+            self.product_versions, self.category_versions = {}, {}
+        self.product_versions.update(await aget_object_versions(Product, {product.pk for product in products}))
+        if self.depends_on_category():
+            self.category_versions.update(await aget_object_versions(Category, {product.category_id for product in products}))
+
+    def load_representations(self, products):
+        """
+        Reads the cached representations of `products` ahead of rendering, so they are used
+        even if evicted in the meantime, and returns the products that aren't cached.
+        """
+        if getattr(self, 'loaded_representations', None) is None:
+            self.loaded_representations = {}
+        cache = get_representation_cache()
+        missing = []
+        for product in products:
+            key = self.get_representation_key(product)
+            data = cache.get(key)
+            if data is None:
+                missing.append(product)
+            else:
+                self.loaded_representations[key] = data
+        return missing
+
+    def get_representation_key(self, instance):
+        """
+        Returns the representation cache key of a product: its id, its version (bumped whenever
+        the product, its images or its reviews change), the version of its category if the
+        fields depend on it, the origin used for absolute image URLs and the rendered field set.
+        """
+        if instance.pk not in (getattr(self, 'product_versions', None) or {}):
+            self.load_versions([instance])
+        category_version = self.category_versions[instance.category_id] if self.depends_on_category() else None
+
+        request = self.context.get('request')
+        origin = f"{request.scheme}://{request.get_host()}" if request else ''
+        return (instance.pk, self.product_versions[instance.pk], category_version, origin, tuple(self.fields))
+
+    def get_related_index(self, obj):
+        """
+        Returns the RelatedProductIndex covering `obj`.
+        The index is built lazily for the whole page (or for `obj` alone), so cached
+        representations cost no related-products queries. Views nesting products can
+        provide one for all of them as the `related_index` context entry.
+        """
+        index = getattr(self, 'related_index', None) or self.context.get('related_index')
+        if index is None or not index.covers(obj):
+            page = getattr(self, 'page_products', None) or []
+            index = RelatedProductIndex(page if obj in page else [obj])
+            self.related_index = index
+        return index
 
-    def get_average_rating(self, obj):
-        reviews = Review.objects.filter(product=obj)
-        if reviews.exists():
-            return reviews.aggregate(Avg('rating'))['rating__avg']
-        return 0
-    
     def get_related_products(self, obj):
-        """Fetch other products in the same category (excluding current product)"""
-        related = Product.objects.filter(category=obj.category).exclude(id=obj.id)
-        return RelatedProductSerializer(related, many=True).data
+        """Fetch the top ranked products in the same category (excluding current product)"""
+        index = self.get_related_index(obj)
+        return RelatedProductSerializer(index.related_to(obj), many=True, context=self.context).data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(ProfiledFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Review model.
     """
@@ -83,7 +283,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ('created_at',)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ProfiledFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for User model.
     """
@@ -93,7 +293,20 @@ class UserSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Token pair serializer embedding the user claims trusted by the stateless authentication mode.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class CustomerSerializer(ProfiledFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Customer model.
     """
@@ -102,11 +315,64 @@ class CustomerSerializer(serializers.ModelSerializer):
         fields = ('id', 'first_name', 'last_name', 'email', 'phone_number')
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class ExpandableFieldsMixin:
+    """
+    Serializer mixin replacing compact nested representations with full ones on demand.
+    `expandable_fields` maps a field name to the `(serializer_class, kwargs)` used when the
+    name is listed in the request's `?expand=` parameter.
+    """
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = parse_expand(self.context.get('request'))
+        for name, (serializer_class, kwargs) in self.expandable_fields.items():
+            if name in expand:
+                fields[name] = serializer_class(**kwargs)
+        return fields
+
+
+class ProductSummarySerializer(ProfiledFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Compact Product representation used when products are nested in other resources.
+    """
+    main_image = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+    prefetch_related_fields = {'main_image': ['images'], 'thumbnail': ['images']}  # For the queryset optimizer
+
+    class Meta:
+        model = Product
+        fields = ('id', 'name', 'sku', 'price', 'main_image', 'thumbnail')
+
+    def pick_main_image(self, obj):
+        # Picked from the (prefetched) images rather than filtered per product
+        images = list(obj.images.all())
+        return next((image for image in images if image.is_main), images[0] if images else None)
+
+    def build_url(self, path):
+        request = self.context.get('request')
+        return request.build_absolute_uri(path) if request else path
+
+    def get_main_image(self, obj):
+        image = self.pick_main_image(obj)
+        return self.build_url(image.image.url) if image else None
+
+    def get_thumbnail(self, obj):
+        # The JPEG thumbnail of the main image, or the original until it has been processed
+        image = self.pick_main_image(obj)
+        if image is None:
+            return None
+        thumbnail = image.derivatives.get('sizes', {}).get('thumb')
+        return self.build_url(default_storage.url(thumbnail['jpeg']) if thumbnail else image.image.url)
+
+
+class OrderItemSerializer(ProfiledFieldsMixin, DynamicFieldsMixin, ExpandableFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for OrderItem model.
+    Products are summarized unless requested with `?expand=product`.
     """
-    product = ProductSerializer(read_only=True)
+    product = ProductSummarySerializer(read_only=True)
+    expandable_fields = {'product': (ProductSerializer, {'read_only': True})}
     
     class Meta:
         model = OrderItem
@@ -114,7 +380,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
         read_only_fields = ('unit_price',)
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(ProfiledFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Order model.
     """
@@ -131,7 +397,106 @@ class OrderSerializer(serializers.ModelSerializer):
         return sum([item.quantity * item.unit_price for item in obj.items.all()])
 
 
-class ShippingSerializer(serializers.ModelSerializer):
+def resolve_order_relations(orders):
+    """
+    Replaces the customer and product ids of validated orders with model instances,
+    fetching them with one query per model for the whole batch.
+    """
+    customer_ids = {order['customer_id'] for order in orders}
+    product_ids = {item['product_id'] for order in orders for item in order['items']}
+    customers = Customer.objects.in_bulk(customer_ids)
+    products = Product.objects.in_bulk(product_ids)
+
+    errors = {}
+    if customer_ids - customers.keys():
+        errors['customer'] = [f"Customer {pk} does not exist." for pk in sorted(customer_ids - customers.keys())]
+    if product_ids - products.keys():
+        errors['items'] = [f"Product {pk} does not exist." for pk in sorted(product_ids - products.keys())]
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    for order in orders:
+        order['customer'] = customers[order.pop('customer_id')]
+        for item in order['items']:
+            item['product'] = products[item.pop('product_id')]
+    return orders
+
+
+class OrderItemCreateSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the items of a new order.
+    Products are referenced by id and resolved in bulk by the order serializer.
+    """
+    product = serializers.IntegerField(source='product_id', min_value=1)
+
+    class Meta:
+        model = OrderItem
+        fields = ('id', 'product', 'quantity', 'unit_price')
+        extra_kwargs = {
+            'quantity': {'min_value': 1},
+            'unit_price': {'required': False},  # Defaults to the current product price
+        }
+
+
+class OrderCreateListSerializer(serializers.ListSerializer):
+    """
+    List serializer creating many orders at once with a constant number of queries.
+    """
+    def validate(self, attrs):
+        return resolve_order_relations(attrs)
+
+    def create(self, validated_data):
+        return create_orders(validated_data)
+
+
+class OrderCreateSerializer(serializers.ModelSerializer):
+    """
+    Serializer for creating an Order together with all of its items.
+    The total is computed once from the items and everything is written in one transaction.
+    """
+    customer = serializers.IntegerField(source='customer_id', min_value=1)
+    items = OrderItemCreateSerializer(many=True, allow_empty=False)
+
+    class Meta:
+        model = Order
+        fields = ('id', 'customer', 'status', 'created_at', 'items', 'total_price')
+        read_only_fields = ('created_at', 'total_price')
+        list_serializer_class = OrderCreateListSerializer
+
+    def validate(self, attrs):
+        # Lists resolve relations for the whole batch in OrderCreateListSerializer
+        if not isinstance(self.parent, serializers.ListSerializer):
+            resolve_order_relations([attrs])
+        return attrs
+
+    def create(self, validated_data):
+        return create_order(**validated_data)
+
+
+class OrderItemPlaceSerializer(OrderItemCreateSerializer):
+    """
+    Serializer for the items of a placed order. Unit prices are snapshotted from the products.
+    """
+    class Meta(OrderItemCreateSerializer.Meta):
+        read_only_fields = ('unit_price',)
+        extra_kwargs = {'quantity': {'min_value': 1}}
+
+
+class OrderPlaceSerializer(OrderCreateSerializer):
+    """
+    Serializer for placing an order from a cart.
+    Reserves stock and creates the order and its items in one transaction.
+    """
+    items = OrderItemPlaceSerializer(many=True, allow_empty=False)
+
+    class Meta(OrderCreateSerializer.Meta):
+        read_only_fields = ('status', 'created_at', 'total_price')
+
+    def create(self, validated_data):
+        return place_order(validated_data['customer'], validated_data['items'])
+
+
+class ShippingSerializer(ProfiledFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Shipping model.
     """
@@ -142,10 +507,205 @@ class ShippingSerializer(serializers.ModelSerializer):
         fields = ('id', 'order', 'tracking_number', 'status', 'shipped_at', 'delivered_at')
         read_only_fields = ('shipped_at', 'delivered_at')
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(ProfiledFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Category model.
     """
     class Meta:
         model = Category
-        fields = ('id', 'name', 'description')
\ No newline at end of file
+        fields = ('id', 'name', 'description')
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    List serializer writing a whole batch of rows in one transaction: `create` inserts them
+    with `bulk_create` and `update` writes them with `bulk_update`. Updated rows carry the
+    `id` of an instance of the `instance` queryset, which is fetched with a single query.
+
+    Foreign keys listed in the child's `Meta.bulk_relations` (row key -> model) are checked
+    with one query per model for the whole batch. Bulk writes bypass model signals, so
+    the child's `bulk_saved(instances, previous)` applies their side effects instead, where
+    `previous` maps the id of every updated instance to its values before the update.
+    """
+    bulk_batch_size = 500
+
+    def to_internal_value(self, data):
+        # Batch errors are reported per row, like the errors of the rows themselves
+        attrs = super().to_internal_value(data)
+        errors = [{} for _ in attrs]
+        ids = [row.get('id') for row in attrs]
+        if self.instance is None:
+            for index, pk in enumerate(ids):
+                if pk is not None:
+                    errors[index]['id'] = ["Rows to create can't have an id."]
+            self.bulk_instances = {}
+        else:
+            self.bulk_instances = self.instance.in_bulk({pk for pk in ids if pk is not None})
+            seen = set()
+            for index, pk in enumerate(ids):
+                if pk is None:
+                    errors[index]['id'] = ["This field is required."]
+                elif pk not in self.bulk_instances:
+                    errors[index]['id'] = [f"Object {pk} does not exist."]
+                elif pk in seen:
+                    errors[index]['id'] = [f"Object {pk} is updated more than once."]
+                seen.add(pk)
+
+        for name, model in getattr(self.child.Meta, 'bulk_relations', {}).items():
+            wanted = {row[name] for row in attrs if name in row}
+            found = set(model.objects.filter(pk__in=wanted).values_list('pk', flat=True))
+            for index, row in enumerate(attrs):
+                if name in row and row[name] not in found:
+                    errors[index].setdefault(name.removesuffix('_id'), []).append(
+                        f"{model._meta.verbose_name.capitalize()} {row[name]} does not exist."
+                    )
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return self.child.validate_batch(attrs, self.bulk_instances)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        instances = [model(**row) for row in validated_data]
+        with transaction.atomic():
+            if connections[model.objects.db].features.can_return_rows_from_bulk_insert:
+                model.objects.bulk_create(instances, batch_size=self.bulk_batch_size)
+            else:
+                for instance in instances:
+                    instance.save()
+            self.child.bulk_saved(instances, {})
+        return instances
+
+    def update(self, instance, validated_data):
+        instances, previous, fields = [], {}, set()
+        for row in validated_data:
+            obj = self.bulk_instances[row.pop('id')]
+            previous[obj.pk] = {name: getattr(obj, name) for name in row}
+            for name, value in row.items():
+                setattr(obj, name, value)
+            fields.update(row)
+            instances.append(obj)
+        with transaction.atomic():
+            if fields:
+                self.child.Meta.model.objects.bulk_update(instances, sorted(fields), batch_size=self.bulk_batch_size)
+            self.child.bulk_saved(instances, previous)
+        return instances
+
+
+class BulkWriteSerializer(serializers.ModelSerializer):
+    """
+    Base of the flat serializers of bulk write endpoints (see BulkListSerializer).
+    Relations are plain ids, so rows are validated without a query per row.
+    """
+    id = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_batch(self, rows, instances):
+        """
+        Validates the rows of a batch together, once every row is valid on its own.
+        `instances` maps the ids of updated rows to their instances.
+        """
+        return rows
+
+    def bulk_saved(self, instances, previous):
+        """
+        Applies the side effects of a bulk write, inside its transaction.
+        """
+
+
+class ProductBulkSerializer(BulkWriteSerializer):
+    """
+    Serializer for bulk price and stock updates of products.
+    """
+    class Meta:
+        model = Product
+        fields = ('id', 'price', 'remaining_stock')
+        list_serializer_class = BulkListSerializer
+
+    def bulk_saved(self, instances, previous):
+        # Prices and stock are part of cached catalog responses and product representations
+        product_ids = [product.pk for product in instances]
+        category_ids = {product.category_id for product in instances}
+        transaction.on_commit(lambda: (
+            bump_model_version(Product),
+            bump_object_versions(Product, product_ids),
+            bump_object_versions(Category, category_ids),
+        ))
+
+
+class OrderItemBulkSerializer(BulkWriteSerializer):
+    """
+    Serializer for bulk writes of order items.
+    New items without a unit price get the current price of their product.
+    """
+    order = serializers.IntegerField(source='order_id', min_value=1)
+    product = serializers.IntegerField(source='product_id', min_value=1)
+
+    class Meta:
+        model = OrderItem
+        fields = ('id', 'order', 'product', 'quantity', 'unit_price')
+        extra_kwargs = {
+            'quantity': {'min_value': 1},
+            'unit_price': {'required': False},  # Defaults to the current product price
+        }
+        list_serializer_class = BulkListSerializer
+        bulk_relations = {'order_id': Order, 'product_id': Product}
+
+    def validate_batch(self, rows, instances):
+        missing = [row for row in rows if 'unit_price' not in row and 'id' not in row]
+        if missing:
+            prices = dict(Product.objects.filter(pk__in={row['product_id'] for row in missing}).values_list('pk', 'price'))
+            for row in missing:
+                row['unit_price'] = prices[row['product_id']]
+        return rows
+
+    def bulk_saved(self, instances, previous):
+        # Totals of the orders items were added to, changed in or moved from
+        order_ids = {item.order_id for item in instances}
+        order_ids.update(values['order_id'] for values in previous.values() if 'order_id' in values)
+        enqueue_order_totals(order_ids)
+        schedule_sales_rollups(order_ids if previous else ())  # Created items are found by the watermark
+
+
+class ShippingBulkSerializer(BulkWriteSerializer):
+    """
+    Serializer for bulk writes of shipping details, e.g. tracking and status updates.
+    """
+    order = serializers.IntegerField(source='order_id', min_value=1)
+
+    class Meta:
+        model = Shipping
+        fields = ('id', 'order', 'tracking_number', 'status', 'shipped_at', 'delivered_at')
+        read_only_fields = ('shipped_at', 'delivered_at')
+        list_serializer_class = BulkListSerializer
+        bulk_relations = {'order_id': Order}
+
+
+class DailySalesSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the DailySales rollup.
+    """
+    class Meta:
+        model = DailySales
+        fields = ('day', 'revenue', 'units', 'orders')
+
+
+class DailyProductSalesSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the DailyProductSales rollup.
+    """
+    product_name = serializers.CharField(source='product.name', read_only=True)
+
+    class Meta:
+        model = DailyProductSales
+        fields = ('day', 'product', 'product_name', 'category', 'revenue', 'units', 'orders')
+
+
+class DailyCategorySalesSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the DailyCategorySales rollup.
+    """
+    category_name = serializers.CharField(source='category.name', read_only=True)
+
+    class Meta:
+        model = DailyCategorySales
+        fields = ('day', 'category', 'category_name', 'revenue', 'units', 'orders')
@@ -0,0 +1,10 @@
+from .tasks import *
+from .related import *
+from .reviews import *
+from .search import *
+from .query_plans import *
+from .orders import *
+from .catalog import *
+from .exports import *
+from .images import *
+from .analytics import *
@@ -0,0 +1,168 @@
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from prodzm.models import DailyCategorySales, DailyProductSales, DailySales, Order, OrderItem, RollupWatermark
+from prodzm.services.tasks import enqueue, task
+
+__all__ = [
+    'SALES_ROLLUPS',
+    'rebuild_sales_rollups',
+    'refresh_sales_rollups',
+    'schedule_sales_rollups',
+]
+
+# Rollup model -> the order item fields and expressions it is grouped by, besides the day
+SALES_ROLLUPS = {
+    DailySales: ((), {}),
+    DailyProductSales: (('product_id',), {'category_id': F('product__category_id')}),
+    DailyCategorySales: ((), {'category_id': F('product__category_id')}),
+}
+
+# Days recomputed per statement by full rebuilds, to bound memory use
+REBUILD_CHUNK_DAYS = 31
+
+
+def day_bounds(start, end):
+    """
+    Returns the aware datetimes bounding the days from `start` to `end` (inclusive).
+    """
+    return (
+        timezone.make_aware(datetime.combine(start, time.min)),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+    )
+
+
+def day_ranges(days):
+    """
+    Groups a set of days into `(start, end)` ranges of consecutive days.
+    """
+    ranges = []
+    for day in sorted(days):
+        if ranges and ranges[-1][1] == day - timedelta(days=1):
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return [tuple(bounds) for bounds in ranges]
+
+
+def rollup_days(start, end, using='default'):
+    """
+    Recomputes every sales rollup for the days from `start` to `end` (inclusive) from the
+    order items of the orders created on those days: one grouped query and one bulk insert
+    per rollup, after deleting the previous rows. Returns the number of rows written.
+    """
+    lower, upper = day_bounds(start, end)
+    items = OrderItem.objects.using(using).filter(order__created_at__gte=lower, order__created_at__lt=upper)
+    written = 0
+    for model, (fields, expressions) in SALES_ROLLUPS.items():
+        model.objects.using(using).filter(day__gte=start, day__lte=end).delete()
+        rows = (
+            items.values(*fields, day=TruncDate('order__created_at'), **expressions)
+            .annotate(
+                revenue=Sum(F('unit_price') * F('quantity')),
+                units=Sum('quantity'),
+                orders=Count('order_id', distinct=True),
+            )
+            .order_by()
+        )
+        written += len(model.objects.using(using).bulk_create([model(**row) for row in rows], batch_size=1000))
+    return written
+
+
+def advance_watermark(watermark, last_id, using='default'):
+    """
+    Records that the order items up to `last_id` were rolled up. They are only settled (no
+    longer rolled up again) once rolled up longer than `SALES_ROLLUP_LAG` seconds ago, when
+    the transactions that inserted lower ids have committed.
+    """
+    now = timezone.now()
+    lag = timedelta(seconds=getattr(settings, 'SALES_ROLLUP_LAG', 300))
+    if watermark.pending_since is None or now - watermark.pending_since >= lag:
+        if watermark.pending_since is not None:
+            watermark.last_id = watermark.pending_id
+        watermark.pending_id, watermark.pending_since = last_id, now
+    watermark.save(using=using)
+
+
+@task(max_attempts=5)
+def refresh_sales_rollups(order_ids=(), using='default'):
+    """
+    Incrementally refreshes the sales rollups: the days of the order items added since the
+    last settled refresh (above the `sales` watermark), plus the days of the orders in
+    `order_ids` (e.g. whose items were changed or deleted), are recomputed. Returns the
+    number of days.
+    """
+    with transaction.atomic(using=using):
+        watermark, _ = RollupWatermark.objects.using(using).select_for_update().get_or_create(name='sales')
+        last_id = OrderItem.objects.using(using).aggregate(last=Max('pk'))['last'] or 0
+
+        days = set()
+        if last_id > watermark.last_id:
+            days.update(
+                OrderItem.objects.using(using)
+                .filter(pk__gt=watermark.last_id, pk__lte=last_id)
+                .values_list(TruncDate('order__created_at'), flat=True)
+                .distinct()
+            )
+        if order_ids:
+            days.update(
+                Order.objects.using(using).filter(pk__in=order_ids).values_list(TruncDate('created_at'), flat=True).distinct()
+            )
+
+        for start, end in day_ranges(days):
+            rollup_days(start, end, using=using)
+        advance_watermark(watermark, last_id, using=using)
+    return len(days)
+
+
+def schedule_sales_rollups(order_ids=(), using='default'):
+    """
+    Enqueues a refresh of the sales rollups, delayed by the `SALES_ROLLUP_DELAY` setting
+    (in seconds) so that the orders of a burst are rolled up by a single task.
+    Pass the ids of orders whose existing items changed, which the watermark doesn't see;
+    refreshes for no or a single order are deduplicated.
+    """
+    delay = getattr(settings, 'SALES_ROLLUP_DELAY', 60)
+    order_ids = sorted(set(order_ids))
+    dedupe_key = None
+    if len(order_ids) <= 1:
+        dedupe_key = ':'.join(['sales_rollups', *map(str, order_ids)])
+    enqueue(refresh_sales_rollups, {'order_ids': order_ids, 'using': using}, dedupe_key=dedupe_key, delay=delay, using=using)
+
+
+def rebuild_sales_rollups(since=None, until=None, using='default'):
+    """
+    Recomputes the sales rollups of the days from `since` to `until` (inclusive, defaulting
+    to the first and last order), one month at a time. A full rebuild also advances the
+    watermark. Returns the number of rollup rows written.
+    """
+    with transaction.atomic(using=using):
+        watermark, _ = RollupWatermark.objects.using(using).select_for_update().get_or_create(name='sales')
+        last_id = OrderItem.objects.using(using).aggregate(last=Max('pk'))['last'] or 0
+        bounds = Order.objects.using(using).aggregate(first=Min('created_at'), last=Max('created_at'))
+        if bounds['first'] is None:
+            for model in SALES_ROLLUPS:
+                model.objects.using(using).all().delete()
+            return 0
+
+        first = timezone.localdate(bounds['first'])
+        last = timezone.localdate(bounds['last'])
+        full = since is None and until is None
+        start = since or first
+        end = until or last
+        if full:
+            for model in SALES_ROLLUPS:
+                model.objects.using(using).exclude(day__gte=start, day__lte=end).delete()
+
+        written = 0
+        while start <= end:
+            chunk_end = min(start + timedelta(days=REBUILD_CHUNK_DAYS - 1), end)
+            written += rollup_days(start, chunk_end, using=using)
+            start = chunk_end + timedelta(days=1)
+
+        if full:
+            advance_watermark(watermark, last_id, using=using)
+    return written
@@ -0,0 +1,243 @@
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from django.db import transaction
+from prodzm.cache import bump_model_version, bump_object_versions
+from prodzm.models import Category, Product, ProductImage
+from prodzm.services.search import get_search_backend
+
+__all__ = ['CATALOG_IMPORT_FIELDS', 'CatalogImportBatch', 'UnreadableRow', 'import_catalog']
+
+# Product fields read from catalog rows, and the value used when a created product's row lacks one
+CATALOG_IMPORT_FIELDS = {
+    'name': None,
+    'description': '',
+    'price': None,
+    'shipping_cost': Decimal('0'),
+    'remaining_stock': 0,
+    'rating': Decimal('0'),
+    'supplier': '',
+}
+DECIMAL_FIELDS = ('price', 'shipping_cost', 'rating')
+CATALOG_COLUMNS = {'sku', 'category', *CATALOG_IMPORT_FIELDS, 'images', 'main_image'}
+ROW_DEFAULTS = {
+    name: default if default is not None else ('' if name == 'name' else Decimal('0'))
+    for name, default in CATALOG_IMPORT_FIELDS.items()
+}
+
+
+class UnreadableRow(ValueError):
+    """
+    Stands for a row of a feed that couldn't be decoded (e.g. a malformed JSON line) in the
+    rows given to `import_catalog`, which reports it as an invalid row instead of stopping.
+    """
+
+
+@dataclass
+class CatalogImportBatch:
+    """
+    Outcome of importing one batch of catalog rows.
+    `errors` holds `(row number, message)` for the rows that were skipped.
+    """
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    images: int = 0
+    errors: list = field(default_factory=list)
+
+
+def parse_catalog_row(row, columns):
+    """
+    Validates a catalog row and returns the Product field values it sets (only the known
+    columns present in the feed), its category name and its list of image paths (or None
+    when the feed has no `images` column). Raises ValueError for invalid rows, including
+    rows with catalog columns the feed doesn't have (which would be ignored).
+    """
+    if isinstance(row, UnreadableRow):
+        raise row
+    if not isinstance(row, dict):
+        raise ValueError("not an object")
+    unknown = (row.keys() & CATALOG_COLUMNS) - columns
+    if unknown:
+        raise ValueError(f"columns missing from the feed's header: {', '.join(sorted(unknown))}")
+    sku = str(row.get('sku') or '').strip()
+    category = str(row.get('category') or '').strip()
+    if not sku:
+        raise ValueError("missing sku")
+    if not category:
+        raise ValueError("missing category")
+
+    values = {}
+    for name in CATALOG_IMPORT_FIELDS:
+        if name not in columns:
+            continue
+        value = row.get(name)
+        if value in (None, ''):
+            if CATALOG_IMPORT_FIELDS[name] is None:
+                raise ValueError(f"missing {name}")
+            value = CATALOG_IMPORT_FIELDS[name]
+        try:
+            if name in DECIMAL_FIELDS:
+                value = Decimal(str(value))
+            elif name == 'remaining_stock':
+                value = int(value)
+                if value < 0:
+                    raise ValueError
+        except (InvalidOperation, ValueError):
+            raise ValueError(f"invalid {name}: {value!r}")
+        values[name] = value
+
+    images = None
+    if 'images' in columns:
+        images = row.get('images') or []
+        if isinstance(images, str):
+            images = [path.strip() for path in images.split('|') if path.strip()]
+        main_image = str(row.get('main_image') or '').strip()
+        if main_image:
+            images = [main_image] + [path for path in images if path != main_image]
+    return sku, category, values, images
+
+
+def resolve_categories(names, categories, using):
+    """
+    Adds the ids of the categories named in `names` to the `categories` name -> id mapping,
+    creating the missing ones with a single `bulk_create`.
+    """
+    missing = set(names) - categories.keys()
+    if not missing:
+        return
+    for category in Category.objects.using(using).filter(name__in=missing).order_by('pk'):
+        categories.setdefault(category.name, category.pk)
+    created = Category.objects.using(using).bulk_create(
+        [Category(name=name) for name in sorted(missing - categories.keys())]
+    )
+    if created and any(category.pk is None for category in created):
+        created = Category.objects.using(using).filter(name__in=[category.name for category in created])
+    categories.update({category.name: category.pk for category in created})
+
+
+def sync_images(images, using):
+    """
+    Makes the images of every product in `images` (a product id -> image paths mapping)
+    match the feed: missing images are created, unlisted ones deleted, and the first path
+    of each product is flagged as its main image. Bypasses ProductImage.save, so main
+    flags are resolved with two UPDATE statements for the whole batch.
+    Returns the number of images created.
+    """
+    if not images:
+        return 0
+    queryset = ProductImage.objects.using(using)
+    existing = {
+        (product_id, path): pk
+        for pk, product_id, path in queryset.filter(product_id__in=images).values_list('pk', 'product_id', 'image')
+    }
+    wanted = {(product_id, path) for product_id, paths in images.items() for path in paths}
+
+    stale = [pk for key, pk in existing.items() if key not in wanted]
+    if stale:
+        queryset.filter(pk__in=stale).delete()
+    created = queryset.bulk_create(
+        [ProductImage(product_id=product_id, image=path) for product_id, path in sorted(wanted - existing.keys())],
+        batch_size=1000,
+    )
+    if any(image.pk is None for image in created):
+        created = queryset.filter(product_id__in=images).exclude(pk__in=existing.values())
+    existing.update({(image.product_id, image.image.name): image.pk for image in created})
+
+    queryset.filter(product_id__in=images, is_main=True).update(is_main=False)
+    queryset.filter(pk__in=[existing[product_id, paths[0]] for product_id, paths in images.items() if paths]).update(is_main=True)
+    return len(created)
+
+
+def import_catalog(rows, columns, batch_size=1000, using='default'):
+    """
+    Upserts products (by `sku`), their categories (by name) and their images from an
+    iterable of catalog rows (dicts), one transaction per batch of `batch_size` rows, and
+    yields a CatalogImportBatch per batch. Rows are consumed lazily, so memory use does not
+    depend on the size of the feed.
+
+    Rows have a `sku`, a `category` name, the Product fields in CATALOG_IMPORT_FIELDS and
+    optionally `images` (a list, or `|` separated paths) and a `main_image` (defaults to
+    the first image). `columns` are the columns of the feed: only those are written on
+    existing products, and images are only synced when there is an `images` column.
+    Rows missing a column count as empty, rows with catalog columns outside of `columns`
+    are rejected, and UnreadableRow rows are reported as errors.
+
+    Products are written with `bulk_create(update_conflicts=True)`, which bypasses model
+    signals, so the search index and the catalog cache are updated here for each batch.
+    """
+    columns = set(columns)
+    update_fields = ['category'] + [name for name in CATALOG_IMPORT_FIELDS if name in columns]
+    categories = {}
+    search = get_search_backend(using)
+    rows = iter(rows)
+    number = 0
+
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return
+        result = CatalogImportBatch(rows=len(chunk))
+
+        parsed = {}
+        for row in chunk:
+            number += 1
+            try:
+                sku, category, values, images = parse_catalog_row(row, columns)
+            except ValueError as exc:
+                result.errors.append((number, str(exc)))
+                continue
+            parsed[sku] = (category, values, images)  # The last row of a duplicated sku wins
+
+        with transaction.atomic(using=using):
+            resolve_categories({category for category, _, _ in parsed.values()}, categories, using)
+            previous = {
+                sku: category_id
+                for sku, category_id in Product.objects.using(using).filter(sku__in=parsed).values_list('sku', 'category_id')
+            }
+
+            products = []
+            for sku, (category, values, _) in parsed.items():
+                if sku not in previous and not {'name', 'price'} <= values.keys():
+                    result.errors.append((None, f"new product {sku} needs a name and a price"))
+                    continue
+                # Columns missing from the feed are only inserted for new products, never updated
+                values = {**ROW_DEFAULTS, **values}
+                products.append(Product(sku=sku, category_id=categories[category], **values))
+
+            Product.objects.using(using).bulk_create(
+                products, batch_size=500, update_conflicts=True, unique_fields=['sku'], update_fields=update_fields,
+            )
+            if any(product.pk is None for product in products):
+                ids = dict(
+                    Product.objects.using(using)
+                    .filter(sku__in=[product.sku for product in products])
+                    .values_list('sku', 'pk')
+                )
+                for product in products:
+                    product.pk = ids[product.sku]
+
+            result.created = sum(1 for product in products if product.sku not in previous)
+            result.updated = len(products) - result.created
+            result.images = sync_images(
+                {product.pk: parsed[product.sku][2] for product in products if parsed[product.sku][2] is not None},
+                using,
+            )
+            # Indexed from the stored rows, since feeds may omit the name or description
+            search.index_products(
+                Product.objects.using(using).filter(pk__in=[product.pk for product in products]).only('name', 'description')
+            )
+
+            affected = {product.category_id for product in products} | set(previous.values())
+            product_ids = [product.pk for product in products]
+            transaction.on_commit(
+                lambda product_ids=product_ids, affected=affected: invalidate_imported_catalog(product_ids, affected), using=using,
+            )
+        yield result
+
+
+def invalidate_imported_catalog(product_ids, category_ids):
+    for model in (Category, Product, ProductImage):
+        bump_model_version(model)
+    bump_object_versions(Product, product_ids)
+    bump_object_versions(Category, category_ids)
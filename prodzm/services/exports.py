@@ -0,0 +1,152 @@
+import csv
+from datetime import datetime, time
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from prodzm.models import OrderItem, Product, ProductImage, Shipping
+
+__all__ = [
+    'EXPORT_FORMATS',
+    'ORDER_EXPORT_COLUMNS',
+    'PRODUCT_EXPORT_COLUMNS',
+    'export_orders',
+    'export_products',
+    'parse_export_datetime',
+    'stream_export',
+]
+
+EXPORT_CHUNK_SIZE = 2000
+
+# One row per order item, with its order, customer and latest shipping
+ORDER_EXPORT_COLUMNS = (
+    'order_id', 'created_at', 'status', 'total_price',
+    'customer_id', 'customer_email', 'customer_first_name', 'customer_last_name',
+    'shipping_tracking_number', 'shipping_status',
+    'item_id', 'product_id', 'product_sku', 'product_name', 'quantity', 'unit_price',
+)
+
+PRODUCT_EXPORT_COLUMNS = (
+    'id', 'sku', 'name', 'category_name', 'price', 'shipping_cost', 'remaining_stock',
+    'orders', 'rating', 'review_count', 'supplier', 'main_image',
+)
+
+
+def parse_export_datetime(value, end=False):
+    """
+    Parses an ISO date or datetime bound of an export. A date stands for the start of the
+    day, or for its end when `end` is True. Raises ValueError for invalid values.
+    """
+    # parse_datetime() also accepts dates, as midnight
+    day = parse_date(value)
+    if day is not None:
+        parsed = datetime.combine(day, time.max if end else time.min)
+    else:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f"Invalid date: {value!r}.")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def export_orders(since=None, until=None, status=None, using='default', chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Lazily yields the rows of ORDER_EXPORT_COLUMNS for the order items of the orders
+    created within `since`/`until` (inclusive) with the given `status`.
+    Rows are `values()` projections joined in SQL and fetched in chunks with `iterator()`,
+    so memory use does not depend on the number of orders.
+    """
+    latest_shipping = Shipping.objects.using(using).filter(order=OuterRef('order_id')).order_by('-id')
+    queryset = OrderItem.objects.using(using).order_by('order_id', 'id')
+    if since:
+        queryset = queryset.filter(order__created_at__gte=since)
+    if until:
+        queryset = queryset.filter(order__created_at__lte=until)
+    if status:
+        queryset = queryset.filter(order__status=status)
+    return queryset.values(
+        'order_id',
+        'quantity',
+        'unit_price',
+        'product_id',
+        created_at=F('order__created_at'),
+        status=F('order__status'),
+        total_price=F('order__total_price'),
+        customer_id=F('order__customer_id'),
+        customer_email=F('order__customer__email'),
+        customer_first_name=F('order__customer__first_name'),
+        customer_last_name=F('order__customer__last_name'),
+        shipping_tracking_number=Subquery(latest_shipping.values('tracking_number')[:1]),
+        shipping_status=Subquery(latest_shipping.values('status')[:1]),
+        item_id=F('id'),
+        product_sku=F('product__sku'),
+        product_name=F('product__name'),
+    ).iterator(chunk_size=chunk_size)
+
+
+def export_products(category=None, using='default', chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Lazily yields the rows of PRODUCT_EXPORT_COLUMNS for the whole catalog, or for the
+    products of the `category` named.
+    """
+    main_image = ProductImage.objects.using(using).filter(product=OuterRef('pk')).order_by('-is_main', 'id')
+    queryset = Product.objects.using(using).order_by('id')
+    if category:
+        queryset = queryset.filter(category__name=category)
+    return queryset.values(
+        'id', 'sku', 'name', 'price', 'shipping_cost', 'remaining_stock', 'orders', 'rating', 'review_count', 'supplier',
+        category_name=F('category__name'),
+        main_image=Subquery(main_image.values('image')[:1]),
+    ).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """
+    File-like object returning what is written to it, to stream `csv.writer` output.
+    """
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(columns, rows, rows_per_chunk=100):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    chunk = []
+    for row in rows:
+        chunk.append(writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in (row[column] for column in columns)
+        ]))
+        if len(chunk) >= rows_per_chunk:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def stream_ndjson(columns, rows, rows_per_chunk=100):
+    encoder = DjangoJSONEncoder()
+    chunk = []
+    for row in rows:
+        chunk.append(encoder.encode({column: row[column] for column in columns}) + '\n')
+        if len(chunk) >= rows_per_chunk:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+# Export format -> (content type, streaming function)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', stream_csv),
+    'ndjson': ('application/x-ndjson; charset=utf-8', stream_ndjson),
+}
+
+
+def stream_export(file_format, columns, rows):
+    """
+    Returns a generator of the text chunks of `rows` encoded in `file_format` (csv or ndjson).
+    """
+    return EXPORT_FORMATS[file_format][1](columns, rows)
@@ -0,0 +1,150 @@
+import hashlib
+import io
+import logging
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+from prodzm.cache import bump_model_version, bump_object_versions
+from prodzm.models import Category, Product, ProductImage
+from prodzm.services.tasks import enqueue_many, task
+
+__all__ = [
+    'DERIVATIVE_FORMATS',
+    'get_image_sizes',
+    'process_product_image',
+    'run_image_job',
+    'schedule_image_processing',
+]
+
+logger = logging.getLogger(__name__)
+
+# Name -> bounding box (in pixels) of the derivatives generated for every product image
+DEFAULT_IMAGE_SIZES = {'thumb': 160, 'medium': 640, 'large': 1280}
+
+# Format -> (Pillow format, file extension, save options). JPEG is the fallback for clients without WebP.
+DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def get_image_sizes():
+    """
+    Returns the derivative sizes, configurable through the `PRODUCT_IMAGE_SIZES` setting.
+    """
+    return getattr(settings, 'PRODUCT_IMAGE_SIZES', DEFAULT_IMAGE_SIZES)
+
+
+def derivative_path(content_hash, name, size, extension):
+    """
+    Storage path of a derivative. It only depends on the original's content and the size,
+    so files never change once written and can be served with an immutable Cache-Control.
+    """
+    return f"product_images/derivatives/{content_hash[:2]}/{content_hash}/{name}-{size}.{extension}"
+
+
+def encode_image(image, pil_format, options):
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        # JPEG has no alpha channel: flatten transparent images onto white
+        background = Image.new('RGB', image.size, 'white')
+        rgba = image.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+@task(max_attempts=3, backoff=30)
+def process_product_image(image_id, force=False, using='default'):
+    """
+    Generates the resized JPEG and WebP derivatives of a product image and records them in
+    its `derivatives`. Images whose derivatives match their current file are skipped unless
+    `force` is True. Returns 'processed', 'skipped' or 'failed' (missing or undecodable file).
+    Other storage errors are raised, so the task queue retries them.
+
+    Derivatives are written under content-hash paths, so identical uploads share their files.
+    The row is written with an UPDATE (no signals), and the catalog cache is invalidated.
+    """
+    image = ProductImage.objects.using(using).select_related('product').filter(pk=image_id).first()
+    if image is None or not image.image:
+        return 'skipped'
+    source = image.image.name
+    if not force and image.derivatives.get('source') == source:
+        return 'skipped'
+
+    try:
+        with image.image.storage.open(source, 'rb') as file:
+            data = file.read()
+    except FileNotFoundError as exc:
+        logger.warning("Can't process product image %s (%s): %s", image_id, source, exc)
+        return 'failed'
+    try:
+        original = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+        original.load()
+    except (OSError, UnidentifiedImageError) as exc:  # Read from memory: the file is corrupt or truncated
+        logger.warning("Can't decode product image %s (%s): %s", image_id, source, exc)
+        return 'failed'
+
+    content_hash = hashlib.sha256(data).hexdigest()
+    derivatives = {
+        'source': source,
+        'hash': content_hash,
+        'width': original.width,
+        'height': original.height,
+        'sizes': {},
+    }
+    for name, size in sorted(get_image_sizes().items(), key=lambda item: item[1]):
+        resized = original.copy()
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)  # Never upscales
+        variant = {'width': resized.width, 'height': resized.height}
+        for file_format, (pil_format, extension, options) in DERIVATIVE_FORMATS.items():
+            path = derivative_path(content_hash, name, size, extension)
+            if not default_storage.exists(path):
+                saved = default_storage.save(path, ContentFile(encode_image(resized, pil_format, options)))
+                if saved != path:
+                    # Written meanwhile by another worker processing the same content
+                    default_storage.delete(saved)
+            variant[file_format] = path
+        derivatives['sizes'][name] = variant
+
+    # Only recorded if the image wasn't replaced in the meantime
+    if not ProductImage.objects.using(using).filter(pk=image_id, image=source).update(derivatives=derivatives):
+        return 'skipped'
+    product_ids, category_ids = [image.product_id], [image.product.category_id]
+    transaction.on_commit(lambda: (
+        bump_model_version(ProductImage),
+        bump_object_versions(Product, product_ids),
+        bump_object_versions(Category, category_ids),
+    ), using=using)
+    return 'processed'
+
+
+def run_image_job(image_id, force=False, using='default', worker=False):
+    """
+    Processes a product image outside of the task queue (e.g. backfills), logging errors,
+    transient ones included, instead of raising them. Pass `worker=True` from threads,
+    whose database connections are closed afterwards.
+    """
+    try:
+        return process_product_image(image_id, force=force, using=using)
+    except Exception:
+        logger.exception("Processing product image %s failed", image_id)
+        return 'failed'
+    finally:
+        if worker:
+            connections.close_all()
+
+
+def schedule_image_processing(image_ids, force=False, using='default'):
+    """
+    Enqueues the processing of the given product images in the task queue, once the current
+    transaction commits, so it runs in workers rather than in the request.
+    """
+    enqueue_many(
+        process_product_image,
+        [({'image_id': image_id, 'force': force, 'using': using}, f'product_image:{image_id}') for image_id in image_ids],
+        using=using,
+    )
@@ -0,0 +1,194 @@
+from collections import Counter
+from decimal import Decimal
+from django.db import connections, transaction
+from django.db.models import Case, F, PositiveIntegerField, Prefetch, Sum, Value, When, prefetch_related_objects
+from prodzm.cache import PRODUCT_STOCK, bump_model_version, bump_object_versions
+from prodzm.models import Category, Order, OrderItem, Product
+from prodzm.services.analytics import schedule_sales_rollups
+from prodzm.services.tasks import enqueue_many, task
+
+__all__ = [
+    'InsufficientStock',
+    'create_order',
+    'create_orders',
+    'place_order',
+    'reserve_stock',
+    'enqueue_order_totals',
+    'recalculate_order_totals',
+    'schedule_order_total',
+]
+
+
+class InsufficientStock(Exception):
+    """
+    Raised when an order can't be placed because some products don't have enough stock left.
+    `shortages` maps the id of every short product to its remaining stock.
+    """
+
+    def __init__(self, shortages=None):
+        self.shortages = shortages or {}
+        super().__init__(f"Insufficient stock for products {sorted(self.shortages)}.")
+
+
+def create_orders(orders, using='default'):
+    """
+    Creates several orders with their items in a single transaction.
+
+    Each entry of `orders` is a dict with a `customer`, an optional `status` and a list of
+    `items` (dicts with a `product`, a `quantity` and an optional `unit_price`, which defaults
+    to the current product price). Totals are computed in Python from the items, orders are
+    written once with `bulk_create` and all items are inserted with a second `bulk_create`,
+    so no per-item signal recomputes the order total. A sales rollup refresh is enqueued.
+
+    The returned totals are exact. Later changes to the items only enqueue a recalculation
+    (see `schedule_order_total`), so `Order.total_price` lags behind them until a task worker
+    runs, unless the `TASK_QUEUE_EAGER` setting is on.
+    """
+    with transaction.atomic(using=using):
+        # Default unit prices are read inside the transaction, after any stock reservation
+        # locked the products, so they're the prices at the time the order is written
+        priced = {item['product'].pk for data in orders for item in data['items'] if 'unit_price' not in item}
+        prices = dict(Product.objects.using(using).filter(pk__in=priced).values_list('pk', 'price')) if priced else {}
+
+        built = []
+        for data in orders:
+            lines = [
+                OrderItem(
+                    product=item['product'],
+                    quantity=item['quantity'],
+                    unit_price=item['unit_price'] if 'unit_price' in item else prices[item['product'].pk],
+                )
+                for item in data['items']
+            ]
+            order = Order(
+                customer=data['customer'],
+                status=data.get('status', 'pending'),
+                total_price=sum((line.unit_price * line.quantity for line in lines), Decimal('0')),
+            )
+            built.append((order, lines))
+
+        if connections[using].features.can_return_rows_from_bulk_insert:
+            Order.objects.using(using).bulk_create([order for order, _ in built])
+        else:
+            for order, _ in built:
+                order.save(using=using)
+
+        items = []
+        for order, lines in built:
+            for line in lines:
+                line.order = order
+                items.append(line)
+        OrderItem.objects.using(using).bulk_create(items, batch_size=500)
+        schedule_sales_rollups(using=using)
+
+    created = [order for order, _ in built]
+    # One query for the items of every order instead of one per order when they're serialized
+    prefetch_related_objects(created, Prefetch('items', queryset=OrderItem.objects.using(using).order_by('pk')))
+    return created
+
+
+def create_order(customer, items, status='pending', using='default'):
+    """
+    Creates a single order with its items in one transaction. See `create_orders`.
+    """
+    return create_orders([{'customer': customer, 'items': items, 'status': status}], using=using)[0]
+
+
+def reserve_stock(quantities, using='default'):
+    """
+    Reserves stock for several products with a single conditional UPDATE:
+    `SET remaining_stock = remaining_stock - n, orders = orders + 1 WHERE remaining_stock >= n`,
+    where `n` is the quantity of each product in `quantities` (a product id -> quantity mapping).
+
+    The statement locks the updated rows, so concurrent reservations can never oversell.
+    Must run inside a transaction, which the caller rolls back when InsufficientStock is raised.
+    """
+    product_ids = sorted(quantities)
+    needed = Case(
+        *[When(pk=product_id, then=Value(quantities[product_id])) for product_id in product_ids],
+        output_field=PositiveIntegerField(),
+    )
+    reserved = Product.objects.using(using).filter(pk__in=product_ids, remaining_stock__gte=needed).update(
+        remaining_stock=F('remaining_stock') - needed,
+        orders=F('orders') + 1,
+    )
+    if reserved != len(product_ids):
+        raise InsufficientStock()
+
+    # Stock and order counters are part of cached product responses and representations, but
+    # not of the rest of the catalog, hence PRODUCT_STOCK rather than the Product version
+    transaction.on_commit(lambda: (bump_model_version(PRODUCT_STOCK), bump_object_versions(Product, product_ids)), using=using)
+
+
+def place_order(customer, items, using='default'):
+    """
+    Places an order: reserves stock for every item, snapshots the current product prices as
+    unit prices and creates the order with its items, all in a single transaction.
+    Raises InsufficientStock (with the remaining stock of the short products) if any product
+    can't cover the requested quantity, in which case nothing is written.
+    """
+    quantities = Counter()
+    for item in items:
+        quantities[item['product'].pk] += item['quantity']
+
+    try:
+        with transaction.atomic(using=using):
+            reserve_stock(quantities, using=using)
+            category_ids = {item['product'].category_id for item in items}
+            transaction.on_commit(lambda: bump_object_versions(Category, category_ids), using=using)
+            lines = [{'product': item['product'], 'quantity': item['quantity']} for item in items]
+            return create_order(customer, lines, using=using)
+    except InsufficientStock:
+        remaining = dict(
+            Product.objects.using(using).filter(pk__in=quantities).values_list('pk', 'remaining_stock')
+        )
+        raise InsufficientStock({
+            product_id: remaining.get(product_id, 0)
+            for product_id, quantity in quantities.items()
+            if remaining.get(product_id, 0) < quantity
+        })
+
+
+@task(max_attempts=5)
+def recalculate_order_totals(order_ids, using='default'):
+    """
+    Recomputes the total price of the given orders from their items with a single aggregate
+    query, then writes each total with an UPDATE (bypassing Order.save).
+    """
+    order_ids = set(order_ids)
+    if not order_ids:
+        return
+
+    totals = dict(
+        OrderItem.objects.using(using)
+        .filter(order_id__in=order_ids)
+        .values('order_id')
+        .annotate(total=Sum(F('unit_price') * F('quantity')))
+        .values_list('order_id', 'total')
+        .order_by()
+    )
+    for order_id in order_ids:
+        Order.objects.using(using).filter(pk=order_id).update(total_price=totals.get(order_id) or 0)
+
+
+def enqueue_order_totals(order_ids, using='default'):
+    """
+    Enqueues the recalculation of the totals of the given orders in the task queue, as one
+    task per order deduplicated by order, so an order changed many times before a worker
+    gets to it is only recalculated once.
+    """
+    enqueue_many(
+        recalculate_order_totals,
+        [({'order_ids': [order_id], 'using': using}, f'order_total:{order_id}') for order_id in sorted(set(order_ids))],
+        using=using,
+    )
+
+
+def schedule_order_total(order_id, using='default'):
+    """
+    Schedules the recalculation of an order's total in the task queue, once the current
+    transaction commits. Every change to the same order before a worker gets to it is
+    coalesced into a single task by its dedupe key. Until a worker runs it (or right away
+    with `TASK_QUEUE_EAGER`), the stored total doesn't reflect the change.
+    """
+    enqueue_order_totals([order_id], using=using)
@@ -0,0 +1,155 @@
+import re
+from collections import namedtuple
+from datetime import timedelta
+from django.apps import apps
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from prodzm.models import Product, ProductImage, Review, Order, Shipping
+from .related import RelatedProductIndex
+
+__all__ = ['HOT_QUERIES', 'QueryPlan', 'hot_query', 'find_full_scans', 'explain_hot_queries']
+
+HOT_QUERIES = {}
+
+QueryPlan = namedtuple('QueryPlan', ['name', 'plan', 'full_scans'])
+
+
+def hot_query(name):
+    """
+    Registers a function returning a queryset as a hot query path checked by `check_query_plans`.
+    """
+    def decorator(func):
+        HOT_QUERIES[name] = func
+        return func
+    return decorator
+
+
+@hot_query('products.list')
+def products_list():
+    return Product.objects.order_by('-orders', 'id')[:20]
+
+
+@hot_query('products.list.next_page')
+def products_list_next_page():
+    return Product.objects.filter(Q(orders__lt=10) | Q(orders=10, id__gt=1)).order_by('-orders', 'id')[:20]
+
+
+@hot_query('products.search.orders')
+def products_search_orders():
+    return Product.objects.filter(orders__gte=10)
+
+
+@hot_query('products.search.price')
+def products_search_price():
+    return Product.objects.filter(price__lte=50)
+
+
+@hot_query('products.search.category')
+def products_search_category():
+    return Product.objects.filter(category__name='Audio').order_by('-orders', 'id')
+
+
+@hot_query('products.related')
+def products_related():
+    return RelatedProductIndex.ranked_members([1, 2, 3], 9)
+
+
+@hot_query('product_images.for_products')
+def product_images_for_products():
+    return ProductImage.objects.filter(product_id__in=[1, 2, 3])
+
+
+@hot_query('product_images.main')
+def product_images_main():
+    return ProductImage.objects.filter(product_id=1, is_main=True)
+
+
+@hot_query('reviews.list')
+def reviews_list():
+    return Review.objects.order_by('-created_at', 'id')[:20]
+
+
+@hot_query('reviews.for_product')
+def reviews_for_product():
+    return Review.objects.filter(product_id=1).order_by('-created_at')[:20]
+
+
+@hot_query('orders.list')
+def orders_list():
+    return Order.objects.order_by('-created_at', 'id')[:20]
+
+
+@hot_query('orders.for_customer')
+def orders_for_customer():
+    return Order.objects.filter(customer_id=1).order_by('-created_at')
+
+
+@hot_query('orders.by_status')
+def orders_by_status():
+    return Order.objects.filter(status='pending').order_by('-created_at')
+
+
+@hot_query('orders.date_hierarchy')
+def orders_date_hierarchy():
+    now = timezone.now()
+    return Order.objects.filter(created_at__gte=now - timedelta(days=30), created_at__lt=now)
+
+
+@hot_query('shipping.by_status')
+def shipping_by_status():
+    return Shipping.objects.filter(status='in_transit')
+
+
+@hot_query('shipping.recently_shipped')
+def shipping_recently_shipped():
+    return Shipping.objects.order_by('-shipped_at')[:20]
+
+
+def find_full_scans(plan, vendor):
+    """
+    Returns the tables read with a full table scan in an EXPLAIN output.
+    SQLite reports them as `SCAN <table>` without `USING ... INDEX`,
+    PostgreSQL as `Seq Scan on <table>`.
+    """
+    tables = {model._meta.db_table for model in apps.get_models()}
+    scans = []
+    for line in plan.splitlines():
+        if vendor == 'postgresql':
+            match = re.search(r'Seq Scan on (\w+)', line)
+        else:
+            match = re.search(r'\bSCAN (\w+)(?!.*\bUSING\b)', line)
+        if match and match.group(1) in tables:
+            scans.append(match.group(1))
+    return scans
+
+
+def explain_hot_queries(using='default'):
+    """
+    Runs EXPLAIN on every registered hot query and returns a list of QueryPlan.
+    On PostgreSQL sequential scans are disabled for the check, so small development tables
+    do not hide a missing index behind a cheaper seq scan.
+    """
+    connection = connections[using]
+    results = []
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+        for name, build in HOT_QUERIES.items():
+            plan = explain(build().using(using), connection)
+            results.append(QueryPlan(name, plan, find_full_scans(plan, connection.vendor)))
+    return results
+
+
+def explain(queryset, connection):
+    """
+    Returns the EXPLAIN output of a queryset as text, one plan node per line.
+    Runs the statement directly since QuerySet.explain() can't wrap the subqueries
+    Django builds for filters on window functions.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
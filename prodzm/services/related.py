@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from prodzm.models import Product
+
+__all__ = ['RelatedProductIndex', 'get_related_products_limit']
+
+
+def get_related_products_limit():
+    """
+    Returns the maximum number of related products embedded per product.
+    Configurable through the `RELATED_PRODUCTS_LIMIT` setting.
+    """
+    return getattr(settings, 'RELATED_PRODUCTS_LIMIT', 8)
+
+
+class RelatedProductIndex:
+    """
+    Resolves related products (other products in the same category) for a whole
+    page of products in a constant number of queries:
+    - one windowed query for the top ranked members of every category on the page,
+    - one query for their images.
+
+    Members are ranked deterministically by orders, then rating, then id.
+    """
+
+    def __init__(self, products, limit=None):
+        self.limit = get_related_products_limit() if limit is None else limit
+        self.products = list(products)
+        self._product_ids = {product.pk for product in self.products}
+        self._members = None  # Loaded on first use
+
+    def _members_queryset(self):
+        category_ids = {product.category_id for product in self.products}
+        if not category_ids or self.limit <= 0:
+            return None
+        # Fetch one extra member per category so the product itself can be excluded
+        return self.ranked_members(category_ids, self.limit + 1).select_related('category').prefetch_related('images')
+
+    def _group_members(self, ranked):
+        members = {product.category_id: [] for product in self.products}
+        for product in ranked:
+            members[product.category_id].append(product)
+        return members
+
+    def _load_members(self):
+        queryset = self._members_queryset()
+        return self._group_members(queryset if queryset is not None else [])
+
+    async def aload(self):
+        """
+        Loads the related products with the async ORM, so `related_to()` runs no query.
+        """
+        if self._members is None:
+            queryset = self._members_queryset()
+            ranked = [product async for product in queryset.aiterator(chunk_size=1000)] if queryset is not None else []
+            self._members = self._group_members(ranked)
+
+    @staticmethod
+    def ranked_members(category_ids, limit):
+        """
+        Returns the top `limit` products of each category, ranked by orders, then rating, then id.
+        """
+        return (
+            Product.objects.filter(category_id__in=category_ids)
+            .annotate(
+                category_rank=Window(
+                    expression=RowNumber(),
+                    partition_by=[F('category_id')],
+                    order_by=[F('orders').desc(), F('rating').desc(), F('id').asc()],
+                )
+            )
+            .filter(category_rank__lte=limit)
+            .order_by('category_id', 'category_rank')
+        )
+
+    def covers(self, product):
+        """
+        Returns True if the related products of `product` were resolved by this index.
+        """
+        return product.pk in self._product_ids
+
+    def related_to(self, product):
+        """
+        Returns the ranked related products of `product`, excluding the product itself.
+        """
+        if self._members is None:
+            self._members = self._load_members()
+        members = self._members.get(product.category_id, [])
+        return [member for member in members if member.pk != product.pk][:self.limit]
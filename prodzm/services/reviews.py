@@ -0,0 +1,52 @@
+from collections import defaultdict
+from django.db.models import Count, F
+from prodzm.models import Product, Review
+
+__all__ = ['REVIEW_STAT_FIELDS', 'apply_review_delta', 'rebuild_review_stats']
+
+REVIEW_STAT_FIELDS = (
+    'review_count', 'rating_sum',
+    'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+)
+
+
+def apply_review_delta(product_id, rating, delta):
+    """
+    Atomically adds (`delta=1`) or removes (`delta=-1`) a single review of `rating` stars
+    from the denormalized review statistics of a product using F() expressions.
+    """
+    Product.objects.filter(pk=product_id).update(**{
+        'review_count': F('review_count') + delta,
+        'rating_sum': F('rating_sum') + delta * rating,
+        f'rating_{rating}_count': F(f'rating_{rating}_count') + delta,
+    })
+
+
+def rebuild_review_stats(batch_size=1000):
+    """
+    Recomputes the review statistics of every product from the Review table.
+    Uses a single grouped aggregate and writes the results back with `bulk_update`.
+    Returns the number of products updated.
+    """
+    counts = defaultdict(dict)
+    rows = Review.objects.values('product_id', 'rating').annotate(total=Count('id')).order_by()
+    for row in rows:
+        counts[row['product_id']][row['rating']] = row['total']
+
+    updated = 0
+    batch = []
+    for product in Product.objects.only('pk', *REVIEW_STAT_FIELDS).iterator(chunk_size=batch_size):
+        histogram = counts.get(product.pk, {})
+        product.review_count = sum(histogram.values())
+        product.rating_sum = sum(stars * total for stars, total in histogram.items())
+        for stars in range(1, 6):
+            setattr(product, f'rating_{stars}_count', histogram.get(stars, 0))
+        batch.append(product)
+
+        if len(batch) >= batch_size:
+            updated += Product.objects.bulk_update(batch, REVIEW_STAT_FIELDS)
+            batch = []
+
+    if batch:
+        updated += Product.objects.bulk_update(batch, REVIEW_STAT_FIELDS)
+    return updated
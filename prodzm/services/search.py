@@ -0,0 +1,228 @@
+import re
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from prodzm.models import Product
+
+__all__ = [
+    'BaseSearchBackend',
+    'BasicSearchBackend',
+    'SQLiteFTS5SearchBackend',
+    'PostgresSearchBackend',
+    'get_search_backend',
+    'search_products',
+]
+
+
+class BaseSearchBackend:
+    """
+    Base class for product full-text search backends.
+
+    `search()` narrows a Product queryset to the products matching a free-text query and
+    annotates them with a `search_rank`; `ordering` is the stable ordering results should
+    be paginated with. `index_product()`/`remove_product()` keep the index in sync and
+    are called from the Product post_save/post_delete signals.
+    """
+    ordering = ('-orders', 'id')
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    @staticmethod
+    def terms(query):
+        """
+        Splits a free-text query into lowercase word terms, dropping any search syntax.
+        """
+        return re.findall(r'\w+', query.lower())
+
+    def search(self, queryset, query):
+        raise NotImplementedError('Search backends must implement search().')
+
+    def index_product(self, product):
+        pass
+
+    def index_products(self, products):
+        """
+        Indexes many products at once, e.g. after a bulk import that bypasses model signals.
+        """
+        for product in products:
+            self.index_product(product)
+
+    def remove_product(self, product_id):
+        pass
+
+    def rebuild(self):
+        """
+        Rebuilds the whole index from the Product table and returns the number of indexed products.
+        """
+        return 0
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """
+    Unindexed fallback for database engines without a full-text backend.
+    Matches every term against the name or description with a LIKE scan.
+    """
+
+    def search(self, queryset, query):
+        for term in self.terms(query):
+            queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+        return queryset
+
+
+class SQLiteFTS5SearchBackend(BaseSearchBackend):
+    """
+    Search backend using the `prodzm_product_fts` FTS5 virtual table, keyed by product id.
+    Every term is prefix matched and results are ranked by bm25, weighting the name
+    ten times higher than the description. Requires SQLite 3.35 (materialized CTEs).
+    """
+    table = 'prodzm_product_fts'
+    ordering = ('search_rank', 'id')  # bm25 scores are lower for better matches
+
+    def search(self, queryset, query):
+        terms = self.terms(query)
+        if not terms:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+        match = ' '.join(f'"{term}"*' for term in terms)
+        product_table = Product._meta.db_table
+        matches = f'SELECT rowid AS id, bm25({self.table}, 10.0, 1.0) AS score FROM {self.table} WHERE {self.table} MATCH %s'
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [match])
+        ).annotate(
+            # bm25() scans the matches of every term, so the ranks are computed once and
+            # looked up, instead of running the match per product
+            search_rank=RawSQL(
+                f'WITH matches AS MATERIALIZED ({matches}) '
+                f'SELECT score FROM matches WHERE matches.id = {product_table}.id',
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    def index_product(self, product):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [product.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, name, description) VALUES (%s, %s, %s)',
+                [product.pk, product.name, product.description],
+            )
+
+    def index_products(self, products):
+        products = list(products)
+        with connections[self.using].cursor() as cursor:
+            for start in range(0, len(products), 500):
+                chunk = products[start:start + 500]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({placeholders})', [product.pk for product in chunk])
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, name, description) VALUES (%s, %s, %s)',
+                [(product.pk, product.name, product.description) for product in products],
+            )
+
+    def remove_product(self, product_id):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [product_id])
+
+    def rebuild(self):
+        product_table = Product._meta.db_table
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, name, description) '
+                f'SELECT id, name, description FROM {product_table}'
+            )
+            indexed = cursor.rowcount
+            # Merge the index b-trees so queries stay fast after a bulk load
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+        return indexed
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Search backend using the generated `search_vector` tsvector column and its GIN index.
+    The column is computed by PostgreSQL from the name (weight A) and description (weight B),
+    so it never goes out of sync and needs no work on save/delete. Terms are prefix matched.
+    """
+    config = 'simple'
+    ordering = ('-search_rank', 'id')
+
+    def search(self, queryset, query):
+        terms = self.terms(query)
+        if not terms:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        product_table = Product._meta.db_table
+        return queryset.annotate(
+            search_rank=RawSQL(
+                f'ts_rank_cd({product_table}.search_vector, to_tsquery(%s, %s))',
+                [self.config, tsquery],
+                output_field=FloatField(),
+            )
+        ).filter(
+            RawSQL(
+                f'{product_table}.search_vector @@ to_tsquery(%s, %s)',
+                [self.config, tsquery],
+                output_field=BooleanField(),
+            )
+        )
+
+    def rebuild(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute('REINDEX INDEX prodzm_product_search_vector_idx')
+        return Product.objects.using(self.using).count()
+
+
+def get_search_backend(using='default'):
+    """
+    Returns the product search backend for the `using` database.
+    The `PRODUCT_SEARCH_BACKEND` setting (a dotted path) overrides the per-engine default.
+    """
+    path = getattr(settings, 'PRODUCT_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)(using)
+
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and connection.Database.sqlite_version_info < (3, 35):
+        return BasicSearchBackend(using)
+    backends = {
+        'sqlite': SQLiteFTS5SearchBackend,
+        'postgresql': PostgresSearchBackend,
+    }
+    return backends.get(connection.vendor, BasicSearchBackend)(using)
+
+
+def search_products(queryset, params):
+    """
+    Filters a Product queryset with the catalog search parameters (`category`, `orders`,
+    `price` and the full-text query `qs`). Returns the queryset and the ordering to paginate
+    it with, or None for the default ordering. Products have no creation date, so the `date`
+    parameter older clients send is ignored.
+    """
+    ordering = None
+
+    # Filtering by category (if provided)
+    category = params.get('category')
+    if category:
+        queryset = queryset.filter(category__name=category)
+
+    # Filtering by number of orders (if provided)
+    orders = params.get('orders')
+    if orders and orders != 0:
+        queryset = queryset.filter(orders__gte=orders)
+
+    # Filtering by price range (if provided)
+    price = params.get('price')
+    if price and price != 0:
+        queryset = queryset.filter(price__lte=price)
+
+    # Full-text search across name and description, ranked by relevance
+    qs = params.get('qs')
+    if qs:
+        backend = get_search_backend(queryset.db)
+        queryset = backend.search(queryset, qs)
+        ordering = backend.ordering
+    return queryset, ordering
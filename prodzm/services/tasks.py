@@ -0,0 +1,270 @@
+import logging
+import os
+import socket
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+from prodzm.models import Task
+
+__all__ = [
+    'TaskWorker',
+    'enqueue',
+    'enqueue_many',
+    'get_task_stats',
+    'prune_tasks',
+    'task',
+]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TaskOptions:
+    func: object
+    max_attempts: int
+    backoff: float
+
+
+_registry = {}
+
+
+def task(name=None, max_attempts=5, backoff=10):
+    """
+    Registers a function as a task that can be enqueued with `enqueue()` and run by workers.
+    Failed attempts are retried `max_attempts` times in total, after `backoff` seconds,
+    doubling with every attempt. The function is returned unchanged, so it can still be
+    called directly. Task keyword arguments must be JSON serializable.
+    """
+    def decorator(func):
+        func.task_name = name or f'{func.__module__}.{func.__qualname__}'
+        _registry[func.task_name] = TaskOptions(func, max_attempts, backoff)
+        return func
+    return decorator
+
+
+def get_task_options(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"{name!r} is not a registered task.") from None
+
+
+def is_eager():
+    """
+    Whether tasks run in the enqueuing process when enqueued (after the commit) instead of
+    in workers, configurable through the `TASK_QUEUE_EAGER` setting. Handy without workers.
+    """
+    return getattr(settings, 'TASK_QUEUE_EAGER', False)
+
+
+def enqueue_many(func, calls, delay=0, using='default'):
+    """
+    Enqueues one task running `func` (a registered task) per `(kwargs, dedupe_key)` of
+    `calls`, once the current transaction commits (immediately outside of transactions),
+    so workers never see tasks of rolled back changes nor run them before their data is
+    committed. Tasks whose `dedupe_key` is already held by a pending task are dropped.
+    """
+    options = get_task_options(func.task_name)
+    calls = list(calls)
+    if not calls:
+        return
+
+    def insert():
+        if is_eager():
+            for kwargs, _ in calls:
+                try:
+                    run_task_function(options.func, kwargs, using)
+                except Exception:
+                    logger.exception("Task %s failed", func.task_name)
+            return
+        run_at = timezone.now() + timedelta(seconds=delay)
+        Task.objects.using(using).bulk_create(
+            [
+                Task(name=func.task_name, kwargs=kwargs, dedupe_key=dedupe_key, run_at=run_at, max_attempts=options.max_attempts)
+                for kwargs, dedupe_key in calls
+            ],
+            ignore_conflicts=True,  # Deduplication, by the pending dedupe key constraint
+        )
+
+    transaction.on_commit(insert, using=using)
+
+
+def enqueue(func, kwargs=None, dedupe_key=None, delay=0, using='default'):
+    """
+    Enqueues a single task running `func` with `kwargs`. See `enqueue_many`.
+    """
+    enqueue_many(func, [(kwargs or {}, dedupe_key)], delay=delay, using=using)
+
+
+def run_task_function(func, kwargs, using):
+    # Side effects scheduled with on_commit (e.g. cache invalidation) only happen if the task succeeds
+    with transaction.atomic(using=using):
+        func(**kwargs)
+
+
+class TaskWorker:
+    """
+    Claims due tasks from the queue and runs them, one at a time.
+
+    Tasks are claimed with a conditional UPDATE per task (`WHERE status = 'pending'`), so
+    several workers, in any number of processes or hosts, never run the same task.
+    Tasks left running by a crashed worker for longer than `stale_after` seconds are
+    requeued (or given up once out of attempts).
+    """
+
+    def __init__(self, using='default', batch_size=20, stale_after=None, name=None):
+        self.using = using
+        self.batch_size = batch_size
+        self.stale_after = getattr(settings, 'TASK_STALE_AFTER', 600) if stale_after is None else stale_after
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+
+    @property
+    def queryset(self):
+        return Task.objects.using(self.using)
+
+    def requeue_stale(self):
+        cutoff = timezone.now() - timedelta(seconds=self.stale_after)
+        stale = self.queryset.filter(status='running', started_at__lt=cutoff)
+        stale.filter(attempts__gte=F('max_attempts')).update(
+            status='failed', finished_at=timezone.now(), last_error="Worker lost while running the task.",
+        )
+        for pk in stale.values_list('pk', flat=True):
+            self.reschedule(pk, status='pending', run_at=timezone.now(), last_error="Worker lost while running the task.")
+
+    def reschedule(self, pk, **values):
+        """
+        Updates a task back to pending (or anything else). A task can't go back to pending
+        while another pending task holds its dedupe key: that newer task does the same
+        work, so this one is given up instead.
+        """
+        try:
+            self.queryset.filter(pk=pk).update(**values)
+        except IntegrityError:
+            self.queryset.filter(pk=pk).update(**{
+                **values,
+                'status': 'failed',
+                'last_error': f"{values.get('last_error', '')}\nSuperseded by a pending task with the same dedupe key.".lstrip(),
+            })
+
+    def claim(self):
+        """
+        Claims up to `batch_size` due tasks, oldest due first, and returns them.
+        """
+        now = timezone.now()
+        candidates = list(
+            self.queryset.filter(status='pending', run_at__lte=now).order_by('run_at', 'id').values_list('pk', flat=True)[:self.batch_size]
+        )
+        claimed = []
+        for pk in candidates:
+            if self.queryset.filter(pk=pk, status='pending').update(
+                status='running', started_at=now, worker=self.name, attempts=F('attempts') + 1,
+            ):
+                claimed.append(pk)
+        return list(self.queryset.filter(pk__in=claimed).order_by('run_at', 'id'))
+
+    def execute(self, task):
+        """
+        Runs a claimed task and records its outcome: done, retried later with exponential
+        backoff, or failed once out of attempts.
+        """
+        started = time.perf_counter()
+        try:
+            options = get_task_options(task.name)
+            run_task_function(options.func, task.kwargs, self.using)
+        except Exception:
+            duration = time.perf_counter() - started
+            backoff = getattr(_registry.get(task.name), 'backoff', 0)
+            retry = task.attempts < task.max_attempts
+            logger.exception("Task %s #%s failed (attempt %s of %s)", task.name, task.pk, task.attempts, task.max_attempts)
+            self.reschedule(
+                task.pk,
+                status='pending' if retry else 'failed',
+                run_at=timezone.now() + timedelta(seconds=backoff * 2 ** (task.attempts - 1)),
+                finished_at=timezone.now(),
+                duration=duration,
+                last_error=traceback.format_exc(),
+            )
+            return False
+        self.queryset.filter(pk=task.pk).update(
+            status='done', finished_at=timezone.now(), duration=time.perf_counter() - started, last_error='',
+        )
+        return True
+
+    def run_pending(self):
+        """
+        Runs the tasks due now, and returns how many were run.
+        """
+        self.requeue_stale()
+        count = 0
+        while not self.stopping:
+            tasks = self.claim()
+            if not tasks:
+                break
+            for task in tasks:
+                self.execute(task)
+                count += 1
+        return count
+
+    def run(self, sleep=1.0, burst=False):
+        """
+        Runs tasks until `stop()` is called, polling the queue every `sleep` seconds when it
+        is empty, or until the queue is empty when `burst` is True. Old done tasks are
+        pruned every hour.
+        """
+        pruned_at = 0
+        while not self.stopping:
+            if time.monotonic() - pruned_at > 3600:
+                prune_tasks(using=self.using)
+                pruned_at = time.monotonic()
+            if self.run_pending():
+                continue
+            if burst:
+                return
+            time.sleep(sleep)
+
+    def stop(self):
+        """
+        Makes the worker stop after its current task.
+        """
+        self.stopping = True
+
+
+def prune_tasks(older_than=None, using='default'):
+    """
+    Deletes the tasks done for longer than `older_than` seconds (the `TASK_RETENTION`
+    setting by default) and returns how many were deleted. Failed tasks are kept.
+    """
+    if older_than is None:
+        older_than = getattr(settings, 'TASK_RETENTION', 7 * 24 * 3600)
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    deleted, _ = Task.objects.using(using).filter(status='done', finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def get_task_stats(using='default'):
+    """
+    Returns per task name statistics of the queue: counts per status, the number of tasks
+    retried, and the average and maximum duration of the (retained) done tasks, from a
+    single aggregate query.
+    """
+    rows = (
+        Task.objects.using(using)
+        .values('name')
+        .annotate(
+            pending=Count('id', filter=Q(status='pending')),
+            running=Count('id', filter=Q(status='running')),
+            done=Count('id', filter=Q(status='done')),
+            failed=Count('id', filter=Q(status='failed')),
+            retried=Count('id', filter=Q(attempts__gt=1)),
+            avg_duration=Avg('duration', filter=Q(status='done')),
+            max_duration=Max('duration', filter=Q(status='done')),
+        )
+        .order_by('name')
+    )
+    return {row.pop('name'): row for row in rows}
@@ -1,22 +1,136 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.contrib.auth.models import User
 from django.dispatch import receiver
-from django.db.models import Sum, F
-from .models import OrderItem, Order
+from .models import OrderItem, Review, Product, ProductImage, Category
+from .authentication import invalidate_cached_user
+from .cache import bump_model_version, bump_object_versions
+from .services import (
+    apply_review_delta,
+    get_search_backend,
+    schedule_image_processing,
+    schedule_order_total,
+    schedule_sales_rollups,
+)
 
 @receiver([post_save, post_delete], sender=OrderItem)
-def update_order_total(sender, instance, **kwargs):
+def update_order_total(sender, instance, using, **kwargs):
     """
     Recalculate and update the total price of the order
     whenever an OrderItem is added, updated, or deleted.
+    Changes made inside a transaction are coalesced into one recalculation per order on commit.
     """
-    order = instance.order
+    schedule_order_total(instance.order_id, using=using)
 
-    if order.items.exists():
-        total = order.items.aggregate(
-            total=Sum(F('unit_price') * F('quantity'))
-        )['total'] or 0
-        order.total_price = total
-    else:
-        order.total_price = 0
+@receiver([post_save, post_delete], sender=OrderItem)
+def refresh_sales_rollups(sender, instance, using, created=False, **kwargs):
+    """
+    Refresh the daily sales rollups whenever an OrderItem is added, updated, or deleted.
+    New items are found from the rollup watermark, changed ones by the days of their order.
+    """
+    schedule_sales_rollups([] if created else [instance.order_id], using=using)
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_authenticated_user(sender, instance, **kwargs):
+    """
+    Drop the cached copy of a user used to authenticate requests
+    whenever the user is saved (e.g. deactivated) or deleted.
+    """
+    invalidate_cached_user(instance.pk)
+
+@receiver(pre_save, sender=Review)
+def remember_previous_review(sender, instance, **kwargs):
+    """
+    Remember the product and rating a review had before it is updated,
+    so the product review statistics can be adjusted after the save.
+    """
+    instance._previous_review = None
+    if instance.pk:
+        instance._previous_review = Review.objects.filter(pk=instance.pk).values_list('product_id', 'rating').first()
+
+@receiver(post_save, sender=Review)
+def add_review_to_stats(sender, instance, **kwargs):
+    """
+    Incrementally update the review statistics of the reviewed product
+    whenever a Review is added or its rating/product changes.
+    """
+    previous = getattr(instance, '_previous_review', None)
+    current = (instance.product_id, instance.rating)
+    if previous == current:
+        return
+
+    if previous:
+        apply_review_delta(*previous, delta=-1)
+    apply_review_delta(*current, delta=1)
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_stats(sender, instance, **kwargs):
+    """
+    Incrementally update the review statistics of the reviewed product whenever a Review is deleted.
+    """
+    apply_review_delta(instance.product_id, instance.rating, delta=-1)
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, using, **kwargs):
+    """
+    Keep the product full-text search index in sync whenever a Product is added or updated.
+    """
+    get_search_backend(using).index_product(instance)
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, using, **kwargs):
+    """
+    Remove a deleted Product from the full-text search index.
+    """
+    get_search_backend(using).remove_product(instance.pk)
+
+@receiver(post_save, sender=ProductImage)
+def process_product_image(sender, instance, raw, using, **kwargs):
+    """
+    Generate the resized derivatives of a new or replaced product image in the background.
+    """
+    if raw or not instance.image or instance.derivatives.get('source') == instance.image.name:
+        return
+    schedule_image_processing([instance.pk], using=using)
+
+@receiver(pre_save, sender=Product)
+def remember_previous_category(sender, instance, **kwargs):
+    """
+    Remember the category a product had before it is updated,
+    so cached representations of both categories are invalidated when it moves.
+    """
+    instance._previous_category_id = None
+    if instance.pk:
+        instance._previous_category_id = Product.objects.filter(pk=instance.pk).values_list('category_id', flat=True).first()
 
-    order.save()
+def get_affected_category_ids(sender, instance):
+    """
+    Returns the ids of the categories whose product representations depend on `instance`.
+    """
+    if sender is Category:
+        return [instance.pk]
+    if sender is Product:
+        return [instance.category_id, getattr(instance, '_previous_category_id', None)]
+    return list(Product.objects.filter(pk=instance.product_id).values_list('category_id', flat=True))
+
+def get_affected_product_ids(sender, instance):
+    """
+    Returns the ids of the products whose own representation depends on `instance`.
+    Products of a changed category are invalidated through the category version.
+    """
+    if sender is Category:
+        return []
+    if sender is Product:
+        return [instance.pk]
+    return [instance.product_id]
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    """
+    Invalidate cached catalog responses and product representations depending on the changed model.
+    """
+    bump_model_version(sender)
+    bump_object_versions(Product, get_affected_product_ids(sender, instance))
+    bump_object_versions(Category, get_affected_category_ids(sender, instance))
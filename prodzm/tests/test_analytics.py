@@ -0,0 +1,46 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from prodzm.models import Category, Customer, DailySales, Order, OrderItem, Product, RollupWatermark
+from prodzm.services import refresh_sales_rollups
+
+
+@override_settings(SALES_ROLLUP_LAG=300)
+class SalesRollupTests(TestCase):
+    """
+    Incremental refreshes include order items committed after a refresh with lower ids.
+    """
+
+    def setUp(self):
+        category = Category.objects.create(name="Audio")
+        self.product = Product.objects.create(
+            name="Speaker", description="-", price=10, shipping_cost=1, remaining_stock=100,
+            category=category, sku="SKU-1", supplier="-",
+        )
+        self.customer = Customer.objects.create(first_name="A", last_name="B", email="a@example.com", shipping_address="-")
+
+    def add_item(self, pk):
+        # Explicit ids stand for ids allocated by transactions committing in another order
+        order = Order.objects.create(customer=self.customer, total_price=10)
+        OrderItem.objects.create(pk=pk, order=order, product=self.product, quantity=1, unit_price=10)
+
+    def refresh(self, at):
+        with mock.patch('django.utils.timezone.now', return_value=at):
+            refresh_sales_rollups()
+        return DailySales.objects.get().units
+
+    def test_items_committed_out_of_order(self):
+        now = timezone.now()
+        self.add_item(pk=10)
+        self.assertEqual(self.refresh(now), 1)
+
+        self.add_item(pk=5)  # Inserted before the refresh, committed after it
+        self.assertEqual(self.refresh(now + timedelta(seconds=60)), 2)
+        self.assertEqual(RollupWatermark.objects.get().last_id, 0)
+
+        # Once the lag elapsed, items up to the pending id are settled
+        self.assertEqual(self.refresh(now + timedelta(seconds=301)), 2)
+        self.assertEqual(RollupWatermark.objects.get().last_id, 10)
+        self.add_item(pk=11)
+        self.assertEqual(self.refresh(now + timedelta(seconds=302)), 3)
@@ -0,0 +1,57 @@
+from rest_framework.test import APITestCase
+from prodzm.cache import get_catalog_cache, get_representation_cache
+from prodzm.models import Category, Product, ProductImage
+
+
+class AsyncCatalogViewTests(APITestCase):
+    """
+    The async catalog views serve the same representations as the sync viewsets.
+    """
+    urls = (
+        '/products/?page_size=2',
+        '/products/?fields=id,name,images',
+        '/products/search/?category=Audio',
+        '/categories/',
+        '/products/999/',
+        '/products/?cursor=invalid',
+    )
+
+    def setUp(self):
+        for name in ('Audio', 'Video'):
+            category = Category.objects.create(name=name)
+            for i in range(3):
+                product = Product.objects.create(
+                    name=f"{name} {i}", description="-", price=10 + i, shipping_cost=1, remaining_stock=5,
+                    category=category, sku=f"SKU-{name}-{i}", supplier="-", orders=i,
+                )
+                ProductImage.objects.create(product=product, image=f"product/{product.pk}.jpg", is_main=True)
+        self.product = product
+
+    def normalize(self, response):
+        data = response.json()
+        if isinstance(data, dict) and 'results' in data:
+            # Links differ by the /async prefix only
+            for link in ('next', 'previous'):
+                data[link] = data[link] and data[link].split('?', 1)[1]
+        return response.status_code, data
+
+    async def test_same_responses(self):
+        for url in (*self.urls, f'/products/{self.product.pk}/', f'/categories/{self.product.category_id}/'):
+            with self.subTest(url=url):
+                get_catalog_cache().clear()
+                get_representation_cache().clear()
+                expected = self.normalize(await self.async_client.get(url))
+                get_catalog_cache().clear()
+                get_representation_cache().clear()
+                self.assertEqual(self.normalize(await self.async_client.get(f'/async{url}')), expected)
+
+    async def test_partly_cached_page(self):
+        # Representations cached by a detail request are reused, the others are rendered
+        # from rows and related products loaded ahead, without any query in the event loop
+        expected = self.normalize(await self.async_client.get('/products/'))
+        get_catalog_cache().clear()
+        get_representation_cache().clear()
+        await self.async_client.get(f'/async/products/{self.product.pk}/')
+        hits = get_representation_cache().stats()['hits']
+        self.assertEqual(self.normalize(await self.async_client.get('/async/products/')), expected)
+        self.assertEqual(get_representation_cache().stats()['hits'], hits + 1)
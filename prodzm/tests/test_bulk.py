@@ -0,0 +1,121 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from prodzm.cache import get_object_versions
+from prodzm.models import Category, Customer, Order, OrderItem, Product, Shipping, Task
+
+
+class BulkWriteTests(APITestCase):
+    """
+    The `bulk/` endpoints write whole batches with a number of queries independent of the
+    number of rows, and reject a batch with the errors of each of its rows.
+    """
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        category = Category.objects.create(name="Audio")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {i}", description="-", price=10 + i, shipping_cost=1, remaining_stock=5,
+                category=category, sku=f"SKU-{i}", supplier="-",
+            )
+            for i in range(2)
+        ]
+        customer = Customer.objects.create(first_name="A", last_name="B", email="a@example.com", shipping_address="-")
+        self.orders = [Order.objects.create(customer=customer) for _ in range(2)]
+
+    def bulk(self, method, url, rows):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, rows, format='json')
+        return response, len(queries)
+
+    def test_batched_create(self):
+        counts = []
+        for size in (2, 20):
+            rows = [{'order': self.orders[i % 2].pk, 'tracking_number': f"T{size}-{i}"} for i in range(size)]
+            response, count = self.bulk('post', '/shipping/bulk/', rows)
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual([row['tracking_number'] for row in response.json()], [row['tracking_number'] for row in rows])
+            self.assertTrue(all(row['id'] and row['status'] == 'pending' for row in response.json()))
+            counts.append(count)
+        self.assertEqual(Shipping.objects.count(), 22)
+        self.assertEqual(counts[0], counts[1])
+
+    def test_batched_update(self):
+        shippings = Shipping.objects.bulk_create([
+            Shipping(order=self.orders[i % 2], tracking_number=f"T{i}") for i in range(20)
+        ])
+        counts = []
+        for batch in (shippings[:2], shippings[2:]):
+            response, count = self.bulk('patch', '/shipping/bulk/', [{'id': shipping.pk, 'status': 'shipped'} for shipping in batch])
+            self.assertEqual(response.status_code, 200)
+            counts.append(count)
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(set(Shipping.objects.values_list('status', flat=True)), {'shipped'})
+        self.assertEqual(set(Shipping.objects.values_list('tracking_number', flat=True)), {f"T{i}" for i in range(20)})
+
+    def test_order_items(self):
+        rows = [
+            {'order': self.orders[0].pk, 'product': self.products[1].pk, 'quantity': 2},
+            {'order': self.orders[1].pk, 'product': self.products[0].pk, 'quantity': 1, 'unit_price': '5.00'},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/order-items/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['unit_price'] for row in response.json()], ['11.00', '5.00'])
+        self.assertEqual(
+            set(Task.objects.filter(dedupe_key__startswith='order_total:').values_list('dedupe_key', flat=True)),
+            {f'order_total:{order.pk}' for order in self.orders},
+        )
+
+    def test_products(self):
+        product = self.products[0]
+        version = get_object_versions(Product, [product.pk])[product.pk]
+        self.assertEqual(self.client.post('/products/bulk/', [], format='json').status_code, 405)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch('/products/bulk/', [{'id': product.pk, 'price': '9.50'}], format='json')
+        self.assertEqual(response.status_code, 200)
+        product.refresh_from_db()
+        self.assertEqual((str(product.price), product.remaining_stock), ('9.50', 5))
+        self.assertGreater(get_object_versions(Product, [product.pk])[product.pk], version)
+
+    def test_row_errors(self):
+        order = self.orders[0].pk
+        response = self.client.post('/order-items/bulk/', [
+            {'order': order, 'product': self.products[0].pk, 'quantity': 1},
+            {'order': order, 'product': self.products[0].pk, 'quantity': 0},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual((errors[0], list(errors[1])), ({}, ['quantity']))
+
+        # Ids and relations are checked for the whole batch once every row is valid
+        response = self.client.post('/order-items/bulk/', [
+            {'order': order, 'product': self.products[0].pk, 'quantity': 1},
+            {'order': 999, 'product': 998, 'quantity': 1},
+            {'id': 1, 'order': order, 'product': self.products[0].pk, 'quantity': 1},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), [
+            {},
+            {'order': ["Order 999 does not exist."], 'product': ["Product 998 does not exist."]},
+            {'id': ["Rows to create can't have an id."]},
+        ])
+        self.assertFalse(OrderItem.objects.exists())
+
+        shipping = Shipping.objects.create(order=self.orders[0], tracking_number="T")
+        response = self.client.patch('/shipping/bulk/', [
+            {'status': 'shipped'}, {'id': 999}, {'id': shipping.pk}, {'id': shipping.pk},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), [
+            {'id': ["This field is required."]},
+            {'id': ["Object 999 does not exist."]},
+            {},
+            {'id': [f"Object {shipping.pk} is updated more than once."]},
+        ])
+
+        response = self.client.post('/shipping/bulk/', [{'order': order, 'tracking_number': "T"}] * 1001, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Shipping.objects.count(), 1)
@@ -0,0 +1,105 @@
+import time
+from unittest import mock
+from rest_framework.test import APITestCase
+from prodzm.cache import LRUCache, bump_model_version, get_catalog_cache, get_representation_cache
+from prodzm.models import Category, Product
+
+
+class RepresentationCacheTests(APITestCase):
+    """
+    Product representations are invalidated by their own version, and by their category's
+    when they depend on it, and expire like cached responses.
+    """
+
+    def setUp(self):
+        get_catalog_cache().clear()
+        get_representation_cache().clear()
+        category = Category.objects.create(name="Audio")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {i}", description="-", price=10, shipping_cost=1, remaining_stock=5,
+                category=category, sku=f"SKU-{i}", supplier="-",
+            )
+            for i in range(2)
+        ]
+
+    def get_prices(self, fields):
+        response = self.client.get(f'/products/?fields={fields}&page_size=10')
+        return {product['id']: product['price'] for product in response.json()['results']}
+
+    def test_change_invalidates_product(self):
+        cache = get_representation_cache()
+        changed, unchanged = self.products
+        self.get_prices('id,price')
+        changed.price = 20
+        changed.save()
+
+        hits = cache.hits
+        self.assertEqual(self.get_prices('id,price')[changed.pk], '20.00')
+        self.assertEqual(cache.hits, hits + 1)  # The other product's representation is still valid
+
+        self.get_prices('id,price,category')
+        unchanged.price = 30
+        unchanged.save()
+        hits = cache.hits
+        self.assertEqual(self.get_prices('id,price,category')[unchanged.pk], '30.00')
+        self.assertEqual(cache.hits, hits)  # Representations with the category depend on its version
+
+    def test_entries_expire(self):
+        cache = LRUCache(100)
+        with mock.patch('prodzm.cache.time.monotonic', return_value=1000):
+            cache.set('key', 'value', 1, timeout=10)
+            cache.set('forever', 'value', 1)
+            cache.set('never', 'value', 1, timeout=0)
+            self.assertEqual(cache.get('key'), 'value')
+            self.assertNotIn('never', cache)
+        with mock.patch('prodzm.cache.time.monotonic', return_value=1010):
+            self.assertIsNone(cache.get('key'))
+            self.assertEqual(cache.get('forever'), 'value')
+        self.assertEqual(cache.stats()['bytes'], 1)
+
+
+class ResponseCacheTests(APITestCase):
+    """
+    Catalog responses are served from the cache until a model they depend on changes, with
+    an ETag and a Last-Modified header that conditional requests revalidate.
+    """
+
+    def setUp(self):
+        get_catalog_cache().clear()
+        Category.objects.create(name="Audio")
+
+    def test_repeated_get_is_cached(self):
+        response = self.client.get('/categories/')
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            cached = self.client.get('/categories/')
+        self.assertEqual((cached.content, cached['ETag']), (response.content, response['ETag']))
+        self.assertEqual(cached['Content-Type'], response['Content-Type'])
+        with self.assertNumQueries(1):  # Other parameters are cached separately
+            self.client.get('/categories/?fields=name')
+
+    def test_conditional_requests(self):
+        response = self.client.get('/categories/')
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/categories/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get('/categories/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.assertEqual(self.client.get('/categories/', HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+        with mock.patch('prodzm.cache.time.time_ns', return_value=(int(time.time()) + 10) * 10 ** 9):
+            bump_model_version(Category)  # Later by more than the second resolution of Last-Modified
+        response = self.client.get('/categories/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], etag)  # Same content, so a still matching ETag
+        self.assertEqual(self.client.get('/categories/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_write_invalidates(self):
+        self.client.get('/categories/')
+        bump_model_version(Category)
+        with self.assertNumQueries(1):
+            self.client.get('/categories/')
+
+        Category.objects.create(name="Video")  # Bumped by the post_save signal
+        names = [category['name'] for category in self.client.get('/categories/').json()['results']]
+        self.assertEqual(names, ["Audio", "Video"])
@@ -0,0 +1,103 @@
+import io
+import os
+import tempfile
+from decimal import Decimal
+from django.core.management import call_command
+from django.test import TestCase
+from prodzm.models import Category, Product, ProductImage
+from prodzm.services import import_catalog
+
+COLUMNS = ['sku', 'category', 'name', 'price', 'description', 'images', 'main_image']
+
+
+class CatalogImportTests(TestCase):
+    """
+    Catalog feeds upsert products by SKU in batches, only writing the columns of the feed,
+    and skip invalid rows with their row number.
+    """
+
+    def run_import(self, rows, columns=COLUMNS, batch_size=1000):
+        return list(import_catalog(rows, columns, batch_size=batch_size))
+
+    def get_images(self, sku):
+        return list(ProductImage.objects.filter(product__sku=sku).order_by('image').values_list('image', 'is_main'))
+
+    def test_create_and_update(self):
+        batches = self.run_import([
+            {'sku': 'A', 'category': 'Audio', 'name': 'Speaker', 'price': '10.50', 'images': 'a1.jpg|a2.jpg', 'main_image': 'a2.jpg'},
+            {'sku': 'B', 'category': 'Video', 'name': 'Screen', 'price': '99', 'description': 'Big'},
+            {'sku': 'C', 'category': 'Audio', 'name': 'Radio', 'price': '5', 'images': ['c.jpg']},
+        ], batch_size=2)
+        self.assertEqual([(batch.rows, batch.created, batch.updated, batch.images) for batch in batches], [(2, 2, 0, 2), (1, 1, 0, 1)])
+        speaker = Product.objects.get(sku='A')
+        self.assertEqual((speaker.name, speaker.price, speaker.category.name, speaker.remaining_stock), ('Speaker', Decimal('10.50'), 'Audio', 0))
+        self.assertEqual(Category.objects.count(), 2)
+        self.assertEqual(self.get_images('A'), [('a1.jpg', False), ('a2.jpg', True)])
+
+        # Images are synced with the feed, main image first by default
+        batches = self.run_import([{'sku': 'A', 'category': 'Audio', 'name': 'Speaker 2', 'price': '11', 'images': 'a3.jpg|a1.jpg'}])
+        self.assertEqual((batches[0].created, batches[0].updated, batches[0].images), (0, 1, 1))
+        self.assertEqual(self.get_images('A'), [('a1.jpg', False), ('a3.jpg', True)])
+
+    def test_partial_columns(self):
+        self.run_import([{'sku': 'B', 'category': 'Video', 'name': 'Screen', 'price': '99', 'description': 'Big', 'images': 'b.jpg'}])
+        self.run_import([{'sku': 'B', 'category': 'TV', 'price': '89'}], columns=['sku', 'category', 'price'])
+        screen = Product.objects.get(sku='B')
+        self.assertEqual((screen.name, screen.description, screen.price, screen.category.name), ('Screen', 'Big', Decimal('89'), 'TV'))
+        self.assertEqual(self.get_images('B'), [('b.jpg', True)])
+
+        # Rows can't carry columns the feed doesn't declare, they would be ignored
+        batches = self.run_import([{'sku': 'B', 'category': 'TV', 'price': '79', 'name': 'Renamed'}], columns=['sku', 'category', 'price'])
+        self.assertEqual(batches[0].errors, [(1, "columns missing from the feed's header: name")])
+        self.assertEqual(Product.objects.get(sku='B').price, Decimal('89'))
+
+    def test_row_errors(self):
+        batches = self.run_import([
+            {'sku': 'A', 'category': 'Audio', 'name': 'Speaker', 'price': '10'},
+            {'sku': '', 'category': 'Audio', 'name': 'No sku', 'price': '10'},
+            {'sku': 'B', 'category': 'Audio', 'name': 'Speaker', 'price': 'ten'},
+            {'sku': 'C', 'category': 'Audio', 'price': '10'},
+            ['not', 'an', 'object'],
+        ], batch_size=3)
+        self.assertEqual([batch.errors for batch in batches], [
+            [(2, "missing sku"), (3, "invalid price: 'ten'")],
+            [(4, "missing name"), (5, "not an object")],
+        ])
+        self.assertEqual(list(Product.objects.values_list('sku', flat=True)), ['A'])
+
+        batches = self.run_import([{'sku': 'D', 'category': 'Audio', 'name': 'Speaker'}], columns=['sku', 'category', 'name'])
+        self.assertEqual(batches[0].errors, [(None, "new product D needs a name and a price")])
+
+    def call_import(self, name, content):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, name)
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(content)
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command('import_catalog', path, '--batch-size', '2', stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_command_json_lines(self):
+        stdout, stderr = self.call_import('feed.jsonl', '\n'.join([
+            '{"sku": "A", "category": "Audio", "name": "Speaker", "price": 10}',
+            '{"sku": "B", "category": "Audio", "name": "Amp", ',
+            '',
+            '{"sku": "C", "category": "Audio", "name": "Radio", "price": 5, "description": "FM"}',
+            '{"sku": "D", "category": "Audio", "name": "Tuner", "price": 7}',
+        ]))
+        self.assertEqual(stderr.splitlines(), [
+            "row 2: invalid JSON on line 2: Expecting property name enclosed in double quotes",
+            "row 3: columns missing from the feed's header: description",
+        ])
+        self.assertIn("2 products created, 0 updated, 0 images added, 2 rows skipped.", stdout)
+        self.assertEqual(list(Product.objects.order_by('sku').values_list('sku', flat=True)), ['A', 'D'])
+
+    def test_command_csv(self):
+        stdout, stderr = self.call_import('feed.csv', (
+            "sku,category,name,price,images\r\n"
+            "A,Audio,Speaker,10,a1.jpg|a2.jpg\r\n"
+            "B,Audio,Amp,-,\r\n"
+        ))
+        self.assertEqual(stderr, "row 2: invalid price: '-'\n")
+        self.assertIn("1 products created, 0 updated, 2 images added, 1 rows skipped.", stdout)
+        self.assertEqual(self.get_images('A'), [('a1.jpg', True), ('a2.jpg', False)])
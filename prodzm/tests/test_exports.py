@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from rest_framework.test import APITestCase
+from prodzm.models import Category, Customer, Order, OrderItem, Product, ProductImage, Shipping
+from prodzm.services import ORDER_EXPORT_COLUMNS, PRODUCT_EXPORT_COLUMNS
+
+
+class ExportTests(APITestCase):
+    """
+    Orders and products are streamed as CSV or NDJSON by the export endpoints and the
+    `export_data` command. Date-only bounds cover whole days, datetimes are exact.
+    """
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        audio, video = Category.objects.create(name="Audio"), Category.objects.create(name="Video")
+        self.speaker, self.screen = [
+            Product.objects.create(
+                name=name, description="-", price=10, shipping_cost=1, remaining_stock=5,
+                category=category, sku=f"SKU-{name}", supplier="-",
+            )
+            for name, category in (("Speaker", audio), ("Screen", video))
+        ]
+        ProductImage.objects.create(product=self.speaker, image="product/speaker-2.jpg")
+        ProductImage.objects.create(product=self.speaker, image="product/speaker-1.jpg", is_main=True)
+        customer = Customer.objects.create(first_name="A", last_name="B", email="a@example.com", shipping_address="-")
+
+        self.orders = {}
+        for name, created_at, status, products in (
+            ('first_day', datetime(2025, 1, 1, tzinfo=timezone.utc), 'delivered', [self.speaker]),
+            ('last_day', datetime(2025, 1, 31, 18, tzinfo=timezone.utc), 'pending', [self.speaker, self.screen]),
+            ('after', datetime(2025, 2, 1, tzinfo=timezone.utc), 'delivered', [self.screen]),
+        ):
+            order = Order.objects.create(customer=customer, status=status, total_price=10 * len(products))
+            Order.objects.filter(pk=order.pk).update(created_at=created_at)
+            for product in products:
+                OrderItem.objects.create(order=order, product=product, quantity=1, unit_price=10)
+            self.orders[name] = order
+        for tracking_number in ("T1", "T2"):
+            Shipping.objects.create(order=self.orders['first_day'], tracking_number=tracking_number, status='delivered')
+
+    def get_csv(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertRegex(response['Content-Disposition'], r'^attachment; filename="\w+-\d{8}-\d{6}\.csv"$')
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], list(ORDER_EXPORT_COLUMNS if 'orders' in url else PRODUCT_EXPORT_COLUMNS))
+        return [dict(zip(rows[0], row)) for row in rows[1:]]
+
+    def get_order_ids(self, url):
+        return [int(row['order_id']) for row in self.get_csv(url)]
+
+    def test_order_bounds(self):
+        first, last, after = (self.orders[name].pk for name in ('first_day', 'last_day', 'after'))
+        self.assertEqual(self.get_order_ids('/orders/export/csv/?since=2025-01-01&until=2025-01-31'), [first, last, last])
+        self.assertEqual(self.get_order_ids('/orders/export/csv/?until=2025-01-31T12:00:00'), [first])
+        self.assertEqual(self.get_order_ids('/orders/export/csv/?since=2025-01-31T18:00:00Z'), [last, last, after])
+        self.assertEqual(self.get_order_ids('/orders/export/csv/?status=delivered'), [first, after])
+
+    def test_order_rows(self):
+        row = self.get_csv('/orders/export/csv/?until=2025-01-01')[0]
+        self.assertEqual(row, {
+            'order_id': str(self.orders['first_day'].pk), 'created_at': '2025-01-01T00:00:00+00:00',
+            'status': 'delivered', 'total_price': '10.00', 'customer_id': str(self.orders['first_day'].customer_id),
+            'customer_email': 'a@example.com', 'customer_first_name': 'A', 'customer_last_name': 'B',
+            'shipping_tracking_number': 'T2', 'shipping_status': 'delivered',
+            'item_id': str(self.orders['first_day'].items.get().pk), 'product_id': str(self.speaker.pk),
+            'product_sku': 'SKU-Speaker', 'product_name': 'Speaker', 'quantity': '1', 'unit_price': '10.00',
+        })
+
+        response = self.client.get('/orders/export/ndjson/?since=2025-02-01')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(list(row), list(ORDER_EXPORT_COLUMNS))
+        self.assertEqual((row['created_at'], row['total_price'], row['shipping_status']), ('2025-02-01T00:00:00Z', '10.00', None))
+
+    def test_invalid_or_unauthorized(self):
+        for value in ('2025-02-30', 'yesterday'):
+            with self.subTest(value=value):
+                self.assertEqual(self.client.get(f'/orders/export/csv/?until={value}').status_code, 400)
+        self.client.force_authenticate(User.objects.create_user('user', 'user@example.com', 'user'))
+        self.assertEqual(self.client.get('/orders/export/csv/').status_code, 403)
+
+    def test_products(self):
+        rows = self.get_csv('/products/export/csv/?category=Audio')
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(
+            (rows[0]['sku'], rows[0]['category_name'], rows[0]['price'], rows[0]['main_image']),
+            ('SKU-Speaker', 'Audio', '10.00', 'product/speaker-1.jpg'),
+        )
+        self.assertEqual(len(self.get_csv('/products/export/csv/')), 2)
+
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command('export_data', 'orders', '--format', 'ndjson', '--until', '2025-01-31', stdout=stdout)
+        order_ids = [json.loads(line)['order_id'] for line in stdout.getvalue().splitlines()]
+        self.assertEqual(order_ids, [self.orders['first_day'].pk] + [self.orders['last_day'].pk] * 2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'products.csv')
+            call_command('export_data', 'products', '--category', 'Video', '--output', path)
+            with open(path, newline='', encoding='utf-8') as file:
+                rows = list(csv.DictReader(file))
+        self.assertEqual([row['sku'] for row in rows], ['SKU-Screen'])
+
+        with self.assertRaisesMessage(CommandError, "Invalid date"):
+            call_command('export_data', 'orders', '--since', 'soon')
@@ -0,0 +1,74 @@
+import hashlib
+import io
+import tempfile
+from unittest import mock
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+from prodzm.models import Category, Product, ProductImage, Task
+from prodzm.serializers import ProductImageSerializer
+from prodzm.services import TaskWorker, process_product_image, schedule_image_processing
+
+
+class ProductImageProcessingTests(TestCase):
+    """
+    Images are resized into content-addressed derivatives rendered as `srcset`. Missing or
+    undecodable images fail for good, other storage errors are retried.
+    """
+
+    def setUp(self):
+        category = Category.objects.create(name="Audio")
+        product = Product.objects.create(
+            name="Speaker", description="-", price=10, shipping_cost=1, remaining_stock=5,
+            category=category, sku="SKU-1", supplier="-",
+        )
+        self.product = product
+        self.image = ProductImage.objects.create(product=product, image="product/missing.jpg", is_main=True)
+
+    def test_derivatives(self):
+        buffer = io.BytesIO()
+        Image.new('RGBA', (100, 50), (255, 0, 0, 128)).save(buffer, 'PNG')
+        data = buffer.getvalue()
+        content_hash = hashlib.sha256(data).hexdigest()
+        prefix = f'product_images/derivatives/{content_hash[:2]}/{content_hash}'
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            MEDIA_ROOT=media_root, PRODUCT_IMAGE_SIZES={'thumb': 40, 'large': 200},
+        ):
+            images = [
+                ProductImage.objects.create(product=self.product, image=ContentFile(data, name='speaker.png'))
+                for _ in range(2)
+            ]
+            self.assertEqual([process_product_image(image.pk) for image in images], ['processed', 'processed'])
+            self.assertEqual(process_product_image(images[0].pk), 'skipped')
+
+            # Identical uploads share their derivatives, which are never upscaled
+            derivatives = [ProductImage.objects.get(pk=image.pk).derivatives for image in images]
+            self.assertEqual(derivatives[0]['sizes'], derivatives[1]['sizes'])
+            self.assertEqual(derivatives[0]['sizes'], {
+                'thumb': {'width': 40, 'height': 20, 'webp': f'{prefix}/thumb-40.webp', 'jpeg': f'{prefix}/thumb-40.jpg'},
+                'large': {'width': 100, 'height': 50, 'webp': f'{prefix}/large-200.webp', 'jpeg': f'{prefix}/large-200.jpg'},
+            })
+            with default_storage.open(f'{prefix}/thumb-40.jpg') as file:
+                thumb = Image.open(file)
+                self.assertEqual((thumb.format, thumb.size), ('JPEG', (40, 20)))
+
+            srcset = ProductImageSerializer(ProductImage.objects.get(pk=images[0].pk)).data['srcset']
+            self.assertEqual(srcset['webp'], f'/media/{prefix}/thumb-40.webp 40w, /media/{prefix}/large-200.webp 100w')
+            self.assertEqual(srcset['jpeg'], f'/media/{prefix}/thumb-40.jpg 40w, /media/{prefix}/large-200.jpg 100w')
+            self.assertEqual(srcset['sizes']['thumb']['jpeg'], f'/media/{prefix}/thumb-40.jpg')
+
+    def test_missing_file_fails(self):
+        with self.assertLogs('prodzm.services.images', 'WARNING'):
+            self.assertEqual(process_product_image(self.image.pk), 'failed')
+
+    def test_storage_error_is_retried(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_image_processing([self.image.pk])
+        with mock.patch('django.core.files.storage.FileSystemStorage.open', side_effect=PermissionError("Storage unavailable")):
+            with self.assertLogs('prodzm.services.tasks', 'ERROR'):
+                TaskWorker().run_pending()
+        task = Task.objects.get(dedupe_key=f'product_image:{self.image.pk}')
+        self.assertEqual((task.status, task.attempts), ('pending', 1))
+        self.assertIn('PermissionError', task.last_error)
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework.test import APITestCase
+from prodzm.cache import PRODUCT_STOCK, get_catalog_cache, get_model_versions, get_representation_cache
+from prodzm.models import Category, Customer, Order, OrderItem, Product, Task
+from prodzm.services import InsufficientStock, TaskWorker, place_order
+
+
+class PlaceOrderTests(APITestCase):
+    """
+    Placing an order reserves the stock of all its products, or of none of them.
+    """
+
+    def setUp(self):
+        category = Category.objects.create(name="Audio")
+        self.plenty, self.scarce = [
+            Product.objects.create(
+                name=f"Product {stock}", description="-", price=10, shipping_cost=1, remaining_stock=stock,
+                category=category, sku=f"SKU-{stock}", supplier="-",
+            )
+            for stock in (10, 2)
+        ]
+        self.customer = Customer.objects.create(first_name="A", last_name="B", email="a@example.com", shipping_address="-")
+
+    def get_stock(self):
+        return list(Product.objects.order_by('pk').values_list('remaining_stock', 'orders'))
+
+    def test_order_reserves_stock(self):
+        order = place_order(self.customer, [
+            {'product': self.plenty, 'quantity': 3},
+            {'product': self.scarce, 'quantity': 1},
+            {'product': self.scarce, 'quantity': 1},
+        ])
+        self.assertEqual(self.get_stock(), [(7, 1), (0, 1)])
+        self.assertEqual(order.items.count(), 3)
+        self.assertEqual(Order.objects.get().total_price, 50)
+
+    def test_prices_are_read_when_placing(self):
+        Product.objects.filter(pk=self.plenty.pk).update(price=12)  # After self.plenty was loaded
+        order = place_order(self.customer, [{'product': self.plenty, 'quantity': 2}])
+        self.assertEqual([item.unit_price for item in order.items.all()], [12])
+        self.assertEqual(Order.objects.get().total_price, 24)
+
+    def test_order_invalidates_stock_only(self):
+        get_catalog_cache().clear()
+        get_representation_cache().clear()
+        self.assertEqual(self.client.get('/products/?fields=id,remaining_stock').json()['results'][0]['remaining_stock'], 10)
+        product_version, stock_version = get_model_versions([Product, PRODUCT_STOCK])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            place_order(self.customer, [{'product': self.plenty, 'quantity': 3}])
+        versions = get_model_versions([Product, PRODUCT_STOCK])
+        self.assertEqual(versions[0], product_version)
+        self.assertGreater(versions[1], stock_version)
+        self.assertEqual(self.client.get('/products/?fields=id,remaining_stock').json()['results'][0]['remaining_stock'], 7)
+
+    def test_oversell_is_rolled_back(self):
+        with self.assertRaises(InsufficientStock) as context:
+            place_order(self.customer, [
+                {'product': self.plenty, 'quantity': 3},
+                {'product': self.scarce, 'quantity': 2},
+                {'product': self.scarce, 'quantity': 1},
+            ])
+        self.assertEqual(context.exception.shortages, {self.scarce.pk: 2})
+        self.assertEqual(self.get_stock(), [(10, 0), (2, 0)])
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+
+    def test_place_endpoint(self):
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        response = self.client.post('/orders/place/', {
+            'customer': self.customer.pk,
+            'items': [{'product': self.plenty.pk, 'quantity': 2}, {'product': self.scarce.pk, 'quantity': 1}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [(item['product'], item['quantity'], item['unit_price']) for item in response.json()['items']],
+            [(self.plenty.pk, 2, '10.00'), (self.scarce.pk, 1, '10.00')],
+        )
+        self.assertEqual(response.json()['total_price'], '30.00')
+
+    def test_place_endpoint_conflict(self):
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        response = self.client.post('/orders/place/', {
+            'customer': self.customer.pk,
+            'items': [{'product': self.plenty.pk, 'quantity': 1}, {'product': self.scarce.pk, 'quantity': 5}],
+        }, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['remaining_stock'], {str(self.scarce.pk): 2})
+        self.assertEqual(self.get_stock(), [(10, 0), (2, 0)])
+
+    def test_item_changes_recalculate_total_once(self):
+        order = place_order(self.customer, [{'product': self.plenty, 'quantity': 1}])
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                OrderItem.objects.create(order=order, product=self.scarce, quantity=2, unit_price=10)
+                item = order.items.first()
+                item.quantity = 3
+                item.save()
+        self.assertEqual(Task.objects.filter(dedupe_key=f'order_total:{order.pk}', status='pending').count(), 1)
+
+        TaskWorker().run_pending()
+        self.assertEqual(Order.objects.get().total_price, 50)
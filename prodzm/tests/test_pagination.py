@@ -0,0 +1,64 @@
+from base64 import b64encode
+from urllib.parse import urlencode
+from rest_framework.test import APITestCase
+from prodzm.cache import get_catalog_cache
+from prodzm.models import Category, Product
+
+
+class KeysetPaginationTests(APITestCase):
+    """
+    Keyset cursors page through ties of the ordering in both directions, without skipping
+    nor repeating rows, and bad cursors are rejected.
+    """
+
+    def setUp(self):
+        get_catalog_cache().clear()
+        category = Category.objects.create(name="Audio")
+        for i, orders in enumerate((3, 3, 2, 2, 2, 1, 0)):
+            Product.objects.create(
+                name=f"Product {i}", description="-", price=10, shipping_cost=1, remaining_stock=5,
+                category=category, sku=f"SKU-{i}", supplier="-", orders=orders,
+            )
+        self.expected = list(Product.objects.order_by('-orders', 'id').values_list('id', flat=True))
+
+    def get_page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return [product['id'] for product in data['results']], data['next'], data['previous']
+
+    def test_pages_forward_and_backward(self):
+        pages, url, previous = [], '/products/?page_size=2&fields=id', None
+        while url:
+            ids, url, previous = self.get_page(url)
+            pages.append(ids)
+        self.assertEqual([product_id for ids in pages for product_id in ids], self.expected)
+        self.assertEqual(len(pages), 4)
+
+        # Back from the last page
+        backward = [pages[-1]]
+        while previous:
+            ids, _, previous = self.get_page(previous)
+            backward.append(ids)
+        self.assertEqual(backward, pages[::-1])
+
+    def test_page_size_is_bounded(self):
+        category = Category.objects.get()
+        Product.objects.bulk_create([
+            Product(
+                name=f"Extra {i}", description="-", price=10, shipping_cost=1, remaining_stock=5,
+                category=category, sku=f"EXTRA-{i}", supplier="-",
+            )
+            for i in range(100)
+        ])
+        self.assertEqual(len(self.get_page('/products/?page_size=1000&fields=id')[0]), 100)
+        self.assertEqual(self.get_page('/products/?page_size=1&fields=id')[0], self.expected[:1])
+
+    def test_bad_cursors(self):
+        def cursor(**params):
+            return b64encode(urlencode(params).encode()).decode()
+
+        for value in ('garbage', cursor(p='not json'), cursor(p='["1"]'), cursor(p='{"id": 1}')):
+            with self.subTest(cursor=value):
+                response = self.client.get('/products/', {'cursor': value})
+                self.assertEqual(response.status_code, 404)
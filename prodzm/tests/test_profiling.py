@@ -0,0 +1,78 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.test import modify_settings, override_settings
+from rest_framework.test import APITestCase
+from prodzm.cache import get_catalog_cache, get_representation_cache
+from prodzm.middleware import ProfilingMiddleware
+from prodzm.models import Category, Product
+from prodzm.profiling import Metrics, RequestProfile, format_labels, get_metrics
+from prodzm.serializers import ProductSerializer
+
+
+@override_settings(PROFILING_SAMPLE_RATE=1)
+@modify_settings(MIDDLEWARE={'prepend': 'prodzm.middleware.ProfilingMiddleware'})
+class ProfilingTests(APITestCase):
+    """
+    Profiled requests, sync or async, report their SQL and serializer field timings in a
+    `Server-Timing` header and in the Prometheus metrics.
+    """
+
+    def setUp(self):
+        get_metrics().clear()
+        get_catalog_cache().clear()
+        get_representation_cache().clear()
+        category = Category.objects.create(name="Audio")
+        Product.objects.create(
+            name="Product", description="-", price=10, shipping_cost=1, remaining_stock=5,
+            category=category, sku="SKU", supplier="-",
+        )
+
+    def assertProfiled(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        fields = get_metrics().field_calls
+        self.assertEqual(fields['prodzm:product-list', 'GET', 'ProductSerializer.name'], 1)
+        self.assertEqual(fields['prodzm:product-list', 'GET', 'ProductSerializer.get_related_products'], 1)
+
+    def test_sync_request(self):
+        self.assertProfiled(self.client.get('/products/'))
+
+    async def test_async_request(self):
+        async def get_response(request):
+            pass
+
+        self.assertTrue(iscoroutinefunction(ProfilingMiddleware(get_response)))
+        # Async views and sync views served under ASGI query from sync_to_async threads
+        for url, view_name in (('/async/products/', 'prodzm:async-product-list'), ('/products/', 'prodzm:product-list')):
+            with self.subTest(url=url):
+                get_representation_cache().clear()
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn('"0 queries', response['Server-Timing'])
+                self.assertGreater(get_metrics().db_queries[view_name, 'GET'], 0)
+                self.assertEqual(get_metrics().field_calls[view_name, 'GET', 'ProductSerializer.name'], 1)
+
+    def test_metrics_endpoint(self):
+        self.client.get('/products/')
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        response = self.client.get('/metrics/')
+        self.assertContains(
+            response, 'prodzm_serializer_field_calls_total{endpoint="prodzm:product-list",method="GET",field="ProductSerializer.name"} 1'
+        )
+
+    def test_label_values_are_escaped(self):
+        self.assertEqual(format_labels(task='a\\b"c\nd'), 'task="a\\\\b\\"c\\nd"')
+        metrics = Metrics()
+        metrics.record('say "hi"', 'GET', RequestProfile())
+        self.assertIn('prodzm_request_db_queries_total{endpoint="say \\"hi\\"",method="GET"} 0', metrics.render())
+
+    def test_unprofiled_fields_are_not_wrapped(self):
+        serializer = ProductSerializer(Product.objects.get())
+        self.assertNotIn('to_representation', vars(serializer.fields['name']))
+        profile = RequestProfile()
+        token = profile.activate()
+        try:
+            ProductSerializer(Product.objects.get()).data
+        finally:
+            profile.deactivate(token)
+        self.assertEqual(profile.field_calls['ProductSerializer.name'], 1)
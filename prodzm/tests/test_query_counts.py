@@ -0,0 +1,95 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from prodzm.cache import get_catalog_cache, get_representation_cache, get_user_cache
+from prodzm.models import Category, Customer, Product, ProductImage, Review, Shipping
+from prodzm.services import create_order
+
+
+class QueryCountTests(APITestCase):
+    """
+    The querysets of list endpoints are optimized from their serializers, so the number of
+    queries of a page must not depend on how many rows (or nested rows) it holds.
+    """
+    endpoints = (
+        '/products/',
+        '/products/?fields=id,name,price,images',
+        '/categories/',
+        '/reviews/',
+        '/orders/',
+        '/orders/?expand=product',
+        '/order-items/',
+        '/order-items/?expand=product',
+        '/shipping/',
+        '/shipping/?expand=product',
+    )
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.created = 0
+
+    def add_rows(self, count):
+        """
+        Adds `count` categories, each with a product (with two images and a review), an order
+        of two items and its shipping.
+        """
+        for _ in range(count):
+            self.created += 1
+            n = self.created
+            category = Category.objects.create(name=f"Category {n}")
+            customer = Customer.objects.create(
+                first_name="Customer", last_name=str(n), email=f"customer{n}@example.com", shipping_address="-",
+            )
+            products = [
+                Product.objects.create(
+                    name=f"Product {n}.{i}", description="-", price=10, shipping_cost=1, remaining_stock=5,
+                    category=category, sku=f"SKU-{n}-{i}", supplier="-",
+                )
+                for i in range(2)
+            ]
+            for product in products:
+                ProductImage.objects.create(product=product, image=f"product/{n}/main.jpg", is_main=True)
+                ProductImage.objects.create(product=product, image=f"product/{n}/side.jpg")
+                Review.objects.create(product=product, customer=customer, rating=4, comment="-")
+            order = create_order(customer, [{'product': product, 'quantity': 1} for product in products])
+            Shipping.objects.create(order=order, tracking_number=f"TRACK-{n}")
+
+    def count_queries(self, url):
+        get_catalog_cache().clear()
+        get_representation_cache().clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(context.captured_queries)
+
+    def test_query_count_is_constant(self):
+        self.add_rows(2)
+        few = {url: self.count_queries(url) for url in self.endpoints}
+        self.add_rows(8)
+        many = {url: self.count_queries(url) for url in self.endpoints}
+        self.assertEqual(few, many)
+
+
+class CachedAuthenticationTests(APITestCase):
+    """
+    Users authenticated by JWT are served from the user cache, until they are saved.
+    """
+
+    def setUp(self):
+        get_user_cache().clear()
+        self.user = User.objects.create_user('customer', 'customer@example.com', 'secret')
+        tokens = self.client.post('/token/', {'username': 'customer', 'password': 'secret'}).json()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/categories/')
+        return response.status_code, sum('FROM "auth_user"' in query['sql'] for query in context.captured_queries)
+
+    def test_user_is_cached_until_saved(self):
+        self.assertEqual(self.user_queries(), (200, 1))
+        self.assertEqual(self.user_queries(), (200, 0))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.user_queries(), (401, 1))
@@ -0,0 +1,38 @@
+import io
+from unittest import mock
+from django.core.management import CommandError, call_command
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase
+from prodzm.models import Product
+from prodzm.services import HOT_QUERIES, explain_hot_queries
+
+
+class QueryPlanTests(TestCase):
+    """
+    `check_query_plans` fails when a hot query falls back to a full table scan, or when the
+    schema it explains the queries on isn't migrated.
+    """
+
+    def check_plans(self):
+        stdout = io.StringIO()
+        call_command('check_query_plans', stdout=stdout)
+        return stdout.getvalue()
+
+    def test_indexed_plans_pass(self):
+        output = self.check_plans()
+        self.assertEqual(output.count('ok '), len(HOT_QUERIES))
+        self.assertNotIn('FULL SCAN', output)
+
+    def test_full_scan_fails(self):
+        with mock.patch.dict(HOT_QUERIES, {'products.by_supplier': lambda: Product.objects.filter(supplier="-")}):
+            plans = {plan.name: plan for plan in explain_hot_queries()}
+            self.assertEqual(plans['products.by_supplier'].full_scans, ['prodzm_product'])
+            with self.assertRaisesMessage(CommandError, "1 hot queries fall back to a full table scan."):
+                self.check_plans()
+
+    def test_unmigrated_schema(self):
+        migration = mock.Mock(app_label='prodzm')
+        migration.name = '0017_sales_rollups'
+        with mock.patch.object(MigrationExecutor, 'migration_plan', return_value=[(migration, False)]):
+            with self.assertRaisesMessage(CommandError, "Database 'default' has 1 unapplied migrations (prodzm.0017_sales_rollups)"):
+                self.check_plans()
@@ -0,0 +1,61 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from django.utils.translation import gettext_lazy
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from prodzm.models import Category, Product
+from prodzm.parsers import FastJSONParser
+from prodzm.renderers import FastJSONRenderer
+
+
+class FastJSONTests(APITestCase):
+    """
+    The orjson renderer and parser behave exactly like DRF's, and list endpoints render as NDJSON.
+    """
+
+    def test_same_rendering(self):
+        data = {
+            'price': Decimal('12.50'),
+            'created': datetime.datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc),
+            'day': datetime.date(2024, 1, 2),
+            'time': datetime.time(1, 2, 3),
+            'duration': datetime.timedelta(minutes=90),
+            'uuid': uuid.UUID(int=1),
+            'lazy': gettext_lazy("Not found."),
+            'text': 'café    "\\/',
+            'floats': [0.1, 1.5, 4.0],
+            'big': 2 ** 70,
+            1: 'integer key',
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(data, 'application/json; indent=4'), JSONRenderer().render(data, 'application/json; indent=4'))
+
+    def test_non_finite_floats(self):
+        for value in (float('nan'), float('inf'), -float('inf')):
+            for renderer in (FastJSONRenderer(), JSONRenderer()):
+                with self.subTest(value=value, renderer=renderer), self.assertRaises(ValueError):
+                    renderer.render({'results': [{'rating': value, 'description': None}]})
+
+    def test_same_parsing(self):
+        for body in (b'{"a": [1, 2.5, "\\u00e9", null]}', b'{"big": 123456789012345678901234567890}'):
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        for body in (b'{"a": NaN}', b'{"a": '):
+            with self.assertRaisesMessage(Exception, 'JSON parse error'):
+                FastJSONParser().parse(io.BytesIO(body))
+
+    def test_ndjson_list(self):
+        category = Category.objects.create(name="Audio")
+        for i in range(3):
+            Product.objects.create(
+                name=f"Product {i}", description="-", price=10, shipping_cost=1, remaining_stock=5,
+                category=category, sku=f"SKU-{i}", supplier="-",
+            )
+        response = self.client.get('/products/?page_size=2', HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lines = response.content.splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0], FastJSONRenderer().render(self.client.get('/products/?page_size=2').json()['results'][0]))
+        self.assertIn('rel="next"', response['Link'])
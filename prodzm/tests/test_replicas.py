@@ -0,0 +1,80 @@
+import shutil
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from prodzm.cache import get_catalog_cache
+from prodzm.models import Category
+from prodzm.replicas import PIN_COOKIE, activate_replica_reads, deactivate_replica_reads
+
+REPLICA = 'replica1'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Safe catalog reads are served by a replica (a second SQLite file), except for clients
+    that just wrote and for reads within a transaction, which go to the primary.
+    """
+
+    databases = '__all__'  # Including the replica, registered before the class is set up
+
+    @classmethod
+    def setUpClass(cls):
+        directory = Path(tempfile.mkdtemp(prefix='prodzm-replica-'))
+        cls.addClassCleanup(shutil.rmtree, directory, ignore_errors=True)
+        connections.settings[REPLICA] = connections.configure_settings({
+            'default': settings.DATABASES['default'],
+            REPLICA: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(directory / 'replica.sqlite3')},
+        })[REPLICA]
+        cls.addClassCleanup(cls.remove_replica)
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Category)
+        super().setUpClass()
+
+    @classmethod
+    def remove_replica(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+
+    def setUp(self):
+        # The replica lags behind: each database holds a category the other doesn't
+        Category.objects.create(name="Primary")
+        with connections[REPLICA].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {Category._meta.db_table}')  # Not flushed between tests
+        Category.objects.using(REPLICA).create(name="Replica")
+        get_catalog_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+
+    def get_category_names(self):
+        response = self.client.get('/categories/')
+        self.assertEqual(response.status_code, 200)
+        return [category['name'] for category in response.json()['results']]
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.get_category_names(), ["Replica"])
+
+    def test_write_pins_client_to_primary(self):
+        response = self.client.post('/categories/', {'name': "New"})
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.get_category_names(), ["New", "Primary"])
+
+    def test_transaction_reads_go_to_primary(self):
+        token = activate_replica_reads(RequestFactory().get('/categories/'))
+        try:
+            self.assertEqual(list(Category.objects.values_list('name', flat=True)), ["Replica"])
+            with transaction.atomic():
+                self.assertEqual(list(Category.objects.values_list('name', flat=True)), ["Primary"])
+        finally:
+            deactivate_replica_reads(token)
+
+    def test_routing_counters_in_metrics(self):
+        self.get_category_names()
+        response = self.client.get('/metrics/')
+        self.assertContains(response, f'prodzm_replica_routed_requests_total{{database="{REPLICA}",reason="replica"}}')
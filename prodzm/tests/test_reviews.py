@@ -0,0 +1,56 @@
+from django.test import TestCase
+from prodzm.models import Category, Customer, Product, Review
+from prodzm.services import REVIEW_STAT_FIELDS, rebuild_review_stats
+
+
+class ReviewStatsTests(TestCase):
+    """
+    The denormalized review statistics of products follow reviews being created, rated
+    again, moved to another product and deleted, and match a full rebuild.
+    """
+
+    def setUp(self):
+        category = Category.objects.create(name="Audio")
+        self.first, self.second = [
+            Product.objects.create(
+                name=f"Product {i}", description="-", price=10, shipping_cost=1, remaining_stock=5,
+                category=category, sku=f"SKU-{i}", supplier="-",
+            )
+            for i in range(2)
+        ]
+        self.customer = Customer.objects.create(first_name="A", last_name="B", email="a@example.com", shipping_address="-")
+
+    def get_stats(self, product):
+        return Product.objects.values(*REVIEW_STAT_FIELDS).get(pk=product.pk)
+
+    def assertStats(self, product, count, total, histogram):
+        expected = {'review_count': count, 'rating_sum': total}
+        expected.update({f'rating_{rating}_count': histogram.get(rating, 0) for rating in range(1, 6)})
+        self.assertEqual(self.get_stats(product), expected)
+
+    def test_review_lifecycle(self):
+        review = Review.objects.create(product=self.first, customer=self.customer, rating=4, comment="-")
+        Review.objects.create(product=self.first, customer=self.customer, rating=2, comment="-")
+        self.assertStats(self.first, 2, 6, {4: 1, 2: 1})
+
+        review.rating = 5
+        review.save()
+        self.assertStats(self.first, 2, 7, {5: 1, 2: 1})
+
+        review.comment = "Edited"  # Neither the product nor the rating changed
+        review.save()
+        self.assertStats(self.first, 2, 7, {5: 1, 2: 1})
+
+        review.product = self.second
+        review.rating = 3
+        review.save()
+        self.assertStats(self.first, 1, 2, {2: 1})
+        self.assertStats(self.second, 1, 3, {3: 1})
+
+        incremental = [self.get_stats(product) for product in (self.first, self.second)]
+        rebuild_review_stats()
+        self.assertEqual([self.get_stats(product) for product in (self.first, self.second)], incremental)
+
+        review.delete()
+        self.assertStats(self.second, 0, 0, {})
+        self.assertEqual(Product.objects.get(pk=self.second.pk).average_rating, 0)
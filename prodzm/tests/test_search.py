@@ -0,0 +1,42 @@
+from django.test import TestCase
+from prodzm.models import Category, Product
+from prodzm.services import search_products
+
+
+class FullTextSearchTests(TestCase):
+    """
+    Full-text search prefix matches every term and ranks name matches first.
+    """
+
+    def setUp(self):
+        category = Category.objects.create(name="Audio")
+        for name, description in (
+            ("Speaker", "Wireless speaker"),
+            ("Wireless headphones", "Noise cancelling"),
+            ("Turntable", "Vinyl player"),
+            ("Wireless speaker", "Portable"),
+        ):
+            Product.objects.create(
+                name=name, description=description, price=10, shipping_cost=1, remaining_stock=5,
+                category=category, sku=name, supplier="-",
+            )
+
+    def search(self, query):
+        queryset, ordering = search_products(Product.objects.all(), {'qs': query})
+        return list(queryset.order_by(*ordering).values_list('name', flat=True))
+
+    def test_ranked_prefix_matches(self):
+        self.assertEqual(self.search("wire"), ["Wireless speaker", "Wireless headphones", "Speaker"])
+        self.assertEqual(self.search("speak wireless"), ["Wireless speaker", "Speaker"])
+        self.assertEqual(self.search("vinyl"), ["Turntable"])
+        self.assertEqual(self.search("drum"), [])
+        self.assertEqual(self.search("*"), [])
+
+    def test_date_is_ignored(self):
+        # Products have no creation date to filter on
+        for url in ('/products/search/', '/async/products/search/'):
+            with self.subTest(url=url):
+                response = self.client.get(url, {'qs': "wireless", 'date': "2025-01-01"})
+                self.assertEqual(response.status_code, 200)
+                names = [product['name'] for product in response.json()['results']]
+                self.assertEqual(names, ["Wireless speaker", "Wireless headphones", "Speaker"])
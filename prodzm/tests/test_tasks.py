@@ -0,0 +1,78 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from prodzm.models import Task
+from prodzm.services import TaskWorker, enqueue
+from prodzm.services.tasks import task
+
+calls = []
+
+
+@task(name='prodzm.tests.record', max_attempts=2, backoff=10)
+def record(value, fail=False):
+    calls.append(value)
+    if fail:
+        raise RuntimeError("Task failed.")
+
+
+class TaskQueueTests(TestCase):
+    """
+    Tasks are enqueued on commit and deduplicated, failures are retried with exponential
+    backoff, and tasks of lost workers are requeued.
+    """
+
+    def setUp(self):
+        calls.clear()
+        self.worker = TaskWorker(stale_after=60)
+
+    def enqueue(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(record, kwargs, dedupe_key=f"record:{kwargs['value']}")
+
+    def test_enqueued_on_commit_and_deduplicated(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            enqueue(record, {'value': 1}, dedupe_key='record:1')
+            self.assertFalse(Task.objects.exists())
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.enqueue(value=1)
+        self.enqueue(value=2)
+        self.assertEqual(Task.objects.filter(status='pending').count(), 2)
+
+        self.assertEqual(self.worker.run_pending(), 2)
+        self.assertEqual(sorted(calls), [1, 2])
+        self.enqueue(value=1)  # The key is free again once the task ran
+        self.assertEqual(Task.objects.filter(status='pending').count(), 1)
+
+    def test_retry_with_backoff(self):
+        self.enqueue(value=1, fail=True)
+        started = timezone.now()
+        with self.assertLogs('prodzm.services.tasks', 'ERROR'):
+            self.assertEqual(self.worker.run_pending(), 1)
+        task = Task.objects.get()
+        self.assertEqual((task.status, task.attempts), ('pending', 1))
+        self.assertGreaterEqual(task.run_at, started + timedelta(seconds=10))
+        self.assertIn("Task failed.", task.last_error)
+        self.assertEqual(self.worker.run_pending(), 0)  # Not due yet
+
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('prodzm.services.tasks', 'ERROR'):
+            self.worker.run_pending()
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('failed', 2))
+        self.assertEqual(calls, [1, 1])
+
+    def test_requeue_stale(self):
+        started_at = timezone.now() - timedelta(seconds=120)
+        lost, exhausted, running = [
+            Task.objects.create(
+                name=record.task_name, kwargs={'value': value}, status='running', attempts=attempts,
+                max_attempts=2, run_at=started_at, started_at=started_at,
+            )
+            for value, attempts in ((1, 1), (2, 2), (3, 1))
+        ]
+        Task.objects.filter(pk=running.pk).update(started_at=timezone.now())
+
+        self.worker.requeue_stale()
+        statuses = dict(Task.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {lost.pk: 'pending', exhausted.pk: 'failed', running.pk: 'running'})
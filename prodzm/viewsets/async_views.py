@@ -0,0 +1,192 @@
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from prodzm.cache import PRODUCT_STOCK, aget_model_versions, build_cache_key, get_catalog_cache, get_catalog_cache_timeout
+from prodzm.models import Category, Product, ProductImage, Review
+from prodzm.optimizer import optimize_queryset
+from prodzm.renderers import FastJSONRenderer
+from prodzm.replicas import activate_replica_reads, deactivate_replica_reads, may_be_stale
+from prodzm.serializers import CategorySerializer, DynamicFieldsMixin, ProductSerializer, parse_field_list
+from prodzm.services import RelatedProductIndex, search_products
+from prodzm.viewsets.mixins import build_cache_entry, cached_entry_response
+
+
+class AsyncCatalogView(View):
+    """
+    Async-native read-only catalog endpoint, for ASGI deployments: rows are fetched with the
+    async ORM and serialized without any query, so a request waiting on the database or on
+    a slow client holds no worker thread. Serves the same (anonymous) representations as
+    the matching viewset, with the same pagination, sparse fieldsets and response cache.
+
+    Subclasses implement `get_data()`. Serialization runs in the event loop: anything a
+    serializer would lazily fetch must be loaded beforehand (see `prepare_serializer()`),
+    since Django raises SynchronousOnlyOperation for queries made from async code.
+    """
+    basename = None
+    queryset = None
+    serializer_class = None
+    pagination_ordering = ('id',)
+    cache_dependencies = ()
+    renderer = FastJSONRenderer()
+
+    async def get(self, request, **kwargs):
+        self.request = Request(request)
+        versions = await aget_model_versions(self.cache_dependencies)
+        key = build_cache_key(
+            f"response:{self.basename}",
+            request.path,
+            sorted(request.GET.lists()),
+            self.renderer.media_type,
+            'anon',
+            versions,
+        )
+        cache = get_catalog_cache()
+        entry = await cache.aget(key)
+        if entry is None:
+            token = activate_replica_reads(request)
+            try:
+                try:
+                    data = await self.get_data(**kwargs)
+                except APIException as exc:
+                    return self.error_response(exc.status_code, exc.detail)
+                entry = build_cache_entry(self.renderer.render(data), self.renderer)
+                if not may_be_stale(versions):
+                    await cache.aset(key, entry, get_catalog_cache_timeout())
+            finally:
+                if token is not None:
+                    deactivate_replica_reads(token)
+        return cached_entry_response(request, entry, versions)
+
+    async def get_data(self, **kwargs):
+        raise NotImplementedError('Async catalog views must implement get_data().')
+
+    def error_response(self, status, detail):
+        return HttpResponse(self.renderer.render({'detail': detail}), status=status, content_type=self.renderer.media_type)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = self.serializer_class
+        if issubclass(serializer_class, DynamicFieldsMixin):
+            kwargs['fields'] = parse_field_list(self.request, 'fields') or None
+            kwargs['omit'] = parse_field_list(self.request, 'omit')
+        kwargs['context'] = {'request': self.request, 'view': self}
+        return serializer_class(*args, **kwargs)
+
+    def get_queryset(self):
+        ordering = [field.lstrip('-') for field in self.pagination_ordering]
+        return optimize_queryset(self.queryset.all(), self.get_serializer(), defer=True, extra_fields=ordering)
+
+    async def prepare_serializer(self, serializer, instances):
+        """
+        Loads what the serializer of `instances` needs beyond their queryset.
+        """
+
+    async def list_data(self, queryset):
+        paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+        page = await paginator.apaginate_queryset(queryset, self.request, view=self)
+        if page is None:
+            page = [obj async for obj in queryset.aiterator(chunk_size=1000)]
+        serializer = self.get_serializer(page, many=True)
+        await self.prepare_serializer(serializer, page)
+        data = serializer.data
+        if paginator.page_size:
+            return paginator.get_paginated_payload(data)
+        return data
+
+    async def detail_data(self, queryset, pk):
+        model = queryset.model
+        try:
+            instance = await queryset.aget(pk=pk)
+        except (model.DoesNotExist, ValueError):
+            raise NotFoundError(f"No {model._meta.object_name} matches the given query.")
+        serializer = self.get_serializer(instance)
+        await self.prepare_serializer(serializer, [instance])
+        return serializer.data
+
+
+class NotFoundError(APIException):
+    status_code = 404
+    default_detail = "Not found."
+
+
+class AsyncProductView(AsyncCatalogView):
+    """
+    Base of the async product endpoints: related products are resolved for the whole page
+    with one RelatedProductIndex, loaded ahead of serialization.
+    """
+    basename = 'async-product'
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    pagination_ordering = ('-orders', 'id')
+    cache_dependencies = (Product, ProductImage, Category, Review, PRODUCT_STOCK)
+
+    async def prepare_serializer(self, serializer, instances):
+        child = getattr(serializer, 'child', serializer)
+        await child.aload_versions(instances)
+        if 'related_products' not in child.fields:
+            return
+        # Cached representations already hold their related products
+        missing = child.load_representations(instances)
+        if not missing:
+            return
+        index = RelatedProductIndex(missing)
+        await index.aload()
+        serializer.context['related_index'] = index
+
+
+class AsyncProductListView(AsyncProductView):
+    """
+    Async version of `GET /products/`.
+    """
+
+    async def get_data(self):
+        return await self.list_data(self.get_queryset())
+
+
+class AsyncProductDetailView(AsyncProductView):
+    """
+    Async version of `GET /products/<pk>/`.
+    """
+
+    async def get_data(self, pk):
+        return await self.detail_data(self.get_queryset(), pk)
+
+
+class AsyncProductSearchView(AsyncProductView):
+    """
+    Async version of `GET /products/search/`, with the same filters and full-text search.
+    """
+    basename = 'async-product-search'
+
+    async def get_data(self):
+        queryset, ordering = search_products(self.get_queryset(), self.request.query_params)
+        if ordering:
+            self.pagination_ordering = ordering
+        return await self.list_data(queryset)
+
+
+class AsyncCategoryView(AsyncCatalogView):
+    basename = 'async-category'
+    queryset = Category.objects.all()
+    serializer_class = CategorySerializer
+    pagination_ordering = ('name', 'id')
+    cache_dependencies = (Category,)
+
+
+class AsyncCategoryListView(AsyncCategoryView):
+    """
+    Async version of `GET /categories/`.
+    """
+
+    async def get_data(self):
+        return await self.list_data(self.get_queryset())
+
+
+class AsyncCategoryDetailView(AsyncCategoryView):
+    """
+    Async version of `GET /categories/<pk>/`.
+    """
+
+    async def get_data(self, pk):
+        return await self.detail_data(self.get_queryset(), pk)
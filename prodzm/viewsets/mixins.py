@@ -0,0 +1,227 @@
+import hashlib
+from django.db.models import QuerySet
+from django.db.models.manager import BaseManager
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from prodzm.optimizer import optimize_queryset
+from prodzm.replicas import activate_replica_reads, deactivate_replica_reads, may_be_stale
+from prodzm.cache import build_cache_key, get_catalog_cache, get_catalog_cache_timeout, get_model_versions
+from prodzm.serializers import DynamicFieldsMixin, parse_expand, parse_field_list
+from prodzm.services import RelatedProductIndex
+
+
+class CachedResponseMixin:
+    """
+    Read-through cache for the JSON responses of `list`, `retrieve` and any action wrapped
+    with `cached_response()`.
+
+    Responses are cached rendered, keyed by URL, query parameters, media type, auth scope
+    and the versions of the models in `cache_dependencies`, so a change to any of those
+    models (bumped from their post_save/post_delete signals) invalidates them precisely.
+    Responses carry an ETag and a Last-Modified header and conditional requests get a 304.
+    """
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    def get_cache_scope(self, request):
+        """
+        Returns the auth scope a response is shared within.
+        """
+        if request.user.is_staff:
+            return 'staff'
+        return 'user' if request.user.is_authenticated else 'anon'
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if request.method != 'GET' or renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        versions = get_model_versions(self.cache_dependencies)
+        key = build_cache_key(
+            f"response:{self.basename}",
+            request.path,
+            sorted(request.query_params.lists()),
+            request.accepted_media_type,
+            self.get_cache_scope(request),
+            versions,
+        )
+        cache = get_catalog_cache()
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            content = renderer.render(response.data, request.accepted_media_type, self.get_renderer_context())
+            entry = build_cache_entry(content, renderer)
+            if not may_be_stale(versions):
+                cache.set(key, entry, get_catalog_cache_timeout())
+
+        return cached_entry_response(request._request, entry, versions)
+
+
+def build_cache_entry(content, renderer):
+    """
+    Returns the response cache entry of content rendered by `renderer`.
+    """
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type = f"{content_type}; charset={renderer.charset}"
+    return {
+        'content': content,
+        'content_type': content_type,
+        'etag': quote_etag(hashlib.md5(content).hexdigest()),
+    }
+
+
+def cached_entry_response(request, entry, versions):
+    """
+    Returns the response of a cache entry, with its ETag and a Last-Modified from the model
+    `versions`, or a 304 if the (Django) `request` is conditional and the entry didn't change.
+    """
+    last_modified = max(versions) // 1000 if versions else None
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    return get_conditional_response(request, etag=entry['etag'], last_modified=last_modified, response=response)
+
+
+def collect_path(instances, path):
+    """
+    Follows a `__` separated relation path (e.g. `items__product`) from one or many model
+    instances and returns the related objects found at its end.
+    """
+    objects = list(instances) if isinstance(instances, (list, tuple, QuerySet)) else [instances]
+    for name in path.split('__'):
+        related = []
+        for obj in objects:
+            value = getattr(obj, name)
+            if isinstance(value, BaseManager):
+                related.extend(value.all())
+            elif value is not None:
+                related.append(value)
+        objects = related
+    return objects
+
+
+class SparseFieldsMixin:
+    """
+    Applies the `?fields=` and `?omit=` sparse fieldset parameters of read requests to
+    serializers using DynamicFieldsMixin.
+    """
+
+    def get_sparse_fields(self):
+        """
+        Returns the `fields`/`omit` serializer arguments of the current request.
+        """
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return {}
+        fields = parse_field_list(self.request, 'fields')
+        return {'fields': fields or None, 'omit': parse_field_list(self.request, 'omit')}
+
+    def is_field_selected(self, name):
+        return DynamicFieldsMixin.is_field_selected(name, **self.get_sparse_fields())
+
+    def get_serializer(self, *args, **kwargs):
+        if issubclass(self.get_serializer_class(), DynamicFieldsMixin):
+            kwargs.update(self.get_sparse_fields())
+        return super().get_serializer(*args, **kwargs)
+
+
+class OptimizedQuerysetMixin(SparseFieldsMixin):
+    """
+    Derives the `select_related`/`prefetch_related` lookups of the view's queryset from the
+    fields of the serializer that will render it (see `prodzm.optimizer`), so responses
+    take a constant number of queries however many rows or nested objects they hold.
+    Read requests also restrict the loaded columns with `only()` where possible.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        read = self.request is None or self.request.method in SAFE_METHODS
+        ordering = [field.lstrip('-') for field in getattr(self, 'pagination_ordering', None) or ()]
+        return optimize_queryset(queryset, self.get_serializer(), defer=read, extra_fields=ordering)
+
+
+class NestedProductsMixin(OptimizedQuerysetMixin):
+    """
+    For viewsets whose responses nest products along `product_path` (e.g. `items__product`).
+    When products are expanded with `?expand=product`, resolves the related products of every
+    nested product on the page with a single RelatedProductIndex.
+    """
+    product_path = 'product'
+
+    def get_serializer(self, *args, **kwargs):
+        if args and 'product' in parse_expand(self.request) and self.is_field_selected(self.product_path.split('__')[0]):
+            kwargs.setdefault('context', self.get_serializer_context())
+            kwargs['context']['related_index'] = RelatedProductIndex(collect_path(args[0], self.product_path))
+        return super().get_serializer(*args, **kwargs)
+
+
+class BulkWriteMixin:
+    """
+    Adds a `bulk/` endpoint writing a list of rows in one transaction with the
+    `bulk_serializer_class` (a serializer using BulkListSerializer): POST creates the rows,
+    PUT updates and PATCH partially updates the rows identified by their `id`.
+    Responds with the flat representation of the written rows, not the nested one.
+    """
+    bulk_serializer_class = None
+    bulk_methods = ('POST', 'PUT', 'PATCH')
+    bulk_max_rows = 1000
+
+    def get_serializer_class(self):
+        if self.action == 'bulk':
+            return self.bulk_serializer_class
+        return super().get_serializer_class()
+
+    @action(detail=False, methods=['post', 'put', 'patch'])
+    def bulk(self, request):
+        """
+        Custom API endpoint to create (POST), update (PUT) or partially update (PATCH) many rows in one transaction.\n
+        Example: PATCH /api/shipping/bulk/ [{"id": 1, "status": "shipped"}, {"id": 2, "status": "delivered"}]
+        """
+        if request.method not in self.bulk_methods:
+            raise MethodNotAllowed(request.method)
+        creating = request.method == 'POST'
+        serializer = self.get_serializer(
+            None if creating else self.get_queryset(),
+            data=request.data,
+            many=True,
+            partial=request.method == 'PATCH',
+            max_length=self.bulk_max_rows,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED if creating else status.HTTP_200_OK)
+
+
+class ReplicaReadsMixin:
+    """
+    Serves the reads of safe-method requests from a read replica (`DATABASE_REPLICAS`),
+    unless the client wrote recently and is pinned to the primary. Authentication and
+    permission checks, which run before, still read from the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            self.replica_token = activate_replica_reads(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, 'replica_token', None)
+        if token is not None:
+            deactivate_replica_reads(token)
+            self.replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
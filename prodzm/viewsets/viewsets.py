@@ -1,5 +1,8 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, serializers, status
 from prodzm.models import (
+    DailyCategorySales,
+    DailyProductSales,
+    DailySales,
     Product, 
     ProductImage, 
     Category, 
@@ -12,91 +15,139 @@ from prodzm.models import (
 from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
-from django.db.models import Q
+from rest_framework.views import APIView
+from prodzm.services import (
+    EXPORT_FORMATS,
+    ORDER_EXPORT_COLUMNS,
+    PRODUCT_EXPORT_COLUMNS,
+    InsufficientStock,
+    export_orders,
+    export_products,
+    get_task_stats,
+    parse_export_datetime,
+    search_products,
+    stream_export,
+)
+from prodzm.viewsets.mixins import (
+    BulkWriteMixin,
+    CachedResponseMixin,
+    NestedProductsMixin,
+    OptimizedQuerysetMixin,
+    ReplicaReadsMixin,
+)
+from prodzm.cache import PRODUCT_STOCK, get_representation_cache, get_user_cache
+from prodzm.profiling import format_labels, get_metrics
+from prodzm.replicas import get_routing_stats
+from django.db.models import DecimalField, F, Sum
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
 from prodzm.serializers import (
     ProductSerializer, 
+    ProductBulkSerializer,
     ProductImageSerializer, 
     CategorySerializer, 
     ReviewSerializer,
     CustomerSerializer, 
     OrderSerializer, 
+    OrderCreateSerializer,
+    OrderPlaceSerializer,
     OrderItemSerializer, 
+    OrderItemBulkSerializer,
     ShippingSerializer,
+    ShippingBulkSerializer,
     UserSerializer,
+    DailySalesSerializer,
+    DailyProductSalesSerializer,
+    DailyCategorySalesSerializer,
 )
 from django.contrib.auth.models import User
 
-class ProductViewSet(viewsets.ModelViewSet):
+def export_response(name, file_format, columns, rows):
+    """
+    Returns a response streaming `rows` as a `file_format` (csv or ndjson) attachment.
+    """
+    response = StreamingHttpResponse(stream_export(file_format, columns, rows), content_type=EXPORT_FORMATS[file_format][0])
+    response['Content-Disposition'] = f'attachment; filename="{name}-{timezone.now():%Y%m%d-%H%M%S}.{file_format}"'
+    return response
+
+class ProductViewSet(CachedResponseMixin, ReplicaReadsMixin, BulkWriteMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing products.
     """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    bulk_serializer_class = ProductBulkSerializer
+    bulk_methods = ('PUT', 'PATCH')  # Price and stock updates only; feeds are loaded with import_catalog
+    pagination_ordering = ('-orders', 'id')
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_dependencies = (Product, ProductImage, Category, Review, PRODUCT_STOCK)
     
     @action(detail=False, methods=['get'])
     def search(self, request):
         """
-        Custom API endpoint to filter products by category.\n
-        Example: /api/products/search/?category=Electronics
+        Custom API endpoint to filter and full-text search products.\n
+        Example: /api/products/search/?category=Electronics&qs=wireless ear
         """
-        queryset = Product.objects.all()
-        
-        # Filtering by category (if provided)
-        category = request.query_params.get('category')
-        if category:
-            queryset = queryset.filter(category__name=category)
-
-        # Filtering by number of orders (if provided)
-        orders = request.query_params.get('orders')
-        if orders and orders != 0:
-            queryset = queryset.filter(orders__gte=orders)
-
-        # Filtering by creation date (if provided)
-        date = request.query_params.get('date')
-        if date:
-            queryset = queryset.filter(created_at__date=date)
-
-        # Filtering by price range (if provided)
-        price = request.query_params.get('price')
-        if price and price != 0:
-            queryset = queryset.filter(price__lte=price)
-
-        # Search query across multiple fields
-        qs = request.query_params.get('qs')
-        if qs:
-            queryset = queryset.filter(
-                Q(name__icontains=qs) | Q(description__icontains=qs)
-            )
+        return self.cached_response(request, self.search_products)
 
-        serializer = ProductSerializer(queryset, many=True)
+    def search_products(self, request):
+        queryset, ordering = search_products(self.get_queryset(), request.query_params)
+        if ordering:
+            self.pagination_ordering = ordering
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
-class ProductImageViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'], url_path=r'export/(?P<file_format>csv|ndjson)', permission_classes=[permissions.IsAdminUser])
+    def export(self, request, file_format):
+        """
+        Custom admin endpoint streaming the whole catalog (or one category) as CSV or NDJSON.\n
+        Example: /api/products/export/csv/?category=Electronics
+        """
+        rows = export_products(category=request.query_params.get('category'))
+        return export_response('products', file_format, PRODUCT_EXPORT_COLUMNS, rows)
+
+class ProductImageViewSet(OptimizedQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing product images.
     """
     queryset = ProductImage.objects.all()
     serializer_class = ProductImageSerializer
+    pagination_ordering = ('id',)
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CachedResponseMixin, ReplicaReadsMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing product categories.
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    pagination_ordering = ('name', 'id')
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_dependencies = (Category,)
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(OptimizedQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing product categories.
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_ordering = ('id',)
     
     def get_object(self):
         lookup_value = self.kwargs.get(self.lookup_field)
+
+        # The authenticated user was already resolved (from the user cache)
+        user = self.request.user
+        if isinstance(user, User) and lookup_value == (str(user.pk) if lookup_value.isdigit() else user.username):
+            return user
         
         # Try ID lookup first
         if lookup_value.isdigit():
@@ -113,42 +164,244 @@ class UserViewSet(viewsets.ModelViewSet):
 
     lookup_field = 'lookup'  # Custom URL parameter
     
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadsMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing product reviews.
     """
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    pagination_ordering = ('-created_at', 'id')
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(OptimizedQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing customers.
     """
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
+    pagination_ordering = ('id',)
     permission_classes = [permissions.IsAdminUser]  # Only admin can manage customers
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(NestedProductsMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing orders.
     """
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    product_path = 'items__product'
+    pagination_ordering = ('-created_at', 'id')
     permission_classes = [permissions.IsAuthenticated]
+    bulk_max_orders = 100
+
+    def get_serializer_class(self):
+        if self.action in ('create', 'bulk'):
+            return OrderCreateSerializer
+        if self.action == 'place':
+            return OrderPlaceSerializer
+        return super().get_serializer_class()
 
-class OrderItemViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'])
+    def place(self, request):
+        """
+        Custom API endpoint to check out a cart: reserves stock, snapshots prices and creates the order.\n
+        Example: POST /api/orders/place/ {"customer": 1, "items": [{"product": 2, "quantity": 3}]}
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            serializer.save()
+        except InsufficientStock as exc:
+            return Response(
+                {'detail': "Insufficient stock.", 'remaining_stock': exc.shortages},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Custom API endpoint to create many orders with their items in one transaction.\n
+        Example: POST /api/orders/bulk/ [{"customer": 1, "items": [{"product": 2, "quantity": 3}]}]
+        """
+        serializer = self.get_serializer(data=request.data, many=True, max_length=self.bulk_max_orders)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path=r'export/(?P<file_format>csv|ndjson)', permission_classes=[permissions.IsAdminUser])
+    def export(self, request, file_format):
+        """
+        Custom admin endpoint streaming order items with their order, customer and shipping as CSV or NDJSON.\n
+        Example: /api/orders/export/ndjson/?since=2025-01-01&until=2025-01-31&status=delivered
+        """
+        try:
+            since, until = [
+                parse_export_datetime(request.query_params[name], end=name == 'until') if request.query_params.get(name) else None
+                for name in ('since', 'until')
+            ]
+        except ValueError as exc:
+            raise ValidationError({'detail': str(exc)})
+        rows = export_orders(since=since, until=until, status=request.query_params.get('status'))
+        return export_response('orders', file_format, ORDER_EXPORT_COLUMNS, rows)
+
+class OrderItemViewSet(BulkWriteMixin, NestedProductsMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing order items.
     """
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
+    bulk_serializer_class = OrderItemBulkSerializer
+    product_path = 'product'
+    pagination_ordering = ('id',)
     permission_classes = [permissions.IsAuthenticated]
 
-class ShippingViewSet(viewsets.ModelViewSet):
+class ShippingViewSet(BulkWriteMixin, NestedProductsMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing shipping details.
     """
     queryset = Shipping.objects.all()
     serializer_class = ShippingSerializer
+    bulk_serializer_class = ShippingBulkSerializer
+    product_path = 'order__items__product'
+    pagination_ordering = ('-id',)
     permission_classes = [permissions.IsAuthenticated]
+
+class SalesRollupViewSet(OptimizedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Base of the admin-only analytics endpoints over the daily sales rollups.
+    Rows are filtered with `?since=` and `?until=` (inclusive ISO dates) and with the ids
+    of the foreign keys in `rollup_filters`.
+    """
+    pagination_ordering = ('-day', 'id')
+    permission_classes = [permissions.IsAdminUser]
+    rollup_filters = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        errors = {}
+        for name, lookup in (('since', 'day__gte'), ('until', 'day__lte')):
+            if params.get(name):
+                try:
+                    day = parse_date(params[name])
+                except ValueError:
+                    day = None
+                if day is None:
+                    errors[name] = f"Invalid date: {params[name]!r}."
+                else:
+                    queryset = queryset.filter(**{lookup: day})
+        for name in self.rollup_filters:
+            if params.get(name):
+                if not params[name].isdigit():
+                    errors[name] = f"Invalid id: {params[name]!r}."
+                else:
+                    queryset = queryset.filter(**{f'{name}_id': params[name]})
+        if errors:
+            raise ValidationError(errors)
+        return queryset
+
+class RankedSalesRollupViewSet(SalesRollupViewSet):
+    """
+    Sales rollup endpoints with a `top/` ranking of their `rank_by` foreign key.
+    """
+    rank_by = None
+
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        """
+        Custom admin endpoint ranking by revenue, units or orders over the filtered days.\n
+        Example: /analytics/products/top/?since=2025-01-01&until=2025-01-31&by=units&limit=10
+        """
+        by = request.query_params.get('by', 'revenue')
+        if by not in ('revenue', 'units', 'orders'):
+            raise ValidationError({'by': "Must be revenue, units or orders."})
+        limit = request.query_params.get('limit', '10')
+        if not limit.isdigit() or not 1 <= int(limit) <= 100:
+            raise ValidationError({'limit': "Must be a number from 1 to 100."})
+        rows = (
+            self.get_queryset()
+            .values(f'{self.rank_by}_id', name=F(f'{self.rank_by}__name'))
+            .annotate(revenue=Sum('revenue', output_field=DecimalField(max_digits=14, decimal_places=2)), units=Sum('units'), orders=Sum('orders'))
+            .order_by(f'-{by}', f'{self.rank_by}_id')[:int(limit)]
+        )
+        revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+        return Response([
+            {self.rank_by: row[f'{self.rank_by}_id'], 'name': row['name'], 'revenue': revenue.to_representation(row['revenue']), 'units': row['units'], 'orders': row['orders']}
+            for row in rows
+        ])
+
+class DailySalesViewSet(SalesRollupViewSet):
+    """
+    Admin-only daily revenue, units and orders of the whole store.
+    """
+    queryset = DailySales.objects.all()
+    serializer_class = DailySalesSerializer
+
+class DailyProductSalesViewSet(RankedSalesRollupViewSet):
+    """
+    Admin-only daily revenue, units and orders per product. Filter with `?product=` and `?category=`.
+    """
+    queryset = DailyProductSales.objects.all()
+    serializer_class = DailyProductSalesSerializer
+    rollup_filters = ('product', 'category')
+    rank_by = 'product'
+
+class DailyCategorySalesViewSet(RankedSalesRollupViewSet):
+    """
+    Admin-only daily revenue, units and orders per product category. Filter with `?category=`.
+    """
+    queryset = DailyCategorySales.objects.all()
+    serializer_class = DailyCategorySalesSerializer
+    rollup_filters = ('category',)
+    rank_by = 'category'
+
+class CacheStatsView(APIView):
+    """
+    Admin-only endpoint exposing the hit/miss counters of this process's product representation
+    and authenticated user caches.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({'product_representations': get_representation_cache().stats(), 'users': get_user_cache().stats()})
+
+class MetricsView(APIView):
+    """
+    Admin-only endpoint exposing the per-endpoint numbers of profiled requests
+    (see `PROFILING_SAMPLE_RATE`), the representation cache counters, the task queue
+    statistics and the read replica routing counters, in Prometheus text format.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        stats = get_representation_cache().stats()
+        extra = [
+            (f'prodzm_representation_cache_{name}', 'gauge', f"Product representation cache {name.replace('_', ' ')}.", {'': value})
+            for name, value in stats.items()
+        ]
+        extra += [
+            (f'prodzm_user_cache_{name}', 'gauge', f"Authenticated user cache {name.replace('_', ' ')}.", {'': value})
+            for name, value in get_user_cache().stats().items()
+            if name != 'bytes'
+        ]
+        tasks = get_task_stats()
+        extra += [
+            ('prodzm_tasks', 'gauge', "Tasks in the queue (done tasks are pruned after TASK_RETENTION).", {
+                format_labels(task=name, status=status): row[status]
+                for name, row in tasks.items()
+                for status in ('pending', 'running', 'done', 'failed')
+            }),
+            ('prodzm_tasks_retried', 'gauge', "Tasks that needed more than one attempt.", {
+                format_labels(task=name): row['retried'] for name, row in tasks.items()
+            }),
+            ('prodzm_task_duration_seconds_avg', 'gauge', "Average duration of done tasks.", {
+                format_labels(task=name): f"{row['avg_duration']:.6f}" for name, row in tasks.items() if row['avg_duration'] is not None
+            }),
+            ('prodzm_task_duration_seconds_max', 'gauge', "Maximum duration of done tasks.", {
+                format_labels(task=name): f"{row['max_duration']:.6f}" for name, row in tasks.items() if row['max_duration'] is not None
+            }),
+            ('prodzm_replica_routed_requests_total', 'counter', "Safe requests of replica-enabled endpoints per database and routing reason.", {
+                format_labels(database=database, reason=reason): count for (database, reason), count in get_routing_stats().items()
+            }),
+        ]
+        return HttpResponse(get_metrics().render(extra), content_type='text/plain; version=0.0.4; charset=utf-8')